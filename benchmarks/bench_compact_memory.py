@@ -0,0 +1,84 @@
+"""
+Measure the memory held per 1,000 tickers x 5 years, default vs compact mode.
+
+Run from the repository root:
+
+    python benchmarks/bench_compact_memory.py [n_tickers]
+
+Three shapes are measured: a get_stock_data_batch panel for the 5y period
+(weekly bars), the same tickers as daily bars over 5 years (what the daily
+base series holds), and one get_stock_data frame per ticker for the 5y
+period. Store-backed runs use a throwaway directory so the real data/ohlcv
+store is left untouched.
+"""
+import os
+import sys
+import tempfile
+import logging
+
+# Use a scratch OHLCV store before utils.store reads the setting
+os.environ['TRAID_STORE_DIR'] = tempfile.mkdtemp(prefix='traid_bench_')
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.finance import _compact, get_portfolio_metrics, get_stock_data, get_stock_data_batch
+from utils.providers import get_provider
+
+logging.disable(logging.INFO)
+
+
+def panel_bytes(panel):
+    total = 0
+    for name, values in panel.items():
+        if name == 'tickers':
+            continue
+        total += values.nbytes if isinstance(values, np.ndarray) else values.memory_usage(deep=True)
+    return total
+
+
+def frame_bytes(frames):
+    return sum(int(df.memory_usage(deep=True, index=True).sum()) for df in frames)
+
+
+def metrics_bytes(metrics):
+    seen, total = set(), 0
+    for values in metrics.values():
+        if isinstance(values, (np.ndarray, pd.Index)) and id(values) not in seen:
+            seen.add(id(values))
+            total += values.nbytes
+    return total
+
+
+def row(label, default, compact):
+    print(f"{label:<34} {default / 2**20:10.2f} MiB {compact / 2**20:10.2f} MiB {default / compact:6.2f}x")
+
+
+def main(n_tickers=1000):
+    n_tickers = int(n_tickers)
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    print(f"{n_tickers} tickers x 5y")
+    print(f"{'':<34} {'default':>14} {'compact':>14} {'ratio':>7}")
+
+    weekly = get_stock_data_batch(tickers, '5y', use_store=False)
+    weekly_compact = get_stock_data_batch(tickers, '5y', use_store=False, compact=True)
+    row("batch panel, 5y weekly bars", panel_bytes(weekly), panel_bytes(weekly_compact))
+
+    end = pd.Timestamp.now().floor('D')
+    daily = get_provider().get_panel(tickers, end - pd.Timedelta(days=1825), end, pd.Timedelta(days=1))
+    daily['Date'] = pd.date_range(end=end, periods=daily['Close'].shape[1], freq='D').as_unit('ns').asi8
+    row("panel, 5y daily bars", panel_bytes(daily), panel_bytes(_compact(daily)))
+
+    frames = [get_stock_data(t, '5y') for t in tickers]
+    frames_compact = [get_stock_data(t, '5y', compact=True) for t in tickers]
+    row("get_stock_data frames, 5y", frame_bytes(frames), frame_bytes(frames_compact))
+
+    row("get_portfolio_metrics arrays", metrics_bytes(get_portfolio_metrics()),
+        metrics_bytes(get_portfolio_metrics(compact=True)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
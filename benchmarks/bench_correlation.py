@@ -0,0 +1,64 @@
+"""
+Time the blocked correlation matrix on 5,000 synthetic return series.
+
+Run from the repository root:
+
+    python benchmarks/bench_correlation.py [n_series] [n_days]
+
+Returns are drawn from a few common factors plus noise. The benchmark
+times building the matrix, a small selection on cold and warm blocks, the
+full matrix, and folding in one new day of returns.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.correlation import BlockedCorrelation
+
+logging.disable(logging.INFO)
+
+SELECTION = 10
+
+
+def make_returns(n_series, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (5, n_days))
+    loadings = rng.normal(0, 1, (n_series, 5))
+    return loadings @ factors + rng.normal(0, 0.01, (n_series, n_days))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:10.1f}ms")
+    return result
+
+
+def main(n_series=5000, n_days=252):
+    n_series, n_days = int(n_series), int(n_days)
+    returns = make_returns(n_series, n_days + 1)
+    dates = pd.date_range('2024-01-01', periods=n_days + 1, freq='B')
+    tickers = [f"S{i:05d}" for i in range(n_series)]
+    selection = [tickers[i] for i in np.random.default_rng(1).choice(n_series, SELECTION, replace=False)]
+
+    matrix = timed(f"build {n_series} series", lambda: BlockedCorrelation(tickers, dates[:-1], returns[:, :-1]))
+    timed(f"select {SELECTION} (cold blocks)", lambda: matrix.correlation(selection))
+    timed(f"select {SELECTION} (warm blocks)", lambda: matrix.correlation(selection))
+    timed(f"full {n_series} x {n_series}", lambda: matrix.correlation(tickers))
+    timed(f"full {n_series} x {n_series} again", lambda: matrix.correlation(tickers))
+    timed("slide window by one day", lambda: matrix.update(dates[1:], returns[:, 1:]))
+
+    rows = [int(ticker[1:]) for ticker in selection]
+    error = np.abs(matrix.correlation(selection).to_numpy() - np.corrcoef(returns[rows, 1:])).max()
+    print(f"max error vs np.corrcoef: {error:.2e}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,61 @@
+"""
+Time fund screener queries on a synthetic 100,000-fund universe.
+
+Run from the repository root:
+
+    python benchmarks/bench_fund_screener.py [n_funds]
+
+Funds come from utils.funds.generate_fund_columns. Each
+query is run once to build the sorted views, then timed over many runs.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.funds import FundUniverse, generate_fund_columns
+
+logging.disable(logging.INFO)
+
+RUNS = 200
+
+# (label, filters, match, category, sort_by, ascending)
+QUERIES = [
+    ("low cost, low risk", {'volatility': (None, 8), 'expense_ratio': (None, 0.3), 'risk_score': (1, 2)},
+     'all', None, 'one_year_return', False),
+    ("tech winners, large AUM", {'one_year_return': (25, None), 'aum': (5000, None)},
+     'all', 'Technology', 'sharpe_ratio', False),
+    ("high return or low vol", {'one_year_return': (29.5, None), 'volatility': (None, 5.1)},
+     'any', None, 'expense_ratio', True),
+    ("broad: 1y return > 0", {'one_year_return': (0, None)}, 'all', None, 'aum', False),
+    ("category only", {}, 'all', 'ESG', 'aum', False),
+]
+
+
+def make_universe(n_funds, seed=0):
+    return FundUniverse(generate_fund_columns(n_funds, np.random.default_rng(seed)))
+
+
+def main(n_funds=100_000):
+    n_funds = int(n_funds)
+    start = time.perf_counter()
+    universe = make_universe(n_funds)
+    print(f"{n_funds} funds built in {time.perf_counter() - start:.2f}s")
+    print(f"{'query':<26} {'matches':>8} {'per query':>10}")
+
+    for label, filters, match, category, sort_by, ascending in QUERIES:
+        rows, total = universe.screen(filters, match, category, sort_by, ascending, limit=10)
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            universe.screen(filters, match, category, sort_by, ascending, limit=10)
+        elapsed = (time.perf_counter() - start) / RUNS
+        print(f"{label:<26} {total:>8} {elapsed * 1000:9.3f}ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,50 @@
+"""
+Time full-text fund search on a synthetic 100,000-fund universe.
+
+Run from the repository root:
+
+    python benchmarks/bench_fund_search.py [n_funds]
+
+Funds come from utils.funds.generate_fund_columns. Each query is timed
+over many runs on a built index; the last word of a query is matched as a
+prefix, as in the search box.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.funds import generate_fund_columns
+from utils.search import SearchIndex
+
+logging.disable(logging.INFO)
+
+RUNS = 200
+
+QUERIES = ['global tech', 'emerging ma', 'gr', 'healthcare value fund', 'prime gl', 'abc', 'zzzz']
+
+
+def main(n_funds=100_000):
+    n_funds = int(n_funds)
+    columns = generate_fund_columns(n_funds, np.random.default_rng(0))
+    start = time.perf_counter()
+    index = SearchIndex(columns)
+    print(f"{n_funds} funds indexed in {time.perf_counter() - start:.2f}s ({len(index.vocabulary)} tokens)")
+    print(f"{'query':<24} {'matches':>8} {'per query':>10}")
+
+    for query in QUERIES:
+        _, _, total = index.search(query)
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            index.search(query)
+        elapsed = (time.perf_counter() - start) / RUNS
+        print(f"{query!r:<24} {total:>8} {elapsed * 1000:9.3f}ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
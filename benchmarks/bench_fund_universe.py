@@ -0,0 +1,72 @@
+"""
+Time generation, filtering and sorting of synthetic fund universes.
+
+Run from the repository root:
+
+    python benchmarks/bench_fund_universe.py [sizes...]
+
+Sizes default to 1,000, 100,000 and 1,000,000 funds. For each size the
+universe is generated with generate_fund_columns and indexed, then the
+screener queries of bench_fund_screener are timed as unranked filters
+(matches) and as ranked top-10 screens, next to a full sort of one field
+and a deep page of the default listing. Throughput is funds per second.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.funds import FundUniverse, generate_fund_columns
+from bench_fund_screener import QUERIES
+
+logging.disable(logging.INFO)
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+# Timed work per measurement, in funds processed; runs are repeated up to it
+WORK = 2_000_000
+
+
+def timed(fn, n_funds):
+    """Mean seconds per call, over enough calls to cover WORK funds."""
+    runs = max(1, WORK // n_funds)
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def report(label, seconds, n_funds):
+    print(f"  {label:<32} {seconds * 1000:10.3f}ms {n_funds / seconds:14,.0f} funds/s")
+
+
+def main(*sizes):
+    for n_funds in [int(size) for size in sizes] or SIZES:
+        print(f"{n_funds:,} funds")
+        start = time.perf_counter()
+        columns = generate_fund_columns(n_funds)
+        report("generate", time.perf_counter() - start, n_funds)
+        start = time.perf_counter()
+        universe = FundUniverse(columns)
+        report("build universe", time.perf_counter() - start, n_funds)
+
+        for label, filters, match, category, sort_by, ascending in QUERIES:
+            report(f"filter: {label}", timed(lambda: universe.matches(filters, match, category), n_funds), n_funds)
+        for label, filters, match, category, sort_by, ascending in QUERIES:
+            report(f"top 10: {label}",
+                   timed(lambda: universe.screen(filters, match, category, sort_by, ascending, 10), n_funds), n_funds)
+
+        values = universe.columns['aum']
+        report("full sort by aum", timed(lambda: np.argsort(values, kind='stable'), n_funds), n_funds)
+        report("page 9 at the middle",
+               timed(lambda: universe.records(universe.screen(limit=9, offset=n_funds // 2)[0]), n_funds), n_funds)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
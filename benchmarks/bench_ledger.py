@@ -0,0 +1,82 @@
+"""
+Time the transaction ledger on one user with many trades.
+
+Run from the repository root:
+
+    python benchmarks/bench_ledger.py [n_trades]
+
+Trades are random buys, partial sells and dividends over 50 tickers,
+written to a throwaway database so usuarios.db is left untouched.
+"""
+import os
+import sys
+import time
+import tempfile
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.ledger import cost_basis, load_transactions, record_transactions
+
+logging.disable(logging.INFO)
+
+N_TICKERS = 50
+
+
+def make_trades(n_trades, seed=0):
+    """Random ledger that never sells more than it holds."""
+    rng = np.random.default_rng(seed)
+    tickers = rng.integers(0, N_TICKERS, n_trades)
+    draws = rng.random(n_trades)
+    buy_shares = rng.integers(1, 100, n_trades).astype(np.float64)
+    fractions = rng.random(n_trades)
+
+    kinds = np.empty(n_trades, dtype=object)
+    shares = np.empty(n_trades)
+    held = np.zeros(N_TICKERS)
+    for i, (ticker, draw) in enumerate(zip(tickers, draws)):
+        if held[ticker] > 0 and draw < 0.35:
+            kinds[i], shares[i] = 'sell', round(held[ticker] * fractions[i], 3)
+            held[ticker] -= shares[i]
+        elif held[ticker] > 0 and draw < 0.4:
+            kinds[i], shares[i] = 'dividend', held[ticker]
+        else:
+            kinds[i], shares[i] = 'buy', buy_shares[i]
+            held[ticker] += shares[i]
+
+    return pd.DataFrame({
+        'ticker': [f"T{t:02d}" for t in tickers],
+        'type': kinds,
+        'shares': shares,
+        'price': rng.uniform(10, 200, n_trades).round(2),
+        'fees': rng.uniform(0, 2, n_trades).round(2),
+        'timestamp': pd.Timestamp('2015-01-01') + pd.to_timedelta(np.arange(n_trades), unit='min'),
+    })
+
+
+def main(n_trades=1_000_000):
+    n_trades = int(n_trades)
+    trades = make_trades(n_trades)
+    db_path = os.path.join(tempfile.mkdtemp(prefix='traid_bench_'), 'ledger.db')
+    print(f"{n_trades} trades, {N_TICKERS} tickers")
+
+    start = time.perf_counter()
+    record_transactions(1, trades, db_path)
+    print(f"{'bulk insert':<18} {time.perf_counter() - start:8.2f}s")
+
+    start = time.perf_counter()
+    ledger = load_transactions(1, db_path=db_path)
+    print(f"{'load':<18} {time.perf_counter() - start:8.2f}s")
+
+    for method in ('fifo', 'average'):
+        start = time.perf_counter()
+        cost_basis(ledger, method)
+        print(f"{method + ' cost basis':<18} {time.perf_counter() - start:8.2f}s")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
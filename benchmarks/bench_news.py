@@ -0,0 +1,93 @@
+"""
+Time the news store on a synthetic feed of 50,000 articles.
+
+Run from the repository root:
+
+    python benchmarks/bench_news.py [n_articles]
+
+Articles are ingested into a temporary database, then the benchmark times
+re-ingesting duplicates, the first and a deep page of the cursor API,
+latest articles per ticker, full-text search, and a full lazy iteration
+of the feed with its peak Python memory.
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import tracemalloc
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils import news_store
+from utils.news_store import ingest_articles, iter_news, latest_articles, news_page, search_articles
+
+logging.disable(logging.INFO)
+
+RUNS = 50
+
+WORDS = ['fed', 'rates', 'inflation', 'earnings', 'oil', 'gold', 'bitcoin', 'tech', 'growth', 'bank',
+         'bond', 'yield', 'market', 'stocks', 'jobs', 'housing', 'trade', 'energy', 'crypto', 'ipo']
+
+
+def make_articles(n_articles, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(WORDS + [f"term{i}" for i in range(5000)])
+    tickers = np.array([f"T{i}" for i in range(500)])
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 24 * 60, n_articles)), unit='min')
+    return [{
+        'title': ' '.join(rng.choice(vocabulary, 8)),
+        'summary': ' '.join(rng.choice(vocabulary, 30)),
+        'source': f"Source {i % 20}",
+        'date': str(date),
+        'tickers': list(rng.choice(tickers, 2)),
+    } for i, date in enumerate(dates)]
+
+
+def timed(label, fn, runs=RUNS):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    print(f"{label:<32} {(time.perf_counter() - start) / runs * 1000:10.3f}ms")
+
+
+def main(n_articles=50_000):
+    n_articles = int(n_articles)
+    articles = make_articles(n_articles)
+    db_path = os.path.join(tempfile.mkdtemp(), 'news.db')
+
+    # Keep the benchmark away from the market news refresh
+    news_store._refreshed[db_path] = news_store.date_bucket(freq=news_store.NEWS_REFRESH)
+
+    start = time.perf_counter()
+    added = ingest_articles(articles, db_path=db_path)
+    print(f"ingested {added} articles in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    added = ingest_articles(articles[:10_000], db_path=db_path)
+    print(f"re-ingested 10000 duplicates in {time.perf_counter() - start:.2f}s ({added} new)")
+
+    deep = news_page(cursor=None, page_size=n_articles * 9 // 10, db_path=db_path)[1]
+    timed("first page of 10", lambda: news_page(page_size=10, db_path=db_path))
+    timed("page of 10 at 90% depth", lambda: news_page(cursor=deep, page_size=10, db_path=db_path))
+    timed("latest 10 for T1, T2", lambda: latest_articles(['T1', 'T2'], limit=10, db_path=db_path))
+    timed("search 'fed'", lambda: search_articles('fed', limit=10, db_path=db_path))
+    timed("search 'fed rates'", lambda: search_articles('fed rates', limit=10, db_path=db_path))
+
+    # Warm up once so one-time imports and caches are not counted
+    next(iter_news(page_size=10, db_path=db_path))
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_news(page_size=10, db_path=db_path))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"iterated {count} articles in {elapsed:.2f}s, peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,59 @@
+"""
+Time the shrinkage covariance update and the risk-level frontier.
+
+Run from the repository root:
+
+    python benchmarks/bench_optimizer.py
+
+For each universe size the covariance is estimated from a year of daily
+returns, then the window slides by one day: once by rebuilding the
+estimator from scratch and once by appending the new row and dropping the
+oldest. The last column is the efficient frontier plus the 7 risk-level
+portfolios on the annualized estimate.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.optimizer import TRADING_DAYS, ShrinkageCovariance, risk_level_portfolios
+
+logging.disable(logging.INFO)
+
+# Assets per universe
+SIZES = [10, 50, 200, 500]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'assets':>7} {'rebuild':>10} {'slide 1 day':>12} {'7 levels':>10}")
+    for n_assets in SIZES:
+        factors = rng.normal(0, 0.01, size=(TRADING_DAYS + 1, 3))
+        loadings = rng.uniform(0.2, 1.2, size=(3, n_assets))
+        returns = 0.0004 + factors @ loadings + rng.normal(0, 0.01, size=(TRADING_DAYS + 1, n_assets))
+        estimator = ShrinkageCovariance(returns[:-1])
+
+        start = time.perf_counter()
+        ShrinkageCovariance(returns[1:]).estimate()
+        rebuild = time.perf_counter() - start
+
+        start = time.perf_counter()
+        estimator.append(returns[-1:])
+        estimator.remove(returns[:1])
+        covariance, _ = estimator.estimate()
+        slide = time.perf_counter() - start
+
+        start = time.perf_counter()
+        risk_level_portfolios(estimator.mean() * TRADING_DAYS, covariance * TRADING_DAYS, max_weight=0.4)
+        levels = time.perf_counter() - start
+
+        print(f"{n_assets:>7} {rebuild * 1000:9.1f}ms {slide * 1000:11.1f}ms {levels * 1000:9.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
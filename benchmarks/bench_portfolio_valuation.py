@@ -0,0 +1,64 @@
+"""
+Time value_positions on large portfolios with multi-year daily history.
+
+Run from the repository root:
+
+    python benchmarks/bench_portfolio_valuation.py
+
+The price panel is synthesized once per size and excluded from the timing;
+what is measured is the valuation itself (exposure matrix, matrix product,
+per-position P&L and allocation).
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.portfolio import ASSET_CLASSES, value_positions
+from utils.providers import get_provider
+
+logging.disable(logging.INFO)
+
+# (positions, distinct symbols, years of daily bars)
+SIZES = [(100, 100, 5), (1000, 500, 5), (5000, 2000, 5), (10000, 5000, 10)]
+REPEATS = 5
+
+
+def make_case(n_positions, n_symbols, years):
+    end = pd.Timestamp.now().floor('D')
+    dates = pd.date_range(end=end, periods=365 * years + 1, freq='D')
+    tickers = [f"S{i:05d}" for i in range(n_symbols)]
+    panel = get_provider().get_panel(tickers, dates[0], dates[-1], pd.Timedelta(days=1))
+    panel = {'tickers': tickers, 'Date': dates, 'Close': panel['Close']}
+
+    rng = np.random.default_rng(0)
+    positions = pd.DataFrame({
+        'Symbol': rng.choice(tickers, n_positions),
+        'Shares': rng.integers(1, 500, n_positions),
+        'Cost Basis': rng.uniform(20, 400, n_positions),
+        'Asset Class': rng.choice(ASSET_CLASSES[:2] + ASSET_CLASSES[3:], n_positions),
+    })
+    return positions, panel
+
+
+def main():
+    print(f"{'positions':>10} {'symbols':>8} {'days':>6} {'best':>10} {'median':>10}")
+    for n_positions, n_symbols, years in SIZES:
+        positions, panel = make_case(n_positions, n_symbols, years)
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            value_positions(positions, panel)
+            timings.append(time.perf_counter() - start)
+        print(f"{n_positions:>10} {n_symbols:>8} {len(panel['Date']):>6} "
+              f"{min(timings) * 1000:9.1f}ms {np.median(timings) * 1000:9.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Time Monte Carlo projections of one year of daily steps.
+
+Run from the repository root:
+
+    python benchmarks/bench_projections.py [n_paths]
+
+Each model is run in-process and across a process pool with one worker
+per CPU.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.projections import calibrate, calibrate_assets, simulate
+
+logging.disable(logging.INFO)
+
+HORIZON = 252
+
+
+def main(n_paths=1_000_000):
+    n_paths = int(n_paths)
+    rng = np.random.default_rng(0)
+    history = rng.normal(0.0004, 0.012, size=(5, 756))
+    cases = {
+        'gbm': calibrate(history[0]),
+        'bootstrap': calibrate(history[0]),
+        'correlated': calibrate_assets(history, np.full(5, 0.2)),
+    }
+
+    cpus = os.cpu_count() or 1
+    print(f"{n_paths} paths x {HORIZON} steps, {cpus} CPUs")
+    print(f"{'model':>12} {'1 worker':>10} {f'{cpus} workers':>12} {'median end':>11}")
+    for model, params in cases.items():
+        start = time.perf_counter()
+        result = simulate(model, params, n_paths, HORIZON, workers=1)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        simulate(model, params, n_paths, HORIZON)
+        pooled = time.perf_counter() - start
+
+        print(f"{model:>12} {single:9.2f}s {pooled:11.2f}s {result['percentiles'][50][-1]:11.4f}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
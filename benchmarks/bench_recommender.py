@@ -0,0 +1,54 @@
+"""
+Time nearest-neighbour fund recommendations on a synthetic universe.
+
+Run from the repository root:
+
+    python benchmarks/bench_recommender.py [n_funds]
+
+Funds come from utils.funds.generate_fund_columns (100,000 by default).
+Each profile - a risk level, or the metrics of a few held funds - is timed
+over many uncached nearest-neighbour queries.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.funds import generate_fund_columns
+from utils.recommender import FundRecommender
+
+logging.disable(logging.INFO)
+
+RUNS = 100
+
+
+def main(n_funds=100_000):
+    n_funds = int(n_funds)
+    columns = generate_fund_columns(n_funds, np.random.default_rng(0))
+    start = time.perf_counter()
+    recommender = FundRecommender(columns)
+    print(f"{n_funds} funds indexed in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    held = np.arange(5)
+    profiles = [(f"risk level {level}", recommender.risk_target(level), None) for level in (1, 4, 7)]
+    profiles.append(("5 holdings", recommender.vectors[held].mean(axis=0), held))
+    profiles.append(("batch of 32 funds", recommender.vectors[:32], None))
+    print(f"{'profile':<20} {'k':>3} {'per query':>10}")
+
+    for label, target, exclude in profiles:
+        for k in (3, 10):
+            recommender.nearest(target, k, exclude)
+            start = time.perf_counter()
+            for _ in range(RUNS):
+                recommender.nearest(target, k, exclude)
+            elapsed = (time.perf_counter() - start) / RUNS
+            print(f"{label:<20} {k:>3} {elapsed * 1000:9.3f}ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
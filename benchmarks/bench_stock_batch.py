@@ -0,0 +1,58 @@
+"""
+Benchmark get_stock_data_batch against one get_stock_data call per ticker.
+
+Run from the repository root:
+
+    python benchmarks/bench_stock_batch.py
+
+Store-backed runs use a throwaway directory so the real data/ohlcv store is
+left untouched.
+"""
+import os
+import sys
+import tempfile
+import time
+import logging
+
+# Use a scratch OHLCV store before utils.store reads the setting
+os.environ['TRAID_STORE_DIR'] = tempfile.mkdtemp(prefix='traid_bench_')
+
+# Add the parent directory to sys.path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.finance import get_stock_data, get_stock_data_batch
+
+logging.disable(logging.INFO)
+
+SIZES = [10, 100, 1000, 5000]
+LOOP_LIMIT = 1000  # per-ticker loop gets slow; skip it above this size
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(period='1y'):
+    print(f"period={period}")
+    print(f"{'tickers':>8} {'loop':>10} {'batch':>10} {'batch+store cold':>17} {'batch+store warm':>17}")
+    for n in SIZES:
+        tickers = [f"T{i:05d}" for i in range(n)]
+
+        if n <= LOOP_LIMIT:
+            loop = timed(lambda: [get_stock_data(t, period) for t in tickers])
+            loop_str = f"{loop * 1000:9.1f}ms"
+        else:
+            loop_str = f"{'-':>10}"
+
+        batch = timed(get_stock_data_batch, tickers, period, use_store=False)
+        prefix = [f"C{i:05d}" for i in range(n)]
+        cold = timed(get_stock_data_batch, prefix, period)
+        warm = timed(get_stock_data_batch, prefix, period)
+
+        print(f"{n:>8} {loop_str} {batch * 1000:9.1f}ms {cold * 1000:16.1f}ms {warm * 1000:16.1f}ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
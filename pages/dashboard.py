@@ -10,8 +10,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.finance import get_portfolio_metrics, get_stock_data
-from utils.news import get_financial_news
+from utils.news_store import get_latest_news
 from utils.sentiment import analyze_sentiment
+from utils.ledger import DEMO_USER_ID, demo_transactions, recent_transactions
 
 def app():
     st.title("Dashboard")
@@ -42,23 +43,27 @@ def app():
         # Recent operations
         st.subheader("Operaciones")
         
-        operations = [
-            {"type": "Compra", "ticker": "NVO", "shares": "75,183", "price": "-39 $", "time": "14:30"},
-            {"type": "Compra", "ticker": "ORCL", "shares": "1", "price": "-148.42 $", "time": "16:20"},
-            {"type": "Compra", "ticker": "ORCL", "shares": "3", "price": "-445.26 $", "time": "18:20"}
-        ]
+        # Latest entries of the user's ledger (demo operations until they trade)
+        user_id = st.session_state.get('user_id', DEMO_USER_ID)
+        operations = recent_transactions(user_id, limit=3)
+        if operations.empty:
+            operations = demo_transactions(limit=3)
+        labels = {'buy': ("📈", "Compra"), 'sell': ("📉", "Venta"), 'dividend': ("💰", "Dividendo")}
         
-        for op in operations:
+        for op in operations.itertuples():
+            icon, label = labels[op.type]
+            amount = op.shares * op.price
+            amount = -(amount + op.fees) if op.type == 'buy' else amount - op.fees
             with st.container():
                 cols = st.columns([1, 4, 2])
                 with cols[0]:
-                    st.markdown("📈")
+                    st.markdown(icon)
                 with cols[1]:
-                    st.markdown(f"**{op['type']} {op['ticker']}**")
-                    st.markdown(f"{op['shares']} acciones")
+                    st.markdown(f"**{label} {op.ticker}**")
+                    st.markdown(f"{op.shares:,g} acciones")
                 with cols[2]:
-                    st.markdown(f"**{op['price']}**")
-                    st.markdown(f"{op['time']}")
+                    st.markdown(f"**{amount:,.2f} $**")
+                    st.markdown(op.timestamp.strftime('%H:%M'))
                 st.markdown("---")
     
     with col2:
@@ -82,7 +87,7 @@ def app():
         
         # Latest news
         st.subheader("Latest Market News")
-        news = get_financial_news(5)
+        news = get_latest_news(5)
         
         for item in news[:3]:
             st.markdown(f"**{item['title']}**")
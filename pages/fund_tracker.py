@@ -7,7 +7,14 @@ import os
 # Add the parent directory to sys.path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.finance import get_fund_data
+from utils.finance import get_fund_page
+from utils.correlation import get_correlation_matrix
+from utils.paging import PAGE_SIZE
+from utils.search import get_fund_search_index
+
+def set_cursor(cursor):
+    """Move the fund grid to the page starting at a cursor."""
+    st.session_state.fund_cursor = cursor
 
 def app():
     st.title("Fund Tracker")
@@ -21,13 +28,14 @@ def app():
     
     # Categories
     st.subheader("Categorías")
-    categories_col1, categories_col2, categories_col3, categories_col4 = st.columns(4)
+    categories_col1, categories_col2, categories_col3, categories_col4, categories_col5 = st.columns(5)
     
     category_filters = {
         "alto_riesgo": categories_col1.button("📈 Alto riesgo"),
         "bajo_riesgo": categories_col2.button("📉 Bajo riesgo"),
         "tecnologia": categories_col3.button("💻 Tecnología"),
-        "sectores": categories_col4.button("🏭 Sectores")
+        "sectores": categories_col4.button("🏭 Sectores"),
+        "todos": categories_col5.button("🔄 Todos")
     }
     
     # Featured funds
@@ -42,34 +50,75 @@ def app():
         unsafe_allow_html=True
     )
     
-    # Get fund data
-    selected_category = None
+    # Get fund data; the category is kept across reruns so paging stays in it
     if category_filters["alto_riesgo"]:
-        selected_category = "Alternative"
+        st.session_state.fund_category = "Alternative"
     elif category_filters["bajo_riesgo"]:
-        selected_category = "Fixed Income"
+        st.session_state.fund_category = "Fixed Income"
     elif category_filters["tecnologia"]:
-        selected_category = "Technology"
+        st.session_state.fund_category = "Technology"
     elif category_filters["sectores"]:
-        selected_category = "Sector"
+        st.session_state.fund_category = "Sector"
+    elif category_filters["todos"]:
+        st.session_state.fund_category = None
+    selected_category = st.session_state.get("fund_category")
+    
+    # Screener: range filters combined with AND/OR, ranked by any metric
+    with st.expander("Filtros avanzados"):
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        return_range = filter_col1.slider("1Y Return (%)", -10.0, 30.0, (-10.0, 30.0))
+        risk_range = filter_col1.slider("Risk Score", 1, 5, (1, 5))
+        max_volatility = filter_col2.slider("Volatilidad máxima (%)", 5.0, 25.0, 25.0)
+        max_expense = filter_col2.slider("Expense Ratio máximo (%)", 0.0, 1.5, 1.5)
+        min_aum = filter_col3.number_input("AUM mínimo ($M)", min_value=0.0, value=0.0, step=100.0)
+        max_min_investment = filter_col3.selectbox("Inversión mínima hasta ($)",
+                                                   [0, 1000, 2500, 5000, 10000, 25000, 50000], index=6)
+        sort_options = {
+            "1Y Return": ('one_year_return', False),
+            "Sharpe Ratio": ('sharpe_ratio', False),
+            "Expense Ratio": ('expense_ratio', True),
+            "Volatilidad": ('volatility', True),
+            "AUM": ('aum', False),
+        }
+        sort_by, ascending = sort_options[st.selectbox("Ordenar por", list(sort_options))]
+        match = 'any' if st.radio("Combinar filtros", ["Todos", "Cualquiera"], horizontal=True) == "Cualquiera" else 'all'
+    
+    # Only the filters narrowed from their full range take part
+    filters = {}
+    if return_range != (-10.0, 30.0):
+        filters['one_year_return'] = return_range
+    if risk_range != (1, 5):
+        filters['risk_score'] = risk_range
+    if max_volatility < 25.0:
+        filters['volatility'] = (None, max_volatility)
+    if max_expense < 1.5:
+        filters['expense_ratio'] = (None, max_expense)
+    if min_aum > 0:
+        filters['aum'] = (min_aum, None)
+    if max_min_investment < 50000:
+        filters['min_investment'] = (None, max_min_investment)
     
-    funds = get_fund_data(fund_category=selected_category, limit=10)
+    # Back to the first page whenever the query or the filters change
+    query_key = (search_query, tuple(sorted(filters.items())), match, selected_category, sort_by, ascending)
+    if st.session_state.get("fund_query_key") != query_key:
+        st.session_state.fund_query_key = query_key
+        st.session_state.fund_cursor = 0
     
-    # Filter by search query if provided
+    # Only the visible page is fetched and rendered
+    page = get_fund_page(search_query, filters, match, selected_category, sort_by, ascending,
+                         cursor=st.session_state.get("fund_cursor", 0), page_size=PAGE_SIZE)
+    funds = page['funds']
+    st.caption(f"{page['total']} fondos · página {page['page']} de {page['pages']}")
     if search_query:
-        funds = [fund for fund in funds if search_query.lower() in fund['name'].lower() or 
-                                           search_query.lower() in fund['ticker'].lower() or
-                                           search_query.lower() in fund['category'].lower() or
-                                           search_query.lower() in fund['subcategory'].lower()]
+        suggestions = get_fund_search_index().suggest(search_query)
+        if suggestions:
+            st.caption("Sugerencias: " + ", ".join(suggestions))
     
     # Show top performing funds
     st.subheader("Top Performing Funds")
     
     if funds:
-        # Convert to DataFrame for easier display
-        funds_df = pd.DataFrame(funds)
-        
-        # Display top funds in a grid
+        # Display the page in a grid
         num_cols = 3
         rows = (len(funds) + num_cols - 1) // num_cols  # Ceiling division
         
@@ -87,6 +136,15 @@ def app():
                         st.markdown(f"Expense Ratio: {fund['expense_ratio']}%")
                         st.button("View Details", key=f"view_{idx}")
                         st.markdown("---")
+        
+        # Page navigation
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+        nav_col1.button("← Anterior", disabled=page['prev_cursor'] is None,
+                        on_click=set_cursor, args=(page['prev_cursor'],))
+        nav_col2.markdown(f"<div style='text-align: center;'>{page['page']} / {page['pages']}</div>",
+                          unsafe_allow_html=True)
+        nav_col3.button("Siguiente →", disabled=page['next_cursor'] is None,
+                        on_click=set_cursor, args=(page['next_cursor'],))
     else:
         st.info("No funds match your criteria. Try adjusting your search or filters.")
     
@@ -137,6 +195,13 @@ def app():
             
             st.plotly_chart(fig2, use_container_width=True)
             
+            # Correlation of daily returns, served from the cached blocked matrix
+            correlation = get_correlation_matrix([fund['ticker'] for fund in selected_fund_data], period="1y")
+            if correlation is not None and len(correlation) >= 2:
+                fig3 = px.imshow(correlation.round(2), text_auto=True, zmin=-1, zmax=1,
+                                 color_continuous_scale='RdBu', title='Return Correlation (1Y)')
+                st.plotly_chart(fig3, use_container_width=True)
+            
             # Comparison table
             st.subheader("Detailed Comparison")
             
@@ -6,7 +6,8 @@ import os
 # Add the parent directory to sys.path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.news import get_financial_news, get_market_summary
+from utils.news import get_market_summary
+from utils.news_store import get_latest_news
 
 def app():
     st.title("Noticias del Mercado")
@@ -51,7 +52,7 @@ def app():
     tab1, tab2 = st.tabs(["General News", "Fyp"])
     
     with tab1:
-        news = get_financial_news(10)
+        news = get_latest_news(10)
         
         for i, item in enumerate(news):
             with st.container():
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Keep the stores of the test run out of the working tree; set before utils is imported
+_data_dir = tempfile.mkdtemp(prefix='traid-tests-')
+os.environ.setdefault('TRAID_STORE_DIR', os.path.join(_data_dir, 'ohlcv'))
+os.environ.setdefault('TRAID_NEWS_DB_PATH', os.path.join(_data_dir, 'news.db'))
+os.environ.setdefault('TRAID_DB_PATH', os.path.join(_data_dir, 'usuarios.db'))
+os.environ.setdefault('TRAID_ACCUMULATOR_PATH', os.path.join(_data_dir, 'accumulators.json'))
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from utils import finance
+from utils.accumulators import AccumulatorBook, StreamingStats
+
+
+def test_extend_matches_one_update_at_a_time():
+    values = 100 * np.exp(np.random.default_rng(0).normal(0, 0.01, 300).cumsum())
+    times = pd.date_range('2024-01-01', periods=300, freq='D')
+    one_by_one = StreamingStats()
+    for value, time in zip(values, times):
+        one_by_one.update(value, time)
+    batched = StreamingStats()
+    batched.extend(values[:120], times[:120])
+    batched.extend(values[100:], times[100:])  # Overlap is skipped
+    for field, expected in one_by_one.snapshot().items():
+        assert batched.snapshot()[field] == expected, field
+
+
+def test_a_revised_last_value_replaces_the_partial_one(tmp_path):
+    times = pd.date_range('2024-01-01', periods=6, freq='h')
+    final = [100.0, 101.0, 99.0, 102.0, 98.0, 103.0]
+    expected = StreamingStats()
+    expected.extend(final, times)
+
+    # Each bar arrives partial first, then again with its final close
+    revised = StreamingStats()
+    revised.extend([100.0, 101.0, 120.0], times[:3])
+    assert revised.update(80.0, times[2]) and revised.update(99.0, times[2])
+    assert not revised.update(50.0, times[1])
+    revised.extend([99.0, 102.0, 90.0], times[2:5])
+    revised.extend([98.0, 103.0], times[4:])
+    assert revised.snapshot() == expected.snapshot()
+
+    # The state before the last value survives a checkpoint
+    book = AccumulatorBook(str(tmp_path / 'accumulators.json'))
+    book.extend('ticker', 'ABC', [100.0, 101.0, 120.0], times[:3])
+    book.checkpoint()
+    reloaded = AccumulatorBook(book.path)
+    assert reloaded.update('ticker', 'ABC', 99.0, times[2])
+    partial = StreamingStats()
+    partial.extend(final[:3], times[:3])
+    assert reloaded.get('ticker', 'ABC').snapshot() == partial.snapshot()
+
+
+def test_snapshot_reseed_carries_the_last_value_forward(monkeypatch, tmp_path):
+    book = AccumulatorBook(str(tmp_path / 'accumulators.json'))
+    monkeypatch.setattr(finance, 'get_accumulators', lambda: book)
+    today = pd.Timestamp.now().normalize()
+
+    yesterday = pd.date_range(end=today - pd.Timedelta(days=1), periods=30, freq='D')
+    monkeypatch.setattr(finance, 'get_portfolio_metrics',
+                        lambda: {'date': yesterday, 'value': np.linspace(100, 110, 30)})
+    assert finance.get_portfolio_snapshot()['current_value'] == 110
+
+    # Today's history is redrawn at another level; only its last move is new
+    redrawn = pd.date_range(end=today, periods=30, freq='D')
+    values = np.linspace(190, 218, 30)
+    monkeypatch.setattr(finance, 'get_portfolio_metrics', lambda: {'date': redrawn, 'value': values})
+    snapshot = finance.get_portfolio_snapshot()
+    assert snapshot['current_value'] == int(110 * values[-1] / values[-2])
+    assert snapshot['growth_pct'] == round((110 * values[-1] / values[-2] / 100 - 1) * 100, 2)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from utils import correlation
+from utils.correlation import BlockedCorrelation, CorrelationService
+
+N_SERIES = 7
+BLOCK = 3
+
+
+def _series(n_dates, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=n_dates, freq='D')
+    returns = rng.normal(0, 0.01, (N_SERIES, n_dates)) + rng.normal(0, 0.01, n_dates)
+    return [f"S{i}" for i in range(N_SERIES)], dates, returns
+
+
+def _assert_matches_corrcoef(matrix, tickers, returns):
+    np.testing.assert_allclose(matrix.correlation(tickers).to_numpy(), np.corrcoef(returns), atol=1e-10)
+
+
+def test_matches_corrcoef_for_any_selection():
+    tickers, dates, returns = _series(120)
+    matrix = BlockedCorrelation(tickers, dates, returns, block_size=BLOCK)
+    _assert_matches_corrcoef(matrix, tickers, returns)
+
+    picked = [5, 0, 3, 6]
+    expected = np.corrcoef(returns[picked])
+    np.testing.assert_allclose(matrix.correlation([tickers[i] for i in picked]).to_numpy(), expected, atol=1e-10)
+
+
+def test_sliding_update_matches_a_rebuild():
+    tickers, dates, returns = _series(130)
+    matrix = BlockedCorrelation(tickers, dates[:120], returns[:, :120], block_size=BLOCK)
+    matrix.correlation(tickers)  # Build every block before sliding
+
+    assert matrix.update(dates[10:], returns[:, 10:])
+    _assert_matches_corrcoef(matrix, tickers, returns[:, 10:])
+
+
+def test_revised_last_return_is_replaced():
+    tickers, dates, returns = _series(121)
+    partial = returns[:, :120].copy()
+    partial[:, -1] *= -4  # Last return from a bar still in progress
+    matrix = BlockedCorrelation(tickers, dates[:120], partial, block_size=BLOCK)
+    matrix.correlation(tickers)
+
+    # The bar closed (revising the last return) and one more arrived
+    assert matrix.update(dates[1:], returns[:, 1:])
+    _assert_matches_corrcoef(matrix, tickers, returns[:, 1:])
+
+    # A later slide subtracts the revised values, not the partial ones
+    more_tickers, more_dates, more = _series(140)
+    more[:, :121] = returns
+    assert matrix.update(more_dates[15:], more[:, 15:])
+    _assert_matches_corrcoef(matrix, tickers, more[:, 15:])
+
+
+def test_added_series_join_cached_blocks():
+    tickers, dates, returns = _series(90)
+    matrix = BlockedCorrelation(tickers[:4], dates, returns[:4], block_size=BLOCK)
+    matrix.correlation(tickers[:4])
+    matrix.add(tickers[4:], returns[4:])
+    _assert_matches_corrcoef(matrix, tickers, returns)
+
+
+def test_service_fetches_outside_its_lock_and_only_new_tickers(monkeypatch):
+    tickers, dates, returns = _series(90)
+    rows = dict(zip(tickers, returns))
+    service = CorrelationService(block_size=BLOCK)
+    loads = []
+
+    def load(requested, period):
+        assert not service._lock.locked()
+        loads.append(list(requested))
+        return list(requested), dates, np.array([rows[ticker] for ticker in requested])
+
+    monkeypatch.setattr(service, '_load', load)
+    monkeypatch.setattr(correlation, 'date_bucket', lambda freq: 'bucket-1')
+    service.get(tickers[:4])
+    service.get(tickers[2:6])
+    service.get(tickers[:6])
+    assert loads == [tickers[:4], tickers[4:6]]
+
+    # A new bucket refetches the known tickers and the new one in one call
+    monkeypatch.setattr(correlation, 'date_bucket', lambda freq: 'bucket-2')
+    matrix = service.get(tickers)
+    assert loads[-1] == tickers
+    _assert_matches_corrcoef(matrix, tickers, returns)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from utils.finance import get_stock_data, get_stock_data_batch
+
+TICKERS = ['MSFT', 'BND', 'PANEL1']
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+@pytest.mark.parametrize('period', ['1d', '1mo', '2y'])
+def test_batch_rows_match_single_tickers(period):
+    panel = get_stock_data_batch(TICKERS + ['MSFT'], period)
+    assert panel['tickers'] == TICKERS
+    for row, ticker in enumerate(TICKERS):
+        frame = get_stock_data(ticker, period)
+        np.testing.assert_array_equal(panel['Date'], frame['Date'])
+        for field in FIELDS:
+            np.testing.assert_allclose(panel[field][row], frame[field].to_numpy(dtype=np.float64), rtol=1e-12)
+
+
+def test_batch_without_the_store_matches():
+    stored = get_stock_data_batch(TICKERS, '3mo')
+    direct = get_stock_data_batch(TICKERS, '3mo', use_store=False)
+    np.testing.assert_array_equal(stored['Date'], direct['Date'])
+    for field in FIELDS:
+        np.testing.assert_allclose(stored[field], direct[field], rtol=1e-12)
+
+
+def test_warm_calls_skip_the_refresh_until_the_next_bucket(monkeypatch):
+    from utils import finance
+
+    bucket = finance._revision_bucket()
+    monkeypatch.setattr(finance, '_revision_bucket', lambda: bucket)
+    first = get_stock_data('WARM', '1mo')
+    store = finance._provider_store()
+    looked_up = []
+    monkeypatch.setattr(store, 'bounds', lambda *key: looked_up.append(key))
+
+    warm = get_stock_data('WARM', '1mo')
+    assert looked_up == []
+    np.testing.assert_array_equal(warm['Close'], first['Close'])
+
+    monkeypatch.setattr(finance, '_revision_bucket', lambda: bucket + 1)
+    get_stock_data('WARM', '1mo')
+    assert looked_up == [('WARM', '1D')]
+
+
+def test_compact_mode_keeps_the_values():
+    from utils.finance import COMPACT_DTYPES, get_portfolio_metrics
+
+    full = get_stock_data('MSFT', '1mo')
+    compact = get_stock_data('MSFT', '1mo', compact=True)
+    assert {name: compact[name].dtype for name in compact} == {name: np.dtype(t) for name, t in COMPACT_DTYPES.items()}
+    np.testing.assert_array_equal(compact['Date'], full['Date'].to_numpy().astype('datetime64[ns]').view(np.int64))
+    np.testing.assert_allclose(compact['Close'], full['Close'], rtol=1e-6)
+    np.testing.assert_array_equal(compact['Volume'], full['Volume'])
+
+    panel = get_stock_data_batch(TICKERS, '1mo', compact=True)
+    assert panel['Date'].dtype == np.int64 and panel['Close'].dtype == np.float32
+    np.testing.assert_allclose(panel['Close'][0], compact['Close'], rtol=1e-6)
+
+    metrics = get_portfolio_metrics(compact=True)
+    assert metrics['value'].dtype == np.float32 and 'value_series' not in metrics
+    np.testing.assert_allclose(metrics['value'], get_portfolio_metrics()['value'], rtol=1e-6)
+
+
+def test_stream_sends_quotes_first_and_then_only_new_bars():
+    import asyncio
+
+    import pandas as pd
+
+    from utils.finance import _poll_market_data, astream_market_data, stream_market_data
+
+    updates = list(stream_market_data(['MSFT', 'BND', 'MSFT'], '1d', interval=0, max_updates=2))
+    assert len(updates) == 2
+    first = updates[0]
+    assert first['bars'] == {}
+    assert list(first['quotes']) == ['MSFT', 'BND']
+    history = get_stock_data('MSFT', '1d')
+    assert history['Low'].iloc[-1] <= first['quotes']['MSFT']['price'] <= history['High'].iloc[-1]
+
+    # A subscriber that last saw an older bar gets everything after it, and
+    # that bar too if it was sent with a different close
+    sent = int(pd.Timestamp(history['Date'].iloc[-4]).value)
+    close = float(history['Close'].iloc[-4])
+    for sent_close, rows in ((close, 3), (close + 1, 4)):
+        last_seen = {'MSFT': (sent, sent_close)}
+        bars = _poll_market_data(['MSFT'], '1d', last_seen)['bars']['MSFT']
+        np.testing.assert_array_equal(bars['Date'], history['Date'].iloc[-rows:])
+        np.testing.assert_allclose(bars['Close'], history['Close'].iloc[-rows:], rtol=1e-12)
+        assert last_seen['MSFT'] == (int(pd.Timestamp(history['Date'].iloc[-1]).value), float(history['Close'].iloc[-1]))
+
+    async def collect():
+        return [update async for update in astream_market_data('MSFT', '1d', interval=0, max_updates=1)]
+
+    (update,) = asyncio.run(collect())
+    assert update['bars'] == {} and list(update['quotes']) == ['MSFT']
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import funds
+from utils.funds import FUND_FIELDS, FundUniverse, generate_fund_columns, get_fund_universe
+
+COLUMNS = generate_fund_columns(3000, np.random.default_rng(5))
+
+
+def _frame():
+    return pd.DataFrame(COLUMNS)
+
+
+def test_universe_is_shared_and_read_only():
+    universe = get_fund_universe()
+    assert get_fund_universe() is universe
+    with pytest.raises(ValueError):
+        universe.columns['one_year_return'][0] = 0.0
+
+    records = universe.top(3)
+    records[0]['one_year_return'] = -999
+    assert universe.top(3)[0]['one_year_return'] != -999
+    assert list(records[1]) == FUND_FIELDS
+
+
+def test_universe_is_rebuilt_in_a_new_bucket(monkeypatch):
+    universe = get_fund_universe()
+    monkeypatch.setattr(funds, 'date_bucket', lambda freq: 'another day')
+    assert get_fund_universe() is not universe
+
+
+def test_top_matches_a_stable_sort():
+    universe = FundUniverse(COLUMNS)
+    frame = _frame()
+    for category in (None, 'Global', 'esg', 'Unknown'):
+        subset = frame if category is None else frame[frame.category.str.lower() == category.lower()]
+        for key, ascending in (('one_year_return', False), ('expense_ratio', True), ('risk_score', False)):
+            expected = subset.sort_values(key, ascending=ascending, kind='stable')
+            if not ascending:
+                # Ties by row number, as with ascending order
+                expected = subset.iloc[np.lexsort((np.arange(len(subset)), -subset[key].to_numpy()))]
+            top = universe.top(25, category, key, ascending)
+            assert [fund['ticker'] for fund in top] == expected['ticker'].head(25).tolist(), (category, key)
+
+
+def _brute_screen(frame, filters, match, category):
+    masks = []
+    for field, (low, high) in filters.items():
+        mask = np.ones(len(frame), dtype=bool)
+        if low is not None:
+            mask &= frame[field].to_numpy() >= low
+        if high is not None:
+            mask &= frame[field].to_numpy() <= high
+        masks.append(mask)
+    keep = np.ones(len(frame), dtype=bool)
+    if masks:
+        keep = np.logical_and.reduce(masks) if match == 'all' else np.logical_or.reduce(masks)
+    if category:
+        keep &= frame.category.str.lower().to_numpy() == category.lower()
+    return np.flatnonzero(keep)
+
+
+SCREENS = [
+    ({}, 'all', None),
+    ({'volatility': (None, 12)}, 'all', None),
+    ({'volatility': (None, 12), 'risk_score': (1, 3), 'aum': (500, None)}, 'all', None),
+    ({'volatility': (None, 6), 'expense_ratio': (1.4, None)}, 'any', 'Technology'),
+    ({'sharpe_ratio': (3, None)}, 'all', None),
+    ({}, 'all', 'Sector'),
+]
+
+
+@pytest.mark.parametrize('filters, match, category', SCREENS)
+def test_screen_matches_a_full_scan(filters, match, category):
+    universe = FundUniverse(COLUMNS)
+    frame = _frame()
+    expected = _brute_screen(frame, filters, match, category)
+    assert sorted(universe.matches(filters, match, category).tolist()) == expected.tolist()
+
+    for sort_by, ascending in (('one_year_return', False), ('volatility', True)):
+        values = frame[sort_by].to_numpy()[expected]
+        ranked = expected[np.lexsort((expected, values if ascending else -values))]
+        paged = []
+        for offset in range(0, len(ranked) + 40, 40):
+            rows, total = universe.screen(filters, match, category, sort_by, ascending, 40, offset)
+            assert total == len(ranked)
+            paged += rows.tolist()
+        assert paged == ranked.tolist()
+
+
+def test_screen_rejects_unknown_fields_and_modes():
+    universe = FundUniverse(COLUMNS)
+    with pytest.raises(ValueError):
+        universe.matches({'name': (None, 'M')})
+    with pytest.raises(ValueError):
+        universe.screen({'aum': (1, 2)}, match='some')
+
+
+def test_generated_columns_follow_the_fund_list():
+    regular = pd.DataFrame(funds._generate_funds())
+    generated = _frame()
+    assert list(generated.columns) == FUND_FIELDS
+    assert generated.ticker.str.fullmatch('[A-Z]{3,5}').all()
+
+    # Every subcategory sits in its own category and appears in the name
+    category_of = {sub: category for category, subs in funds.FUND_CATEGORIES.items() for sub in subs}
+    assert (generated.subcategory.map(category_of) == generated.category).all()
+    assert all(sub in name for sub, name in zip(generated.subcategory, generated.name))
+
+    for field in funds.SCREEN_FIELDS:
+        low, high = regular[field].min(), regular[field].max()
+        spread = high - low
+        assert generated[field].min() >= low - 0.1 * spread and generated[field].max() <= high + 0.1 * spread, field
+    assert set(generated.min_investment) <= set(funds.MIN_INVESTMENTS)
+    assert set(generated.risk_score) <= {1, 2, 3, 4, 5}
+    age = pd.Timestamp.now().normalize() - pd.to_datetime(generated.inception_date)
+    assert age.dt.days.between(365, 7300).all()
+
+
+def test_generated_universe_is_keyed_on_its_size():
+    first, second = generate_fund_columns(500), generate_fund_columns(500)
+    for field in FUND_FIELDS:
+        np.testing.assert_array_equal(first[field], second[field])
+    assert not np.array_equal(generate_fund_columns(501)['aum'][:500], first['aum'])
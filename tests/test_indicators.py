@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from utils.indicators import DEFAULT_INDICATORS, IndicatorState, compute_indicators
+
+INDICATORS = DEFAULT_INDICATORS + ['sma_5', 'rsi_3', 'bbands_5']
+BARS = 80
+
+
+def _panel(seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (3, BARS)), axis=1))
+    spread = rng.uniform(0.001, 0.02, close.shape)
+    return {'High': close * (1 + spread), 'Low': close * (1 - spread), 'Close': close}
+
+
+def _head(panel, bars):
+    return {field: values[:, :bars] for field, values in panel.items()}
+
+
+@pytest.mark.parametrize('seed_bars', [0, 1, 2, 40])
+def test_updates_match_the_batch_indicators(seed_bars):
+    panel = _panel()
+    state = IndicatorState(_head(panel, seed_bars), INDICATORS)
+    for t in range(seed_bars, BARS):
+        values = state.update({field: column[:, t] for field, column in panel.items()})
+        expected = compute_indicators(_head(panel, t + 1), INDICATORS)
+        for name, series in expected.items():
+            np.testing.assert_allclose(values[name], series[:, -1], rtol=1e-9, err_msg=f"{name} at bar {t}")
+
+
+def test_short_histories_seed_without_errors():
+    panel = _panel(1)
+    state = IndicatorState(_head(panel, 1), INDICATORS)
+    assert np.isnan(state.values['rsi_14']).all()
+    np.testing.assert_allclose(state.values['ema_20'], panel['Close'][:, 0])
+
+    empty = IndicatorState(_head(panel, 0), INDICATORS)
+    assert all(np.isnan(values).all() for values in empty.values.values())
+    assert empty.values['ema_20'].shape == (3,)
@@ -0,0 +1,116 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ledger import (LEDGER_COLUMNS, cost_basis, demo_transactions, get_ledger_summary, load_transactions,
+                          recent_transactions, record_transactions)
+
+
+def _ledger(seed=0, rows=300):
+    """Random buys, sells (never more than held) and dividends over a few tickers."""
+    rng = np.random.default_rng(seed)
+    held = {ticker: 0.0 for ticker in ('AAA', 'BBB', 'CCC')}
+    records = []
+    start = pd.Timestamp('2024-01-01')
+    for i in range(rows):
+        ticker = str(rng.choice(list(held)))
+        kind = str(rng.choice(['buy', 'buy', 'sell', 'dividend']))
+        shares = float(rng.integers(1, 20))
+        if kind == 'sell':
+            # Sometimes close the whole position, so lots reopen later
+            shares = held[ticker] if rng.random() < 0.2 else min(shares, held[ticker])
+            if shares == 0:
+                continue
+        if kind == 'dividend' and held[ticker] == 0:
+            continue
+        if kind != 'dividend':
+            held[ticker] += shares if kind == 'buy' else -shares
+        records.append({'ticker': ticker, 'type': kind, 'shares': shares, 'price': float(rng.uniform(10, 100)),
+                        'fees': float(rng.choice([0.0, 1.0])), 'timestamp': start + pd.Timedelta(hours=i)})
+    # Shuffled: cost_basis orders by ticker and time itself
+    return pd.DataFrame(records).sample(frac=1, random_state=seed)
+
+
+def _reference(frame, method):
+    """Lot-by-lot FIFO, or running average cost, one row at a time."""
+    realized = pd.Series(0.0, index=frame.index)
+    lots, cost_held, shares_held = {}, {}, {}
+    for index, row in frame.sort_values('timestamp', kind='stable').iterrows():
+        queue = lots.setdefault(row.ticker, deque())
+        if row.type == 'buy':
+            queue.append([row.shares, (row.shares * row.price + row.fees) / row.shares])
+            cost_held[row.ticker] = cost_held.get(row.ticker, 0.0) + row.shares * row.price + row.fees
+            shares_held[row.ticker] = shares_held.get(row.ticker, 0.0) + row.shares
+        elif row.type == 'sell':
+            if method == 'fifo':
+                left, cost = row.shares, 0.0
+                while left > 1e-12:
+                    take = min(left, queue[0][0])
+                    cost += take * queue[0][1]
+                    queue[0][0] -= take
+                    left -= take
+                    if queue[0][0] <= 1e-12:
+                        queue.popleft()
+            else:
+                cost = cost_held[row.ticker] * row.shares / shares_held[row.ticker]
+            cost_held[row.ticker] -= cost
+            shares_held[row.ticker] -= row.shares
+            realized[index] = row.shares * row.price - row.fees - cost
+    if method == 'fifo':
+        cost_held = {ticker: sum(shares * price for shares, price in queue) for ticker, queue in lots.items()}
+    return realized, cost_held
+
+
+@pytest.mark.parametrize('method', ['fifo', 'average'])
+def test_cost_basis_matches_a_lot_by_lot_loop(method):
+    frame = _ledger()
+    result = cost_basis(frame, method, prices={'AAA': 50.0, 'BBB': 60.0})
+    realized, cost_held = _reference(frame, method)
+    np.testing.assert_allclose(result['realized'], realized, atol=1e-8)
+    positions = result['positions'].set_index('Ticker')
+    for ticker, cost in cost_held.items():
+        expected = cost if positions.loc[ticker, 'Shares'] > 0 else 0.0
+        assert abs(positions.loc[ticker, 'Cost Basis'] - expected) < 0.006
+    dividends = frame[frame.type == 'dividend']
+    assert result['dividends'] == round(float((dividends.shares * dividends.price - dividends.fees).sum()), 2)
+    assert np.isnan(positions.loc['CCC', 'Price'])
+
+
+def test_sales_beyond_the_holding_are_rejected():
+    frame = pd.DataFrame({'ticker': ['AAA', 'AAA'], 'type': ['buy', 'sell'], 'shares': [5.0, 6.0],
+                          'price': [10.0, 11.0], 'timestamp': pd.to_datetime(['2024-01-01', '2024-01-02'])})
+    with pytest.raises(ValueError):
+        cost_basis(frame)
+
+
+def test_ledger_round_trip(tmp_path):
+    db = str(tmp_path / 'ledger.db')
+    frame = _ledger(1, rows=50)
+    assert record_transactions(7, frame, db) == len(frame)
+    record_transactions(8, frame.head(3), db)
+
+    loaded = load_transactions(7, db_path=db)
+    assert len(loaded) == len(frame)
+    expected = frame.assign(ticker=frame.ticker.str.upper()).sort_values(['ticker', 'timestamp'])
+    np.testing.assert_array_equal(loaded['timestamp'], expected['timestamp'])
+    np.testing.assert_allclose(loaded['shares'], expected['shares'])
+    assert list(load_transactions(7, 'aaa', db)['ticker'].unique()) == ['AAA']
+
+    latest = recent_transactions(7, 5, db)
+    assert list(latest['timestamp']) == sorted(frame['timestamp'], reverse=True)[:5]
+    summary = get_ledger_summary(7, db_path=db)
+    assert summary['realized_pnl'] == cost_basis(frame)['realized_pnl']
+    with pytest.raises(ValueError):
+        record_transactions(7, [{'ticker': 'AAA', 'type': 'split', 'shares': 1, 'price': 1}], db)
+
+
+def test_demo_operations_are_never_stored(tmp_path):
+    db = str(tmp_path / 'ledger.db')
+    assert recent_transactions(3, 3, db).empty
+    demo = demo_transactions(limit=2)
+    assert list(demo.columns) == LEDGER_COLUMNS
+    assert len(demo) == 2 and demo['timestamp'].is_monotonic_decreasing
+    assert demo['timestamp'].dtype == recent_transactions(3, 3, db)['timestamp'].dtype
+    assert load_transactions(3, db_path=db).empty
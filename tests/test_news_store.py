@@ -0,0 +1,96 @@
+import pandas as pd
+
+from utils import news_store
+from utils.news_store import content_hash, ingest_articles, iter_news, latest_articles, news_page, news_version, search_articles
+
+
+def _article(i, **fields):
+    article = {
+        'title': f"Story {i} about rates",
+        'summary': f"Summary of story {i}.",
+        'source': 'Wire' if i % 2 else 'Daily',
+        'date': (pd.Timestamp('2024-03-01') + pd.Timedelta(hours=i)).isoformat(),
+    }
+    article.update(fields)
+    return article
+
+
+def test_default_database_lives_in_the_data_dir():
+    assert news_store.NEWS_DB_PATH.endswith('news.db')
+    assert news_store.NEWS_DB_PATH != 'news.db'
+
+
+def test_same_content_is_stored_once(tmp_path):
+    db = str(tmp_path / 'news' / 'news.db')
+    assert ingest_articles([_article(i) for i in range(5)], db_path=db) == 5
+
+    # Same story again: other source, spacing, case and punctuation
+    repost = _article(3, title='STORY 3   about rates!', source='Syndicate', url='https://example.com/3')
+    assert content_hash(repost) == content_hash(_article(3))
+    assert ingest_articles([repost, _article(5)], db_path=db) == 1
+    assert len(latest_articles(limit=100, db_path=db)) == 6
+
+
+def test_latest_articles_by_ticker_and_source(tmp_path):
+    db = str(tmp_path / 'news.db')
+    ingest_articles([_article(i, tickers=['aapl'] if i < 3 else ['MSFT']) for i in range(6)], db_path=db)
+    ingest_articles([_article(1)], tickers=['NVDA'], db_path=db)  # Links the stored copy
+
+    latest = latest_articles(limit=3, db_path=db)
+    assert [a['title'] for a in latest] == ['Story 5 about rates', 'Story 4 about rates', 'Story 3 about rates']
+    assert [a['title'] for a in latest_articles(['AAPL'], db_path=db)] == [f'Story {i} about rates' for i in (2, 1, 0)]
+    assert [a['title'] for a in latest_articles(['nvda'], db_path=db)] == ['Story 1 about rates']
+    assert {a['source'] for a in latest_articles(source='Wire', db_path=db)} == {'Wire'}
+
+
+def test_search_matches_words_and_prefixes(tmp_path):
+    db = str(tmp_path / 'news.db')
+    ingest_articles([
+        _article(0, title='Fed holds interest rates', summary='Policy unchanged.'),
+        _article(1, title='Chipmakers rally', summary='Semiconductor stocks climb.', tickers=['NVDA']),
+        _article(2, title='Oil slips', summary='Crude falls as the Fed speaks.'),
+    ], db_path=db)
+    assert {a['title'] for a in search_articles('fed', db_path=db)} == {'Fed holds interest rates', 'Oil slips'}
+    assert [a['title'] for a in search_articles('semicond', db_path=db)] == ['Chipmakers rally']
+    assert search_articles('semicond', tickers=['MSFT'], db_path=db) == []
+    assert search_articles('  ', db_path=db) == []
+
+
+def test_pages_follow_the_full_order(tmp_path):
+    db = str(tmp_path / 'news.db')
+    # Several articles share a timestamp, so the cursor must break ties by id
+    ingest_articles([_article(i, date=f'2024-03-0{1 + i % 3}') for i in range(23)], db_path=db)
+    full = latest_articles(limit=100, db_path=db)
+    assert len(full) == 23
+
+    paged, cursor = [], None
+    while True:
+        articles, cursor = news_page(cursor=cursor, page_size=5, db_path=db)
+        paged += articles
+        if cursor is None:
+            break
+    assert [a['id'] for a in paged] == [a['id'] for a in full]
+
+    recent = news_page(since='2024-03-02', page_size=100, db_path=db)[0]
+    assert [a['id'] for a in recent] == [a['id'] for a in full if a['published'] >= pd.Timestamp('2024-03-02')]
+
+
+def test_iter_news_resumes_from_an_article_cursor(tmp_path, monkeypatch):
+    db = str(tmp_path / 'news.db')
+    monkeypatch.setattr(news_store, 'refresh_market_news', lambda db_path: 0)
+    ingest_articles([_article(i) for i in range(12)], db_path=db)
+    articles = list(iter_news(page_size=4, db_path=db))
+    assert [a['title'] for a in articles] == [f'Story {i} about rates' for i in range(11, -1, -1)]
+    rest = list(iter_news(cursor=articles[6]['cursor'], page_size=4, db_path=db))
+    assert [a['id'] for a in rest] == [a['id'] for a in articles[7:]]
+
+
+def test_version_changes_only_with_new_articles(tmp_path):
+    db = str(tmp_path / 'news.db')
+    assert news_version(db) == 0
+    ingest_articles([_article(i) for i in range(3)], db_path=db)
+    version = news_version(db)
+    ingest_articles([_article(1)], tickers=['AAPL'], db_path=db)
+    assert news_version(db) == version
+    ingest_articles([_article(3)], db_path=db)
+    assert news_version(db) > version
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from utils.finance import periods_per_year
+from utils.optimizer import CovarianceCache, ShrinkageCovariance
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+
+
+def _returns(n, seed=0):
+    return np.random.default_rng(seed).normal(0, 0.01, (n, len(TICKERS)))
+
+
+def _assert_same_estimate(estimator, returns):
+    expected = ShrinkageCovariance(returns)
+    assert estimator.count == expected.count
+    np.testing.assert_allclose(estimator.estimate()[0], expected.estimate()[0], rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(estimator.mean(), expected.mean(), atol=1e-15)
+
+
+def test_periods_do_not_share_an_estimator():
+    cache = CovarianceCache()
+    weekly = pd.date_range('2024-01-07', periods=260, freq='W')
+    every_third = pd.date_range('2024-01-01', periods=243, freq='3D')
+    first = cache.get(TICKERS, weekly, _returns(260, 1), '5y')
+    second = cache.get(TICKERS, every_third, _returns(243, 2), '2y')
+    assert first is not second
+    _assert_same_estimate(cache.get(TICKERS, weekly, _returns(260, 1), '5y'), _returns(260, 1))
+
+
+def test_revised_last_row_is_refolded():
+    cache = CovarianceCache()
+    dates = pd.date_range('2024-01-01', periods=101, freq='D')
+    returns = _returns(101)
+    partial = returns[:100].copy()
+    partial[-1] *= 3  # Last row from a bar still in progress
+    cache.get(TICKERS, dates[:100], partial, '1y')
+
+    # A day later: the window slid by one, the old last row was revised and a new one arrived
+    slid = cache.get(TICKERS, dates[1:], returns[1:], '1y')
+    _assert_same_estimate(slid, returns[1:])
+
+
+def test_annualization_follows_the_bar_length():
+    assert periods_per_year('1y') == 252
+    assert periods_per_year('2y') == 84
+    assert periods_per_year('5y') == 36
+    assert periods_per_year('1d') == 252 * 24
@@ -0,0 +1,44 @@
+from utils.finance import get_fund_page, screen_funds
+from utils.paging import PageCache, page_cursors
+
+
+def test_cursors_around_a_page():
+    assert page_cursors(0, 9, 20) == {'cursor': 0, 'next_cursor': 9, 'prev_cursor': None, 'page': 1, 'pages': 3}
+    assert page_cursors(18, 9, 20) == {'cursor': 18, 'next_cursor': None, 'prev_cursor': 9, 'page': 3, 'pages': 3}
+    # Past the end clamps to the last page; an empty list has one empty page
+    assert page_cursors(50, 9, 20)['cursor'] == 18
+    assert page_cursors(3, 9, 0) == {'cursor': 0, 'next_cursor': None, 'prev_cursor': None, 'page': 1, 'pages': 1}
+    assert page_cursors(4, 9, 20)['prev_cursor'] == 0
+
+
+def test_page_cache_versions_and_eviction():
+    cache = PageCache(max_pages=2)
+    version, calls = object(), []
+
+    def build(value):
+        calls.append(value)
+        return value
+
+    assert cache.get('a', version, lambda: build(1)) == 1
+    assert cache.get('a', version, lambda: build(2)) == 1
+    assert cache.get('a', object(), lambda: build(3)) == 3  # Another version, even if equal, rebuilds
+    cache.get('b', version, lambda: build(4))
+    cache.get('c', version, lambda: build(5))  # Evicts 'a', the least recently used
+    cache.get('b', version, lambda: build(6))
+    cache.get('a', version, lambda: build(7))
+    assert calls == [1, 3, 4, 5, 7]
+
+
+def test_walking_the_cursors_covers_the_screen_once():
+    filters = {'risk_score': (2, 4)}
+    expected = screen_funds(filters, sort_by='volatility', ascending=True, limit=None)
+    seen, cursor = [], 0
+    while cursor is not None:
+        page = get_fund_page(filters=filters, sort_by='volatility', ascending=True, cursor=cursor, page_size=7)
+        assert page['total'] == expected['total']
+        seen += [(fund['ticker'], fund['name']) for fund in page['funds']]
+        cursor = page['next_cursor']
+    assert seen == [(fund['ticker'], fund['name']) for fund in expected['funds']]
+
+    last = get_fund_page(filters=filters, cursor=10 ** 6, page_size=7)
+    assert last['next_cursor'] is None and last['page'] == last['pages']
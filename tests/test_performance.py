@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from utils.performance import align_series, get_benchmark_series, get_relative_performance, relative_performance
+
+
+def _portfolio():
+    dates = pd.date_range('2024-01-01', periods=60, freq='D')
+    values = 1000 * np.exp(np.cumsum(np.random.default_rng(0).normal(0.001, 0.01, len(dates))))
+    return pd.Series(values, index=dates, name='Mine')
+
+
+def test_align_is_an_as_of_join():
+    portfolio = _portfolio()
+    # Trading days only, starting after the portfolio
+    bench = pd.Series(np.arange(40.0) + 100, index=pd.bdate_range('2024-01-05', periods=40))
+    aligned = align_series(portfolio, {'B': bench})
+    expected = pd.merge_asof(portfolio.rename('Mine').to_frame(), bench.rename('B').to_frame(),
+                             left_index=True, right_index=True).dropna()
+    assert aligned.index[0] == pd.Timestamp('2024-01-05')
+    pd.testing.assert_frame_equal(aligned, expected, check_freq=False, check_index_type=False)
+
+
+def test_relative_performance_matches_pandas():
+    portfolio = _portfolio()
+    bench = portfolio * np.exp(np.random.default_rng(1).normal(0, 0.005, len(portfolio)).cumsum())
+    aligned = align_series(portfolio, {'B': bench})
+    result = relative_performance(aligned)
+
+    cumulative = (aligned / aligned.iloc[0] - 1) * 100
+    np.testing.assert_allclose(result['cumulative'], cumulative)
+    np.testing.assert_allclose(result['excess']['B'], cumulative['Mine'] - cumulative['B'])
+    active = aligned['Mine'].pct_change() - aligned['B'].pct_change()
+    assert result['tracking_error']['B'] == round(active.std() * np.sqrt(252) * 100, 2)
+    assert result['information_ratio']['B'] == round(active.mean() / active.std() * np.sqrt(252), 2)
+
+
+def test_benchmark_series_is_shared():
+    assert get_benchmark_series('spy', '1mo') is get_benchmark_series('SPY', '1mo')
+    series = get_benchmark_series('SPY', '1y')
+    result = get_relative_performance(series.rename('Copy') * 3, ['SPY'])
+    assert result['tracking_error']['SPY'] == 0.0
+    assert np.allclose(result['excess']['SPY'], 0.0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from utils.portfolio import get_portfolio_valuation, value_positions
+
+DATES = pd.date_range('2024-05-27', periods=10, freq='D')
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, (3, len(DATES))), axis=1))
+    close[2, :4] = np.nan  # Listed on the fifth day
+    return {'tickers': ['AAA', 'BBB', 'CCC'], 'Date': DATES, 'Close': close}
+
+
+POSITIONS = [
+    {'symbol': 'aaa', 'shares': 10, 'cost_basis': 40.0},
+    {'symbol': 'AAA', 'shares': 5, 'cost_basis': 60.0},
+    {'symbol': 'BBB', 'shares': 8, 'cost_basis': 50.0, 'asset_class': 'Bonds'},
+    {'symbol': 'CCC', 'shares': 3, 'cost_basis': 55.0},
+    {'symbol': 'CASH', 'shares': 1000, 'cost_basis': 1.0, 'asset_class': 'Cash'},
+    {'symbol': 'ZZZ', 'shares': 7, 'cost_basis': 10.0},
+]
+
+
+def test_values_match_a_loop_over_positions():
+    panel = _panel()
+    valuation = value_positions(POSITIONS, panel)
+    close = np.nan_to_num(panel['Close'])
+    expected = np.zeros(len(DATES))
+    by_class = {}
+    for position in POSITIONS:
+        symbol = position['symbol'].upper()
+        if position.get('asset_class') == 'Cash':
+            values = np.full(len(DATES), float(position['shares']))
+        elif symbol in panel['tickers']:
+            values = position['shares'] * close[panel['tickers'].index(symbol)]
+        else:
+            continue  # No prices: left out
+        expected += values
+        asset_class = position.get('asset_class', 'Stocks')
+        by_class[asset_class] = by_class.get(asset_class, 0) + values
+
+    np.testing.assert_allclose(valuation['value'], expected)
+    for asset_class, values in by_class.items():
+        np.testing.assert_allclose(valuation['class_values'][asset_class], values)
+    np.testing.assert_allclose(valuation['returns'], expected[1:] / expected[:-1] - 1)
+    assert valuation['total_value'] == round(expected[-1], 2)
+    assert abs(sum(valuation['allocation'].values()) - 100) < 0.05
+
+    table = valuation['positions']
+    assert list(table['Value'])[:2] == [round(10 * close[0, -1], 2), round(5 * close[0, -1], 2)]
+    assert table['Value'].iloc[-1] == 0.0
+
+
+def test_month_to_date_is_against_the_last_value_before_the_month():
+    valuation = value_positions(POSITIONS, _panel())
+    value = valuation['value']
+    # DATES run from May 27 to June 5; the base is May 31
+    expected = (value[-1] / value[4] - 1) * 100
+    assert valuation['mtd_return_pct'] == round(expected, 2)
+
+
+def test_valuation_from_the_provider():
+    valuation = get_portfolio_valuation(period='1mo')
+    assert valuation is not None
+    assert len(valuation['value']) == len(valuation['dates'])
+    assert abs(valuation['total_value'] - valuation['positions']['Value'].sum()) < 0.01 * len(valuation['positions'])
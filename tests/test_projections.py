@@ -0,0 +1,37 @@
+import numpy as np
+
+from utils import projections
+from utils.portfolio import DEMO_HOLDINGS
+from utils.projections import calibrate, project_portfolio, simulate
+
+
+def test_result_does_not_depend_on_the_worker_count():
+    params = calibrate(np.random.default_rng(0).normal(0.0004, 0.01, 500))
+    single = simulate('gbm', params, n_paths=3000, horizon=20, workers=1)
+    pooled = simulate('gbm', params, n_paths=3000, horizon=20, workers=2)
+    for p, values in single['percentiles'].items():
+        np.testing.assert_allclose(pooled['percentiles'][p], values)
+    assert pooled['prob_loss'] == single['prob_loss']
+
+
+def test_worker_pool_is_reused():
+    assert projections._get_pool(2) is projections._get_pool(2)
+    assert projections._get_pool(1) is projections._get_pool(2)
+
+
+def test_projection_is_computed_once_per_day(monkeypatch):
+    calls = []
+    project = projections._project
+
+    def counted(*args):
+        calls.append(args)
+        return project(*args)
+
+    monkeypatch.setattr(projections, '_project', counted)
+    first = project_portfolio(DEMO_HOLDINGS, model='bootstrap', n_paths=2000, horizon=10, workers=1)
+    again = project_portfolio([dict(p) for p in DEMO_HOLDINGS], model='bootstrap', n_paths=2000, horizon=10, workers=1)
+    assert first is not None and again is first
+    assert len(calls) == 1
+
+    project_portfolio(DEMO_HOLDINGS, model='gbm', n_paths=2000, horizon=10, workers=1)
+    assert len(calls) == 2
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.providers import ReplayProvider, SyntheticProvider
+
+DAY = pd.Timedelta(days=1)
+HOUR = pd.Timedelta(hours=1)
+TICKERS = ['MSFT', 'AMZN', 'SPY', 'JPM', 'BND', 'GOOGL']
+
+
+def _today():
+    return pd.Timestamp.now().floor('D')
+
+
+def test_deep_daily_history_is_not_flat():
+    end = _today()
+    bars = SyntheticProvider().get_bars(TICKERS, end - 1830 * DAY, end, DAY)
+    for ticker, columns in bars.items():
+        closes = columns['Close']
+        assert closes.min() > 0.2 * closes[0], ticker
+        assert closes.max() < 5 * closes[0], ticker
+        # Moves every day, with a daily volatility of a percent or two
+        returns = np.diff(np.log(closes[-365:]))
+        assert 0.005 < returns.std() < 0.05, ticker
+
+
+def test_bars_do_not_depend_on_the_window():
+    provider = SyntheticProvider()
+    end = _today()
+    deep = provider.get_bars(TICKERS, end - 1830 * DAY, end, DAY)
+    short = provider.get_bars(TICKERS, end - 30 * DAY, end, DAY)
+    for ticker in TICKERS:
+        np.testing.assert_array_equal(short[ticker]['Volume'], deep[ticker]['Volume'][-31:])
+        for field in ('Open', 'High', 'Low', 'Close'):
+            np.testing.assert_allclose(short[ticker][field], deep[ticker][field][-31:], rtol=1e-12)
+
+
+def test_hourly_and_daily_bars_agree():
+    provider = SyntheticProvider()
+    now = pd.Timestamp.now()
+    daily = provider.get_bars(TICKERS, _today() - 5 * DAY, _today(), DAY)
+    hourly = provider.get_bars(TICKERS, _today() - 5 * DAY, now.floor('h'), HOUR)
+    for ticker in TICKERS:
+        days, hours = daily[ticker], hourly[ticker]
+        # The last hourly bar of each day closes where the daily bar does
+        ends = np.searchsorted(hours['Date'], days['Date'][1:] - HOUR.value)
+        np.testing.assert_allclose(hours['Close'][ends], days['Close'][:-1])
+        # The bars in progress end at the same moment
+        assert hours['Close'][-1] == days['Close'][-1]
+        np.testing.assert_allclose(hours['Open'][::24], days['Open'][:len(hours['Open'][::24])])
+
+
+def _record(directory, ticker, stamps, closes):
+    frame = pd.DataFrame({'Datetime': stamps, 'Open': closes, 'High': closes + 1, 'Low': closes - 1,
+                          'Close': closes, 'Volume': np.full(len(closes), 10)})
+    path = directory / f"{ticker}.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_replay_aggregates_recordings_onto_the_bar_grid(tmp_path):
+    stamps = pd.date_range("2024-01-01", periods=48, freq='h')
+    _record(tmp_path, 'ABC', stamps, np.arange(48, dtype=float))
+    provider = ReplayProvider(str(tmp_path), align_to_now=False)
+
+    bars = provider.get_bars(['abc', 'MISSING'], stamps[0], stamps[-1], DAY)
+    assert list(bars) == ['abc']
+    columns = bars['abc']
+    np.testing.assert_array_equal(columns['Date'], pd.DatetimeIndex(["2024-01-01", "2024-01-02"]).as_unit('ns').asi8)
+    np.testing.assert_array_equal(columns['Open'], [0, 24])
+    np.testing.assert_array_equal(columns['High'], [24, 48])
+    np.testing.assert_array_equal(columns['Low'], [-1, 23])
+    np.testing.assert_array_equal(columns['Close'], [23, 47])
+    np.testing.assert_array_equal(columns['Volume'], [240, 240])
+    np.testing.assert_array_equal(columns['Adj Close'], columns['Close'])
+
+
+def test_replay_slides_recordings_forward_by_whole_weeks(tmp_path):
+    stamps = pd.date_range("2024-01-01", periods=30, freq='D')
+    _record(tmp_path, 'ABC', stamps, np.arange(30, dtype=float))
+    provider = ReplayProvider(str(tmp_path))
+
+    end = _today()
+    columns = provider.get_bars(['ABC'], end - 9 * DAY, end, DAY)['ABC']
+    shift = columns['Date'] - stamps.as_unit('ns').asi8[columns['Close'].astype(int)]
+    assert len(set(shift.tolist())) == 1
+    assert shift[0] % pd.Timedelta(weeks=1).value == 0
+    # The last recorded bar lands within the last week of the window
+    assert end - 7 * DAY < pd.Timestamp(int(columns['Date'][-1])) <= end
+    assert columns['Close'][-1] == 29
+
+
+def test_replay_rereads_a_changed_recording(tmp_path):
+    stamps = pd.date_range("2024-01-01", periods=3, freq='D')
+    path = _record(tmp_path, 'ABC', stamps, np.array([1.0, 2.0, 3.0]))
+    provider = ReplayProvider(str(tmp_path), align_to_now=False)
+    assert provider.get_bars(['ABC'], stamps[0], stamps[-1], DAY)['ABC']['Close'][-1] == 3
+
+    _record(tmp_path, 'ABC', stamps, np.array([1.0, 2.0, 4.0]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert provider.get_bars(['ABC'], stamps[0], stamps[-1], DAY)['ABC']['Close'][-1] == 4
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from utils import recommender
+from utils.funds import FundUniverse, generate_fund_columns
+from utils.recommender import FEATURES, FundRecommender, recommend_funds
+
+COLUMNS = generate_fund_columns(2000, np.random.default_rng(9))
+
+
+def _brute_force(index, point, k, exclude=()):
+    distances = np.sqrt(((index.vectors - point) ** 2).sum(axis=1))
+    distances[list(exclude)] = np.inf
+    order = np.lexsort((np.arange(len(distances)), distances))[:k]
+    return order, distances[order]
+
+
+@pytest.mark.parametrize('block_rows', [65536, 300])
+def test_nearest_matches_a_full_scan(monkeypatch, block_rows):
+    monkeypatch.setattr(recommender, 'BLOCK_ROWS', block_rows)
+    index = FundRecommender(COLUMNS)
+    points = np.random.default_rng(0).normal(size=(5, len(FEATURES)))
+    points[0] = index.vectors[17]  # A fund's own point, at distance 0
+    exclude = [3, 17, 400]
+    rows, distances = index.nearest(points, k=8, exclude=exclude)
+    for point, found, found_distances in zip(points, rows, distances):
+        expected, expected_distances = _brute_force(index, point, 8, exclude)
+        np.testing.assert_allclose(found_distances, expected_distances, atol=1e-6)
+        assert found.tolist() == expected.tolist()
+
+
+def test_features_are_standardized():
+    index = FundRecommender(COLUMNS)
+    np.testing.assert_allclose(index.vectors.mean(axis=0), 0, atol=1e-9)
+    np.testing.assert_allclose(index.vectors.std(axis=0), 1)
+    low, high = index.risk_target(1), index.risk_target(7)
+    volatility = FEATURES.index('volatility')
+    assert low[volatility] < 0 < high[volatility]
+    assert index.nearest(low, k=0)[0].shape == (1, 0)
+
+
+def test_recommendations_skip_holdings(monkeypatch):
+    universe = FundUniverse(COLUMNS)
+    monkeypatch.setattr(recommender, 'get_fund_universe', lambda: universe)
+    held = list(universe.columns['ticker'][[5, 50]])
+    funds = recommend_funds(held, risk_level=3, k=4)
+    assert len(funds) == 4 and not set(held) & {fund['ticker'] for fund in funds}
+    assert [fund['distance'] for fund in funds] == sorted(fund['distance'] for fund in funds)
+    assert recommend_funds([t.lower() for t in held], risk_level=3, k=4) == funds
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from utils import providers
+from utils.finance import _provider_store, _refresh_stored_series
+from utils.providers import get_provider
+
+DAY = pd.Timedelta(days=1)
+
+
+def test_incremental_refresh_matches_full_history(monkeypatch):
+    ticker = 'RFRSH'
+    today = pd.Timestamp.now().floor('D')
+    start = today - 60 * DAY
+    earlier = today - 2 * DAY
+
+    # Two days ago, five hours into the day: that day's bar was in progress
+    monkeypatch.setattr(providers, '_synthetic_now', lambda: earlier + pd.Timedelta(hours=5))
+    _refresh_stored_series([ticker], start, earlier, '1D', DAY)
+    monkeypatch.undo()
+
+    added = _refresh_stored_series([ticker], start, today, '1D', DAY)
+    assert added == 2
+
+    stored = _provider_store().load(ticker, '1D')
+    full = get_provider().get_bars([ticker], start, today, DAY)[ticker]
+    np.testing.assert_array_equal(stored['Date'], full['Date'])
+    np.testing.assert_array_equal(stored['Volume'], full['Volume'])
+    for field in ('Open', 'High', 'Low', 'Close', 'Adj Close'):
+        np.testing.assert_allclose(stored[field], full[field], rtol=1e-12)
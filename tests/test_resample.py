@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from utils.resample import GRID_ORIGIN, ResampleCache, align_to_grid, resample_ohlcv
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _hourly(hours=24 * 20, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-03 05:00', periods=hours, freq='h')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, hours)))
+    open_ = np.r_[close[0], close[:-1]]
+    return {
+        'Date': dates.as_unit('ns').asi8,
+        'Open': open_,
+        'High': np.maximum(open_, close) * 1.001,
+        'Low': np.minimum(open_, close) * 0.999,
+        'Close': close,
+        'Volume': rng.integers(100, 1000, hours),
+    }
+
+
+def test_resample_matches_pandas():
+    columns = _hourly()
+    frame = pd.DataFrame({field: columns[field] for field in FIELDS}, index=pd.to_datetime(columns['Date']))
+    for bar in (pd.Timedelta(hours=4), pd.Timedelta(days=1), pd.Timedelta(days=7)):
+        result = resample_ohlcv(columns, bar, GRID_ORIGIN)
+        expected = frame.resample(bar, origin=GRID_ORIGIN).agg(
+            {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+        np.testing.assert_array_equal(pd.to_datetime(result['Date']), expected.index)
+        for field in FIELDS:
+            np.testing.assert_allclose(result[field], expected[field].to_numpy(), err_msg=f"{bar} {field}")
+
+
+def test_resample_panels_row_by_row():
+    one, two = _hourly(seed=1), _hourly(seed=2)
+    panel = {field: np.vstack((one[field], two[field])) for field in FIELDS}
+    panel['Date'] = one['Date']
+    result = resample_ohlcv(panel, pd.Timedelta(days=1), GRID_ORIGIN)
+    for row, columns in enumerate((one, two)):
+        expected = resample_ohlcv(columns, pd.Timedelta(days=1), GRID_ORIGIN)
+        for field in FIELDS:
+            np.testing.assert_array_equal(result[field][row], expected[field])
+
+
+def test_align_fills_gaps_with_the_previous_close():
+    dates = pd.DatetimeIndex(['2024-01-02', '2024-01-03', '2024-01-05']).as_unit('ns').asi8
+    columns = {'Date': dates, 'Open': np.array([1.0, 2.0, 3.0]), 'High': np.array([1.5, 2.5, 3.5]),
+               'Low': np.array([0.5, 1.5, 2.5]), 'Close': np.array([1.2, 2.2, 3.2]), 'Volume': np.array([10, 20, 30])}
+    grid = pd.date_range('2024-01-01', '2024-01-05', freq='D').as_unit('ns').asi8
+    aligned = align_to_grid(columns, grid)
+    np.testing.assert_array_equal(aligned['Close'], [np.nan, 1.2, 2.2, 2.2, 3.2])
+    np.testing.assert_array_equal(aligned['Open'], [np.nan, 1.0, 2.0, 2.2, 3.0])
+    np.testing.assert_array_equal(aligned['Volume'], [0, 10, 20, 0, 30])
+
+
+def test_cache_rebuilds_after_new_or_revised_bars():
+    cache = ResampleCache(max_views=2)
+    columns = _hourly()
+    day = pd.Timedelta(days=1)
+    view = cache.get(('X', 'h', 'D'), columns, day, GRID_ORIGIN)
+    assert cache.get(('X', 'h', 'D'), dict(columns), day, GRID_ORIGIN) is view
+
+    revised = dict(columns, Close=columns['Close'].copy())
+    revised['Close'][-1] *= 1.01
+    rebuilt = cache.get(('X', 'h', 'D'), revised, day, GRID_ORIGIN)
+    assert rebuilt is not view and rebuilt['Close'][-1] == revised['Close'][-1]
+
+    longer = {field: values[:-1] for field, values in columns.items()}
+    assert cache.get(('X', 'h', 'D'), longer, day, GRID_ORIGIN)['Close'][-1] == columns['Close'][-2]
+    cache.invalidate('X')
+    assert cache.get(('X', 'h', 'D'), columns, day, GRID_ORIGIN) is not view
+
+
+def test_every_period_of_a_ticker_agrees():
+    from utils.finance import get_stock_data
+
+    daily = get_stock_data('AGREE', '1y').set_index('Date')
+    for period in ('2y', '5y'):
+        coarse = get_stock_data('AGREE', period).set_index('Date')
+        # A coarse bar closes at the last daily close inside it
+        inside = coarse.index[coarse.index >= daily.index[0]][1:]
+        step = coarse.index[1] - coarse.index[0]
+        for start in inside[:-1]:
+            days = daily.loc[start:start + step - pd.Timedelta(days=1)]
+            np.testing.assert_allclose(coarse.loc[start, 'Close'], days['Close'].iloc[-1], rtol=1e-12)
+            np.testing.assert_allclose(coarse.loc[start, 'High'], days['High'].max(), rtol=1e-12)
+        np.testing.assert_allclose(coarse['Close'].iloc[-1], daily['Close'].iloc[-1], rtol=1e-12)
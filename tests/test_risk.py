@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.risk import ROLLING_FIGURES, TRADING_DAYS, max_drawdown, risk_report
+
+WINDOW = 20
+
+
+def _returns(seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, (6, 150))
+    returns[rng.random(returns.shape) < missing] = np.nan
+    return returns, rng.normal(0.0003, 0.008, 150)
+
+
+def _drawdown_loop(returns):
+    """Worst drawdown, its peak and trough, and the longest underwater run, bar by bar."""
+    wealth, peak, peak_at, worst, longest = 1.0, 1.0, 0, (0.0, 0, 0), 0
+    for t, value in enumerate(np.nan_to_num(returns)):
+        wealth *= 1 + value
+        if wealth >= peak:
+            peak, peak_at = wealth, t
+        drawdown = wealth / peak - 1
+        if drawdown < worst[0]:
+            worst = (drawdown, peak_at, t)
+        longest = max(longest, t - peak_at)
+    return worst, longest
+
+
+def test_full_window_figures_match_direct_formulas():
+    returns, benchmark = _returns()
+    report = risk_report(returns, benchmark, WINDOW)
+    for i, series in enumerate(returns):
+        np.testing.assert_allclose(report['volatility'][i], series.std(ddof=1) * np.sqrt(TRADING_DAYS))
+        np.testing.assert_allclose(report['sharpe'][i], series.mean() / series.std(ddof=1) * np.sqrt(TRADING_DAYS))
+        downside = np.sqrt(np.mean(np.minimum(series, 0) ** 2))
+        np.testing.assert_allclose(report['sortino'][i], series.mean() / downside * np.sqrt(TRADING_DAYS))
+        np.testing.assert_allclose(report['beta'][i], np.cov(series, benchmark)[0, 1] / benchmark.var(ddof=1))
+
+        ordered = np.sort(series)
+        k = int(np.floor(0.05 * (len(series) - 1)))
+        np.testing.assert_allclose(report['var'][i], -ordered[k])
+        np.testing.assert_allclose(report['cvar'][i], -ordered[:k + 1].mean())
+
+        (drawdown, peak, trough), longest = _drawdown_loop(series)
+        np.testing.assert_allclose(report['max_drawdown'][i], drawdown)
+        assert report['drawdown_duration'][i] == trough - peak
+        assert report['longest_underwater'][i] == longest
+
+
+def test_rolling_figures_match_pandas():
+    returns, benchmark = _returns(1, missing=0.05)
+    report = risk_report(returns, benchmark, WINDOW)
+    frame = pd.DataFrame(returns.T)
+    bench = pd.Series(benchmark)
+    expected_vol = frame.rolling(WINDOW, min_periods=2).std() * np.sqrt(TRADING_DAYS)
+    np.testing.assert_allclose(report['rolling_volatility'][:, WINDOW - 1:], expected_vol.T.values[:, WINDOW - 1:],
+                               rtol=1e-8)
+    expected_sharpe = frame.rolling(WINDOW, min_periods=2).mean() / frame.rolling(WINDOW, min_periods=2).std()
+    np.testing.assert_allclose(report['rolling_sharpe'][:, WINDOW - 1:],
+                               expected_sharpe.T.values[:, WINDOW - 1:] * np.sqrt(TRADING_DAYS), rtol=1e-8)
+    for i in range(len(returns)):
+        paired = frame[i].where(bench.notna())
+        expected_beta = paired.rolling(WINDOW).cov(bench.where(paired.notna()), ddof=0) / \
+            bench.where(paired.notna()).rolling(WINDOW).var(ddof=0)
+        valid = np.isfinite(expected_beta.values)
+        np.testing.assert_allclose(report['rolling_beta'][i][valid], expected_beta.values[valid], rtol=1e-7)
+    assert np.isnan(report['rolling_volatility'][:, :WINDOW - 1]).all()
+
+
+def test_full_window_only_report_matches_rolling_one():
+    returns, benchmark = _returns(2, missing=0.02)
+    benchmark[::9] = np.nan
+    full = risk_report(returns, benchmark, WINDOW, rolling=False)
+    rolling = risk_report(returns, benchmark, WINDOW)
+    assert set(full) < set(rolling)
+    for name, values in full.items():
+        np.testing.assert_allclose(values, rolling[name], rtol=1e-12, equal_nan=True)
+    np.testing.assert_array_equal(rolling['drawdown'].min(axis=1), full['max_drawdown'])
+
+
+def test_flat_and_short_series():
+    flat = np.zeros((2, 30))
+    flat[1, 10] = -0.1
+    stats = max_drawdown(flat)
+    assert list(stats['longest_underwater']) == [0, 20]
+    assert list(stats['peak']) == [0, 9] and list(stats['trough']) == [0, 10]
+
+    report = risk_report(np.full((1, 1), 0.01), np.full(1, 0.01), WINDOW)
+    assert np.isnan(report['volatility'][0]) and np.isnan(report['beta'][0])
+    assert report['rolling_volatility'].shape == (1, 1)
+
+
+def test_rolling_figures_can_be_picked_and_written_to_float32_buffers():
+    returns, benchmark = _returns(3, missing=0.02)
+    everything = risk_report(returns, benchmark, WINDOW)
+    picked = risk_report(returns, benchmark, WINDOW, rolling=['rolling_sortino', 'drawdown'])
+    assert set(picked) - set(everything) == set()
+    assert 'rolling_volatility' not in picked and 'rolling_beta' not in picked
+    for name in ('rolling_sortino', 'drawdown', 'sharpe', 'max_drawdown', 'beta'):
+        np.testing.assert_allclose(picked[name], everything[name], rtol=1e-12, equal_nan=True)
+
+    buffers = {name: np.empty(returns.shape, dtype=np.float32) for name in ROLLING_FIGURES}
+    written = risk_report(returns, benchmark, WINDOW, out=buffers)
+    for name in ROLLING_FIGURES:
+        assert written[name] is buffers[name]
+        np.testing.assert_allclose(buffers[name], everything[name], rtol=1e-5, atol=1e-7, equal_nan=True)
+    np.testing.assert_array_equal(written['max_drawdown'], everything['max_drawdown'])
+
+    with pytest.raises(ValueError):
+        risk_report(returns, benchmark, WINDOW, rolling=['rolling_var'])
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.providers import SyntheticProvider
+from utils.rng import date_bucket, keyed_uniforms, stable_seed, stream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_same_key_same_stream():
+    np.testing.assert_array_equal(stream('stock', 'MSFT', 1).random(5), stream('stock', 'MSFT', 1).random(5))
+    assert stable_seed('stock', 'MSFT') != stable_seed('stock', 'MSFTX')
+    assert not np.array_equal(stream('stock', 'MSFT', 1).random(5), stream('stock', 'MSFT', 2).random(5))
+
+
+def test_streams_are_uncorrelated():
+    draws = np.array([stream('stock', f'T{i}').normal(size=2000) for i in range(20)])
+    correlation = np.corrcoef(draws)
+    assert np.abs(correlation[~np.eye(20, dtype=bool)]).max() < 0.1
+
+
+def test_keyed_draws_do_not_depend_on_the_other_draws():
+    seeds = [stable_seed('stock', f'T{i}') for i in range(20)]
+    draws = keyed_uniforms(seeds, np.arange(5000))
+    np.testing.assert_array_equal(keyed_uniforms(seeds[3:5], [4999, 17]), draws[3:5, [4999, 17]])
+    assert draws.min() >= 0 and draws.max() < 1
+    assert abs(draws.mean() - 0.5) < 0.01
+    correlation = np.corrcoef(draws)
+    assert np.abs(correlation[~np.eye(20, dtype=bool)]).max() < 0.1
+
+
+def test_seed_is_the_same_in_another_process():
+    code = "from utils.rng import stream; print(stream('stock', 'MSFT', 7).integers(1 << 62))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert int(result.stdout.split()[-1]) == stream('stock', 'MSFT', 7).integers(1 << 62)
+
+
+def test_threads_get_the_same_bars_as_a_serial_run():
+    provider = SyntheticProvider()
+    end = pd.Timestamp.now().floor('D')
+    tickers = ['MSFT', 'AMZN', 'SPY', 'JPM', 'BND', 'GOOGL', 'NVDA', 'TSLA']
+    serial = {ticker: provider.get_bars([ticker], end - pd.Timedelta(days=200), end, pd.Timedelta(days=1))
+              for ticker in tickers}
+    with ThreadPoolExecutor(4) as pool:
+        parallel = dict(zip(tickers, pool.map(
+            lambda ticker: provider.get_bars([ticker], end - pd.Timedelta(days=200), end, pd.Timedelta(days=1)),
+            tickers)))
+    together = provider.get_bars(tickers, end - pd.Timedelta(days=200), end, pd.Timedelta(days=1))
+    for ticker in tickers:
+        for field, values in serial[ticker][ticker].items():
+            np.testing.assert_array_equal(parallel[ticker][ticker][field], values)
+            np.testing.assert_array_equal(together[ticker][field], values)
+
+
+def test_date_bucket():
+    assert date_bucket('2024-03-05 17:42', 'D') == '2024-03-05T00:00:00'
+    assert date_bucket('2024-03-05 17:42', 'h') == '2024-03-05T17:00:00'
@@ -0,0 +1,97 @@
+import math
+from collections import Counter
+
+import numpy as np
+
+from utils import search
+from utils.funds import FundUniverse, generate_fund_columns
+from utils.search import FIELD_WEIGHTS, SearchIndex, tokenize
+
+COLUMNS = generate_fund_columns(400, np.random.default_rng(3))
+
+
+def _brute_force(query):
+    """Matches and scores of a query, by scanning every document."""
+    size = len(COLUMNS['ticker'])
+    weights = [Counter() for _ in range(size)]
+    for field, weight in FIELD_WEIGHTS.items():
+        for doc, text in enumerate(COLUMNS[field]):
+            for token in tokenize(text):
+                weights[doc][token] += weight
+    doc_freq = Counter(token for counts in weights for token in counts)
+
+    def score(doc, token, prefix):
+        found = [t for t in weights[doc] if t == token or (prefix and t.startswith(token))]
+        if not found:
+            return None
+        return sum(weights[doc][t] * math.log1p(size / doc_freq[t]) * len(token) / len(t) for t in found)
+
+    tokens = tokenize(query)
+    if tokens and len(tokens[-1]) < search.MIN_PREFIX:
+        tokens.pop()
+    if not tokens:
+        return {}
+    terms = [(token, False) for token in dict.fromkeys(tokens[:-1])] + [(tokens[-1], True)]
+    matches = {}
+    for doc in range(size):
+        scores = [score(doc, token, prefix) for token, prefix in terms]
+        if all(value is not None for value in scores):
+            matches[doc] = sum(scores)
+    return matches
+
+
+QUERIES = ['global', 'gl', 'global tech', 'emerging ma', 'bonds gov', 'fixed income', 'growth fund', 'zzzz',
+           'global t', 'g', '', 'Global GLOBAL', 'index in']
+
+
+def test_matches_and_scores_equal_a_full_scan():
+    index = SearchIndex(COLUMNS)
+    for query in QUERIES + [COLUMNS['ticker'][7], COLUMNS['ticker'][11][:3]]:
+        expected = _brute_force(query)
+        docs, scores = index.match(query)
+        order = np.argsort(docs)
+        assert docs[order].tolist() == sorted(expected), query
+        np.testing.assert_allclose(scores[order], [expected[doc] for doc in sorted(expected)], rtol=1e-12)
+
+
+def test_pages_follow_the_ranking():
+    index = SearchIndex(COLUMNS)
+    docs, scores = index.match('global')
+    ranked = sorted(zip(-scores, docs))
+    paged = []
+    for offset in range(0, len(docs) + 7, 7):
+        page, _, total = index.search('global', limit=7, offset=offset)
+        assert total == len(docs)
+        paged += page.tolist()
+    assert paged == [doc for _, doc in ranked]
+
+
+def test_suggestions_are_completions_by_frequency():
+    index = SearchIndex(COLUMNS)
+    suggestions = index.suggest('gro')
+    assert suggestions and all(token.startswith('gro') for token in suggestions)
+    freq = dict(zip(index.vocabulary, index.doc_freq))
+    assert [freq[token] for token in suggestions] == sorted((freq[token] for token in suggestions), reverse=True)
+    assert index.suggest('zzzz') == []
+
+
+def test_short_query_lists_the_universe(monkeypatch):
+    universe = FundUniverse(COLUMNS)
+    monkeypatch.setattr(search, 'get_fund_universe', lambda: universe)
+    results = search.search_funds('g', page=2, page_size=5)
+    assert results['total'] == len(universe)
+    assert [fund['ticker'] for fund in results['funds']] == universe.columns['ticker'][universe.rows()[5:10]].tolist()
+    assert results['suggestions'] and all(token.startswith('g') for token in results['suggestions'])
+
+    # A one-letter last word no longer empties the results of the words before it
+    assert search.search_funds('global t')['total'] == search.search_funds('global')['total']
+
+
+def test_fund_grid_treats_a_short_query_as_none():
+    from utils.finance import get_fund_page
+
+    listing = get_fund_page(page_size=6)
+    short = get_fund_page('g', page_size=6)
+    assert short['total'] == listing['total']
+    assert [fund['ticker'] for fund in short['funds']] == [fund['ticker'] for fund in listing['funds']]
+    assert get_fund_page('global t')['total'] == get_fund_page('global')['total']
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.store import COLUMNS, OHLCVStore
+
+
+def _bars(start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    return {
+        'Date': pd.date_range(start, periods=n, freq='D').as_unit('ns').asi8,
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n),
+        'Adj Close': close,
+    }
+
+
+def _assert_columns_equal(actual, expected):
+    for name in COLUMNS:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+
+
+def test_write_load_round_trip(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    bars = _bars('2024-01-01', 50)
+    store.write('TEST', bars)
+    _assert_columns_equal(store.load('TEST'), bars)
+
+    window = store.load_range('TEST', '2024-01-10', '2024-01-19')
+    assert len(window['Date']) == 10
+    assert store.bounds('TEST') == (pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-19'))
+    assert store.load('MISSING') is None
+
+
+def test_appends_grow_the_file_and_skip_known_bars(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    bars = _bars('2024-01-01', 600)
+    store.write('TEST', {name: values[:100] for name, values in bars.items()})
+    assert store.append('TEST', {name: values[90:300] for name, values in bars.items()}) == 200
+    assert store.append('TEST', {name: values[300:] for name, values in bars.items()}) == 300
+    _assert_columns_equal(store.load('TEST'), bars)
+
+    assert store.compact('TEST', keep_after='2024-06-01') == len(bars['Date']) - 152
+    assert store.load('TEST')['Date'][0] == pd.Timestamp('2024-06-01').value
+
+
+def test_revise_replaces_the_last_bar(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    bars = _bars('2024-01-01', 20)
+    partial = {name: values[:10].copy() for name, values in bars.items()}
+    partial['Close'][-1] += 7
+    store.write('TEST', partial)
+
+    assert store.append('TEST', {name: values[9:] for name, values in bars.items()}) == 10
+    assert store.load('TEST')['Close'][9] == partial['Close'][-1]
+
+    store.write('TEST', partial)
+    assert store.append('TEST', {name: values[9:] for name, values in bars.items()}, revise=True) == 10
+    _assert_columns_equal(store.load('TEST'), bars)
+
+
+@pytest.mark.parametrize('ticker', ['.', '..', '...', ''])
+def test_dot_tickers_are_rejected(tmp_path, ticker):
+    store = OHLCVStore(str(tmp_path / 'store'))
+    with pytest.raises(ValueError):
+        store.write(ticker, _bars('2024-01-01', 5))
+
+
+@pytest.mark.parametrize('ticker', ['../X', '..\\\\X', 'A/B', '/ETC'])
+def test_separators_stay_inside_the_store(tmp_path, ticker):
+    root = tmp_path / 'store'
+    store = OHLCVStore(str(root))
+    store.write(ticker, _bars('2024-01-01', 5))
+    written = [os.path.join(folder, name) for folder, _, names in os.walk(tmp_path) for name in names]
+    assert written and all(path.startswith(str(root) + os.sep) for path in written)
+    assert len(store.load(ticker)['Date']) == 5
+
+
+def test_series_of_another_data_version_are_dropped(tmp_path):
+    root = str(tmp_path / 'synthetic')
+    OHLCVStore(root).write('AAA', _bars('2024-01-01', 5))
+
+    # Series stored before versions were recorded count as another version
+    store = OHLCVStore(root, version=2)
+    assert store.load('AAA') is None
+    store.write('AAA', _bars('2024-01-01', 5))
+    assert len(OHLCVStore(root, version=2).load('AAA')['Date']) == 5
+    assert OHLCVStore(root, version=3).load('AAA') is None
@@ -4,10 +4,19 @@ import json
 from datetime import datetime
 import pandas as pd
 import plotly.express as px
-from utils.finance import get_stock_data, get_portfolio_metrics
+import plotly.graph_objects as go
+from utils.finance import get_stock_data, get_portfolio_metrics, get_portfolio_snapshot, get_fund_data, stream_market_data
+from utils.accumulators import get_accumulators
 from utils.scraper import get_website_text_content
 from utils.sentiment import analyze_sentiment
-from utils.news import get_financial_news
+from utils.news_store import get_latest_news, get_news_page, get_news_version, ingest_articles, latest_articles, search_news
+from utils.portfolio import DEMO_HOLDINGS, get_portfolio_valuation
+from utils.projections import project_portfolio
+from utils.performance import get_relative_performance
+from utils.optimizer import get_risk_profile_portfolios
+from utils.search import search_funds
+from utils.recommender import recommend_funds
+from utils.ledger import DEMO_USER_ID, demo_transactions, recent_transactions
 
 # Page configuration
 st.set_page_config(
@@ -175,31 +184,57 @@ def show_dashboard():
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
         
-        # Portfolio metrics
-        metric_col1, metric_col2 = st.columns(2)
-        metric_col1.metric("Net Worth", f"${portfolio_data['current_value']:,}")
-        metric_col2.metric("Growth Rate", f"{portfolio_data['growth_rate']}% YTD")
+        # Portfolio metrics, served from the streaming accumulator
+        snapshot = get_portfolio_snapshot()
+        metric_col1, metric_col2, metric_col3 = st.columns(3)
+        metric_col1.metric("Net Worth", f"${snapshot['current_value']:,}")
+        metric_col2.metric("Growth Rate", f"{snapshot['growth_pct']}% since start")
+        metric_col3.metric("Volatilidad (EWMA)", f"{snapshot['ewma_volatility']}%",
+                           f"Máx. caída {snapshot['max_drawdown']}%", delta_color="off")
+        
+        # Live market chart: drawn once here, then fed by the stream at the end
+        st.subheader("Mercado en vivo")
+        live_tickers = ['AAPL', 'MSFT', 'GOOGL']
+        live = st.checkbox("Actualizar en vivo", value=False)
+        live_chart = st.empty()
+        live_quotes = st.empty()
+        
+        live_points = {}
+        live_fig = go.Figure()
+        accumulators = get_accumulators()
+        for ticker in live_tickers:
+            history = get_stock_data(ticker, "1d")
+            live_points[ticker] = (list(history['Date']), list(history['Close']))
+            accumulators.extend('ticker', ticker, history['Close'], history['Date'])
+            live_fig.add_trace(go.Scatter(x=live_points[ticker][0], y=live_points[ticker][1],
+                                          mode='lines', name=ticker))
+        live_fig.update_layout(height=300, title='Intraday Price (1h bars)')
+        live_chart.plotly_chart(live_fig, use_container_width=True)
         
         # Recent operations
         st.subheader("Operaciones")
         
-        operations = [
-            {"type": "Compra", "ticker": "NVO", "shares": "75,183", "price": "-39 $", "time": "14:30"},
-            {"type": "Compra", "ticker": "ORCL", "shares": "1", "price": "-148.42 $", "time": "16:20"},
-            {"type": "Compra", "ticker": "ORCL", "shares": "3", "price": "-445.26 $", "time": "18:20"}
-        ]
-        
-        for op in operations:
+        # Latest entries of the user's ledger (demo operations until they trade)
+        user_id = st.session_state.get('user_id', DEMO_USER_ID)
+        operations = recent_transactions(user_id, limit=3)
+        if operations.empty:
+            operations = demo_transactions(limit=3)
+        labels = {'buy': ("📈", "Compra"), 'sell': ("📉", "Venta"), 'dividend': ("💰", "Dividendo")}
+        
+        for op in operations.itertuples():
+            icon, label = labels[op.type]
+            amount = op.shares * op.price
+            amount = -(amount + op.fees) if op.type == 'buy' else amount - op.fees
             with st.container():
                 cols = st.columns([1, 4, 2])
                 with cols[0]:
-                    st.markdown("📈")
+                    st.markdown(icon)
                 with cols[1]:
-                    st.markdown(f"**{op['type']} {op['ticker']}**")
-                    st.markdown(f"{op['shares']} acciones")
+                    st.markdown(f"**{label} {op.ticker}**")
+                    st.markdown(f"{op.shares:,g} acciones")
                 with cols[2]:
-                    st.markdown(f"**{op['price']}**")
-                    st.markdown(f"{op['time']}")
+                    st.markdown(f"**{amount:,.2f} $**")
+                    st.markdown(op.timestamp.strftime('%H:%M'))
                 st.markdown("---")
     
     with col2:
@@ -223,13 +258,53 @@ def show_dashboard():
         
         # Latest news
         st.subheader("Latest Market News")
-        news = get_financial_news(5)
+        news = get_latest_news(5)
         
         for item in news[:3]:
             st.markdown(f"**{item['title']}**")
             st.markdown(f"{item['summary'][:100]}...")
             st.markdown(f"*{item['source']} - {item['date']}*")
             st.markdown("---")
+    
+    # Stream new bars and ticks into the live chart, updating only its traces.
+    # Streamlit stops the run at its next st call once the session ends or
+    # reruns, so the accumulators are checkpointed along the way and on exit
+    if live:
+        try:
+            for count, update in enumerate(stream_market_data(live_tickers, period="1d", interval=5, max_updates=120), 1):
+                for trace in live_fig.data:
+                    dates, closes = live_points[trace.name]
+                    bars = update['bars'].get(trace.name)
+                    if bars is not None:
+                        accumulators.extend('ticker', trace.name, bars['Close'], bars['Date'])
+                        for date, close in zip(bars['Date'], bars['Close']):
+                            if dates and dates[-1] == date:
+                                closes[-1] = close
+                            else:
+                                dates.append(date)
+                                closes.append(close)
+                    
+                    # The latest tick trails the last completed bar
+                    quote = update['quotes'].get(trace.name)
+                    if quote:
+                        trace.x = dates + [quote['time']]
+                        trace.y = closes + [quote['price']]
+                live_chart.plotly_chart(live_fig, use_container_width=True)
+                
+                with live_quotes.container():
+                    quote_cols = st.columns(len(live_tickers))
+                    for quote_col, ticker in zip(quote_cols, live_tickers):
+                        quote = update['quotes'].get(ticker)
+                        if quote:
+                            quote_col.metric(ticker, f"${quote['price']:,.2f}", f"{quote['change_percent']:+.2f}%")
+                            stats = accumulators.ticker(ticker).snapshot(periods_per_year=1)
+                            quote_col.caption(f"Vol. EWMA 1h {stats['ewma_volatility']}% · Máx. caída {stats['max_drawdown']}%")
+                
+                # About once a minute
+                if count % 12 == 0:
+                    accumulators.checkpoint()
+        finally:
+            accumulators.checkpoint()
 
 def show_fund_tracker():
     """Display the fund tracker with search and recommendations"""
@@ -242,14 +317,44 @@ def show_fund_tracker():
     with col2:
         st.button("🔍")
     
+    # Search results over the whole fund universe
+    if search_query:
+        results = search_funds(search_query, page_size=10)
+        if results['funds']:
+            st.dataframe(pd.DataFrame(results['funds'])[['name', 'ticker', 'category', 'one_year_return', 'risk_score']],
+                         use_container_width=True)
+        else:
+            st.info("No se han encontrado fondos.")
+        if results['suggestions']:
+            st.caption("Sugerencias: " + ", ".join(results['suggestions']))
+    
     # Categories
     st.subheader("Categorías")
     categories_col1, categories_col2, categories_col3, categories_col4 = st.columns(4)
-    categories_col1.button("📈 Alto riesgo")
-    categories_col2.button("📉 Bajo riesgo")
+    high_risk = categories_col1.button("📈 Alto riesgo")
+    low_risk = categories_col2.button("📉 Bajo riesgo")
     categories_col3.button("💻 Tecnología")
     categories_col4.button("🏭 Sectores")
     
+    # Optimal fund mix for the chosen risk level (6/7 or 2/7)
+    if high_risk or low_risk:
+        level = 6 if high_risk else 2
+        funds = get_fund_data(limit=20)
+        names = {fund['ticker']: fund['name'] for fund in funds}
+        profiles = get_risk_profile_portfolios(list(names), period="1y", max_weight=0.25)
+        if profiles is None:
+            st.error("No se ha podido calcular la cartera óptima.")
+        else:
+            portfolio = profiles['portfolios'][level - 1]
+            st.markdown(f"**Cartera óptima de fondos, riesgo {level}/7**: "
+                        f"rentabilidad esperada {portfolio['return']}%, volatilidad {portfolio['volatility']}%")
+            weights = sorted(portfolio['weights'].items(), key=lambda item: item[1], reverse=True)
+            st.dataframe(pd.DataFrame({
+                'Fondo': [names[ticker] for ticker, _ in weights],
+                'Ticker': [ticker for ticker, _ in weights],
+                'Peso (%)': [round(weight * 100, 1) for _, weight in weights],
+            }), use_container_width=True)
+    
     # Featured funds
     st.markdown(
         """
@@ -265,24 +370,27 @@ def show_fund_tracker():
     # Recommendations
     st.subheader("Recomendaciones para ti")
     
-    funds = [
-        {"name": "Global Equity Fund", "risk": "Moderate", "return": "8.2%", "desc": "Broad exposure to global equity markets"},
-        {"name": "Tech Innovators ETF", "risk": "High", "return": "12.5%", "desc": "Focused on cutting-edge technology companies"},
-        {"name": "Sustainable Future Fund", "risk": "Moderate", "return": "7.8%", "desc": "Environmentally and socially responsible investments"}
-    ]
+    # Funds closest to the user's 4/7 risk profile
+    funds = recommend_funds(risk_level=4, k=3)
     
     cols = st.columns(3)
     for i, fund in enumerate(funds):
         with cols[i]:
             st.markdown(f"**{fund['name']}**")
-            st.markdown(f"Risk: {fund['risk']} | Return: {fund['return']}")
-            st.markdown(fund['desc'])
+            st.markdown(f"Risk: {'⭐' * fund['risk_score']} | Return: {fund['one_year_return']}%")
+            st.markdown(f"{fund['subcategory']} · Volatilidad {fund['volatility']}% · Sharpe {fund['sharpe_ratio']}")
             st.button("View Details", key=f"view_{i}")
 
 def show_portfolio():
     """Display the portfolio page with user's investments"""
     st.title("Portfolio")
     
+    # Value the holdings over the last year
+    valuation = get_portfolio_valuation(period="1y")
+    if valuation is None:
+        st.error("Portfolio data is not available right now.")
+        return
+    
     # User profile
     col1, col2 = st.columns([1, 2])
     with col1:
@@ -292,9 +400,9 @@ def show_portfolio():
         st.subheader("Inversor Riesgo 4/7")
         
         metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
-        metrics_col1.metric("Activos Totales", "$150,000")
-        metrics_col2.metric("Tasa de Rentabilidad", "12.5%")
-        metrics_col3.metric("Rendimiento Reciente MTD", "2.11%")
+        metrics_col1.metric("Activos Totales", f"${valuation['total_value']:,.0f}")
+        metrics_col2.metric("Tasa de Rentabilidad", f"{valuation['return_pct']}%")
+        metrics_col3.metric("Rendimiento Reciente MTD", f"{valuation['mtd_return_pct']}%")
     
     st.markdown("---")
     
@@ -303,8 +411,8 @@ def show_portfolio():
     
     # Asset allocation chart
     allocation_data = {
-        'Asset Type': ['Stocks', 'Bonds', 'Cash', 'Alternatives', 'Real Estate'],
-        'Allocation': [45, 25, 15, 10, 5]
+        'Asset Type': list(valuation['allocation']),
+        'Allocation': list(valuation['allocation'].values())
     }
     allocation_df = pd.DataFrame(allocation_data)
     
@@ -317,33 +425,86 @@ def show_portfolio():
     # Holdings table
     st.subheader("Current Holdings")
     
-    holdings = pd.DataFrame({
-        'Symbol': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'ORCL', 'NVO'],
-        'Name': ['Apple Inc.', 'Microsoft Corp', 'Alphabet Inc', 'Amazon.com', 'NVIDIA Corp', 'Oracle Corp', 'Novo Nordisk'],
-        'Shares': [100, 50, 20, 15, 40, 50, 75],
-        'Price': [170.29, 325.46, 138.72, 175.80, 840.35, 148.42, 135.67],
-        'Value': [17029.00, 16273.00, 2774.40, 2637.00, 33614.00, 7421.00, 10175.25],
-        'Return': [24.5, 18.3, 15.2, 10.8, 35.7, 8.9, 12.4]
-    })
+    holdings = valuation['positions'][['Symbol', 'Name', 'Shares', 'Price', 'Value', 'P&L', 'Return', 'Weight']]
     
     st.dataframe(holdings, use_container_width=True)
     
     # Performance chart
     st.subheader("Portfolio Performance")
     
-    # Create date range for last 12 months
-    dates = pd.date_range(end=datetime.now(), periods=12, freq='M')
-    performance = pd.DataFrame({
-        'Date': dates,
-        'Portfolio': [8.2, 8.7, 9.1, 7.8, 8.5, 9.3, 10.1, 11.2, 10.8, 11.5, 12.2, 12.5],
-        'Benchmark': [7.5, 7.8, 8.2, 7.1, 7.9, 8.5, 9.0, 9.8, 9.5, 10.1, 10.5, 10.8]
-    })
-    
-    fig = px.line(performance, x='Date', y=['Portfolio', 'Benchmark'],
-                title='Portfolio vs Benchmark (12 Months)',
-                labels={'value': 'Return (%)', 'Date': 'Date', 'variable': 'Legend'},
-                color_discrete_sequence=['#7749F8', '#33B5E5'])
-    st.plotly_chart(fig, use_container_width=True)
+    # Month-end cumulative return over the last 12 months, against the S&P 500
+    relative = get_relative_performance(pd.Series(valuation['value'], index=valuation['dates']), ['SPY'])
+    if relative is not None:
+        monthly = relative['cumulative'].resample('ME').last().tail(12).round(2)
+        performance = pd.DataFrame({
+            'Date': monthly.index,
+            'Portfolio': monthly['Portfolio'].to_numpy(),
+            'Benchmark': monthly['SPY'].to_numpy()
+        })
+        
+        fig = px.line(performance, x='Date', y=['Portfolio', 'Benchmark'],
+                    title='Portfolio vs Benchmark (12 Months)',
+                    labels={'value': 'Return (%)', 'Date': 'Date', 'variable': 'Legend'},
+                    color_discrete_sequence=['#7749F8', '#33B5E5'])
+        st.plotly_chart(fig, use_container_width=True)
+        
+        rel_col1, rel_col2, rel_col3 = st.columns(3)
+        rel_col1.metric("Exceso de rentabilidad", f"{monthly['Portfolio'].iloc[-1] - monthly['SPY'].iloc[-1]:.2f}%")
+        rel_col2.metric("Tracking error", f"{relative['tracking_error']['SPY']}%")
+        rel_col3.metric("Information ratio", f"{relative['information_ratio']['SPY']}")
+    
+    # Monte Carlo fan chart of the next 12 months
+    st.subheader("Proyección a 12 meses")
+    projection = project_portfolio(DEMO_HOLDINGS, model='bootstrap', n_paths=50_000)
+    if projection is not None:
+        bands = projection['percentiles']
+        fig = go.Figure()
+        for low, high, opacity in [(5, 95, 0.2), (25, 75, 0.35)]:
+            fig.add_trace(go.Scatter(x=projection['dates'], y=bands[high], mode='lines',
+                                     line={'width': 0}, showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=projection['dates'], y=bands[low], mode='lines', line={'width': 0},
+                                     fill='tonexty', fillcolor=f'rgba(119, 73, 248, {opacity})',
+                                     name=f'P{low}-P{high}'))
+        fig.add_trace(go.Scatter(x=projection['dates'], y=bands[50], mode='lines',
+                                 line={'color': '#7749F8'}, name='Mediana'))
+        fig.update_layout(title='Valor proyectado (50.000 simulaciones)', yaxis_title='Value ($)')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        proj_col1, proj_col2, proj_col3 = st.columns(3)
+        proj_col1.metric("Rentabilidad mediana", f"{projection['annual_return'][50]}%")
+        proj_col2.metric("Rango 90%", f"{projection['annual_return'][5]}% a {projection['annual_return'][95]}%")
+        proj_col3.metric("Probabilidad de pérdida", f"{projection['prob_loss'] * 100:.1f}%")
+    
+    # Efficient frontier of the current holdings and the 4/7 target mix
+    st.subheader("Cartera objetivo (Riesgo 4/7)")
+    symbols = [h['symbol'] for h in DEMO_HOLDINGS if h['asset_class'] != 'Cash']
+    profiles = get_risk_profile_portfolios(symbols, period="1y")
+    if profiles is not None:
+        frontier = profiles['frontier']
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=frontier['volatility'] * 100, y=frontier['returns'] * 100, mode='lines',
+                                 line={'color': '#7749F8'}, name='Frontera eficiente'))
+        fig.add_trace(go.Scatter(x=[p['volatility'] for p in profiles['portfolios']],
+                                 y=[p['return'] for p in profiles['portfolios']], mode='markers+text',
+                                 text=[f"{p['level']}/7" for p in profiles['portfolios']], textposition='top left',
+                                 marker={'color': '#33B5E5', 'size': 9}, name='Niveles de riesgo'))
+        fig.update_layout(title='Frontera eficiente', xaxis_title='Volatilidad (%)', yaxis_title='Rentabilidad (%)')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        target = profiles['portfolios'][3]['weights']
+        invested_positions = valuation['positions'][valuation['positions']['Asset Class'] != 'Cash']
+        current = invested_positions.groupby('Symbol')['Weight'].sum()
+        invested = current.sum()
+        st.dataframe(pd.DataFrame({
+            'Symbol': symbols,
+            'Actual (%)': [round(current.get(s, 0.0) / invested * 100, 1) if invested else 0.0 for s in symbols],
+            'Objetivo (%)': [round(target.get(s, 0.0) * 100, 1) for s in symbols],
+        }), use_container_width=True)
+
+def load_more_news():
+    """Append the next page of the news feed to the ones already shown."""
+    cursor = st.session_state.news_pages[-1]['next_cursor']
+    st.session_state.news_pages.append(get_news_page(cursor, page_size=10))
 
 def show_news():
     """Display financial news and market updates"""
@@ -353,7 +514,20 @@ def show_news():
     tab1, tab2 = st.tabs(["General News", "Fyp"])
     
     with tab1:
-        news = get_financial_news(10)
+        # Stored news, newest first, or the best full-text matches of a search
+        news_query = st.text_input("Buscar noticias", placeholder="Fed, inflación, Bitcoin...", key="news_query")
+        if news_query:
+            news = search_news(news_query, 10)
+            if not news:
+                st.info("No se han encontrado noticias.")
+        else:
+            # The feed is read one page at a time; "Cargar más" fetches the next page only.
+            # Pages read before new articles were stored are dropped and the feed starts over
+            version = get_news_version()
+            if st.button("Actualizar", key="news_refresh") or st.session_state.get("news_version") != version:
+                st.session_state.news_pages = [get_news_page(page_size=10)]
+                st.session_state.news_version = version
+            news = [item for page in st.session_state.news_pages for item in page['articles']]
         
         for i, item in enumerate(news):
             with st.container():
@@ -365,6 +539,9 @@ def show_news():
                     st.markdown(item['summary'])
                     st.markdown(f"*{item['source']} - {item['date']}*")
                 st.markdown("---")
+        
+        if not news_query and st.session_state.news_pages[-1]['next_cursor'] is not None:
+            st.button("Cargar más", on_click=load_more_news, key="news_load_more")
     
     with tab2:
         # Show personalized news feed
@@ -465,7 +642,15 @@ def get_assistant_response(prompt):
         return "Tu perfil de riesgo actual es 4/7, lo que indica una tolerancia moderada. Esto nos permite explorar fondos con un equilibrio entre crecimiento y estabilidad. ¿Quieres que te muestre algunas opciones que se alinean con este perfil?"
     
     elif "rentabilidad" in prompt_lower:
-        return "Basado en tu perfil y las condiciones actuales del mercado, podemos apuntar a una rentabilidad anual entre el 7% y 8%. ¿Te gustaría explorar estrategias específicas para alcanzar este objetivo?"
+        # Back the answer with a simulation of the user's holdings
+        projection = project_portfolio(DEMO_HOLDINGS, model='bootstrap', n_paths=50_000)
+        if projection is None:
+            return "Ahora mismo no puedo calcular una proyección de tu cartera. ¿Quieres que revisemos juntos tu perfil de riesgo mientras tanto?"
+        annual = projection['annual_return']
+        return (f"He simulado 50.000 escenarios de tu cartera a 12 meses a partir de su comportamiento histórico. "
+                f"La rentabilidad anual mediana es del {annual[50]}%, y en el 90% de los escenarios queda entre "
+                f"el {annual[5]}% y el {annual[95]}%. La probabilidad de terminar el año en pérdidas es del "
+                f"{projection['prob_loss'] * 100:.1f}%. ¿Te gustaría explorar estrategias específicas para mejorar este rango?")
     
     elif "mercado" in prompt_lower or "tendencias" in prompt_lower:
         return "Las tendencias actuales del mercado muestran un fuerte desempeño en el sector tecnológico y energías renovables. Los mercados emergentes también están mostrando señales positivas. ¿Quieres que profundice en alguno de estos sectores?"
@@ -642,7 +827,14 @@ def show_data_scraper():
                 try:
                     # Get news using our new scraper function
                     from utils.scraper import scrape_ticker_news
-                    news_items = scrape_ticker_news(news_ticker.strip().upper(), limit=10)
+                    ticker = news_ticker.strip().upper()
+                    news_items = scrape_ticker_news(ticker, limit=10)
+                    
+                    # Keep what was scraped; serve stored articles when the scrape comes back empty
+                    if news_items:
+                        ingest_articles(news_items, tickers=[ticker])
+                    else:
+                        news_items = latest_articles([ticker], limit=10)
                     
                     if not news_items:
                         st.warning(f"No news found for {news_ticker.upper()}")
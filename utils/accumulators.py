@@ -0,0 +1,387 @@
+import os
+import json
+import math
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+# RiskMetrics decay for the EWMA variance of daily returns
+EWMA_LAMBDA = 0.94
+
+DEFAULT_STATE_PATH = os.environ.get(
+    'TRAID_ACCUMULATOR_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'accumulators.json')
+)
+
+# Running statistics, saved before each value so the last one can be revised
+_VALUE_FIELDS = ('count', 'mean', 'm2', 'first', 'last', 'peak', 'max_drawdown', 'ewma_var')
+
+# Fields written to the checkpoint, in order
+_STATE_FIELDS = _VALUE_FIELDS + ('last_time', 'decay', 'previous')
+
+
+def _to_ns(value):
+    """Convert a datetime-like value to epoch nanoseconds (None stays None)."""
+    return None if value is None else pd.Timestamp(value).as_unit('ns').value
+
+
+class StreamingStats:
+    """
+    Constant-time running statistics of a value series (price or portfolio value).
+
+    Each new value updates the Welford mean and variance of simple returns,
+    the running peak and maximum drawdown, and an EWMA variance of returns,
+    without keeping any history. Values stamped before the last one seen
+    are ignored, so replaying overlapping data is harmless, and a value
+    stamped at the last one revises it (e.g. a bar still in progress): the
+    state before the last value is kept, so a revision is undone and
+    re-applied in constant time.
+
+    Args:
+        decay (float): EWMA decay factor per observation
+    """
+
+    def __init__(self, decay=EWMA_LAMBDA):
+        self.decay = decay
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.first = None
+        self.last = None
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.ewma_var = None
+        self.last_time = None
+        self.previous = None
+
+    def update(self, value, time=None):
+        """
+        Add one value.
+
+        Args:
+            value (float): New level of the series
+            time (datetime-like): Timestamp of the value, used to skip
+                values already seen; a value at the last timestamp replaces
+                the last value
+
+        Returns:
+            bool: True if the value was applied
+        """
+        value = float(value)
+        stamp = _to_ns(time)
+        if not math.isfinite(value):
+            return False
+        if stamp is not None and self.last_time is not None:
+            if stamp < self.last_time:
+                return False
+            if stamp == self.last_time:
+                return self.revise(value)
+        if stamp is not None:
+            self.last_time = stamp
+        self._apply(value)
+        return True
+
+    def revise(self, value):
+        """
+        Replace the last value, e.g. when a bar still in progress changes.
+
+        Args:
+            value (float): New level of the last observation
+
+        Returns:
+            bool: True if the value was applied (False before any value, or
+                for a state loaded from a checkpoint without the previous one)
+        """
+        value = float(value)
+        if self.previous is None or not math.isfinite(value):
+            return False
+        for field, saved in self.previous.items():
+            setattr(self, field, saved)
+        self._apply(value)
+        return True
+
+    def _apply(self, value):
+        """Fold one new value into the running state, saving the state before it."""
+        self.previous = {field: getattr(self, field) for field in _VALUE_FIELDS}
+        if self.last is None:
+            self.first = self.last = self.peak = value
+            return
+
+        if self.last > 0:
+            ret = value / self.last - 1
+
+            # Welford update of mean and sum of squared deviations
+            self.count += 1
+            delta = ret - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (ret - self.mean)
+
+            # EWMA variance, seeded with the first squared return
+            squared = ret * ret
+            self.ewma_var = squared if self.ewma_var is None else self.decay * self.ewma_var + (1 - self.decay) * squared
+
+        self.last = value
+        if value > self.peak:
+            self.peak = value
+        elif self.peak > 0:
+            self.max_drawdown = min(self.max_drawdown, value / self.peak - 1)
+
+    def extend(self, values, times=None):
+        """
+        Add a batch of values in one vectorized step.
+
+        Gives the same state as calling update on each value in order; used
+        to seed an accumulator from history.
+
+        Args:
+            values (array): Values in time order
+            times (array): Matching timestamps (optional)
+
+        Returns:
+            int: Number of values applied, counting a revised last value
+        """
+        values = np.asarray(values, dtype=np.float64)
+        revised = 0
+        if times is not None:
+            stamps = pd.DatetimeIndex(times).as_unit('ns').asi8
+            if self.last_time is not None:
+                same = (stamps == self.last_time) & np.isfinite(values)
+                if same.any():
+                    revised = int(self.revise(values[same][-1]))
+                keep = stamps > self.last_time
+                values, stamps = values[keep], stamps[keep]
+        keep = np.isfinite(values)
+        values = values[keep]
+        if not len(values):
+            return revised
+        if times is not None:
+            self.last_time = int(stamps[keep][-1])
+
+        # The last value goes in on its own, so it can be revised later
+        if len(values) > 1:
+            self._merge(values[:-1])
+        self._apply(float(values[-1]))
+        return revised + len(values)
+
+    def _merge(self, values):
+        """Fold a batch of new finite values into the running state."""
+        if self.last is None:
+            self.first = self.last = self.peak = float(values[0])
+            levels = values
+        else:
+            levels = np.concatenate(([self.last], values))
+
+        previous = levels[:-1]
+        valid = previous > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (levels[1:] / previous - 1)[valid]
+
+        if len(returns):
+            # Chan et al. merge of the batch moments into the running ones
+            n = len(returns)
+            batch_mean = float(returns.mean())
+            batch_m2 = float(((returns - batch_mean) ** 2).sum())
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.m2 += batch_m2 + delta * delta * self.count * n / total
+            self.mean += delta * n / total
+            self.count = total
+
+            # EWMA recursion unrolled: decay^k weights on the squared returns
+            squared = returns * returns
+            if self.ewma_var is None:
+                start, squared = float(squared[0]), squared[1:]
+            else:
+                start = self.ewma_var
+            powers = self.decay ** np.arange(len(squared) - 1, -1, -1, dtype=np.float64)
+            self.ewma_var = self.decay ** len(squared) * start + (1 - self.decay) * float(powers @ squared)
+
+        peaks = np.maximum.accumulate(np.concatenate(([self.peak], values)))[1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(peaks > 0, values / peaks - 1, 0.0)
+        self.max_drawdown = min(self.max_drawdown, float(drawdowns.min()))
+        self.peak = float(peaks[-1])
+        self.last = float(values[-1])
+
+    def snapshot(self, periods_per_year=TRADING_DAYS):
+        """
+        Current metrics, computed from the running state only.
+
+        Args:
+            periods_per_year (int): Observations per year, for annualizing
+
+        Returns:
+            dict: 'current_value', 'growth_pct' (since the first value),
+                'mean_return' (annualized %), 'volatility' and
+                'ewma_volatility' (annualized %), 'drawdown' (current, %),
+                'max_drawdown' (%), 'observations' and 'last_time'
+        """
+        scale = math.sqrt(periods_per_year) * 100
+        variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        return {
+            'current_value': self.last,
+            'growth_pct': round((self.last / self.first - 1) * 100, 2) if self.first else 0.0,
+            'mean_return': round(self.mean * periods_per_year * 100, 2),
+            'volatility': round(math.sqrt(variance) * scale, 2),
+            'ewma_volatility': round(math.sqrt(self.ewma_var or 0.0) * scale, 2),
+            'drawdown': round((self.last / self.peak - 1) * 100, 2) if self.peak else 0.0,
+            'max_drawdown': round(self.max_drawdown * 100, 2),
+            'observations': self.count + (self.last is not None),
+            'last_time': None if self.last_time is None else pd.Timestamp(self.last_time),
+        }
+
+    def to_dict(self):
+        """State as a JSON-serializable dict."""
+        return {field: getattr(self, field) for field in _STATE_FIELDS}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild an accumulator from to_dict output."""
+        stats = cls(state.get('decay', EWMA_LAMBDA))
+        for field in _STATE_FIELDS:
+            if field in state:
+                setattr(stats, field, state[field])
+        return stats
+
+
+class AccumulatorBook:
+    """
+    Streaming statistics per portfolio and per ticker, checkpointed to disk.
+
+    Accumulators are created on first use and saved as one JSON file;
+    checkpoints are written to a temporary file and renamed into place, so
+    a crash never leaves a half-written state behind.
+
+    Args:
+        path (str): Checkpoint file
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def _key(kind, name):
+        return f"{kind}:{name}"
+
+    def get(self, kind, name):
+        """
+        Get the accumulator for a portfolio or ticker, creating it if needed.
+
+        Args:
+            kind (str): 'portfolio' or 'ticker'
+            name (str): Portfolio name or ticker symbol
+
+        Returns:
+            StreamingStats: The accumulator
+        """
+        key = self._key(kind, name)
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = StreamingStats()
+            return self._stats[key]
+
+    def portfolio(self, name='default'):
+        """Accumulator of a portfolio's value."""
+        return self.get('portfolio', name)
+
+    def ticker(self, symbol):
+        """Accumulator of a ticker's close."""
+        return self.get('ticker', symbol.upper())
+
+    def update(self, kind, name, value, time=None):
+        """
+        Feed one value to an accumulator.
+
+        Returns:
+            bool: True if the value was applied
+        """
+        stats = self.get(kind, name)
+        with self._lock:
+            applied = stats.update(value, time)
+            self._dirty = self._dirty or applied
+        return applied
+
+    def extend(self, kind, name, values, times=None):
+        """
+        Feed a batch of values to an accumulator.
+
+        Returns:
+            int: Number of values applied
+        """
+        stats = self.get(kind, name)
+        with self._lock:
+            applied = stats.extend(values, times)
+            self._dirty = self._dirty or applied > 0
+        return applied
+
+    def load(self):
+        """Replace the in-memory state with the checkpoint, if there is one."""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            with self._lock:
+                self._stats = {key: StreamingStats.from_dict(value) for key, value in state.items()}
+                self._dirty = False
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading accumulators from {self.path}: {str(e)}")
+
+    def checkpoint(self, force=False):
+        """
+        Write the state to disk if anything changed since the last checkpoint.
+
+        Args:
+            force (bool): Write even if nothing changed
+
+        Returns:
+            bool: True if a checkpoint was written
+        """
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            state = {key: stats.to_dict() for key, stats in self._stats.items()}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing accumulators to {self.path}: {str(e)}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def get_accumulators():
+    """
+    Get the process-wide accumulator book.
+
+    Returns:
+        AccumulatorBook: Book checkpointed at TRAID_ACCUMULATOR_PATH (or
+            data/accumulators.json)
+    """
+    global _book
+    with _book_lock:
+        if _book is None:
+            _book = AccumulatorBook()
+        return _book
@@ -0,0 +1,324 @@
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils.risk import returns_from_prices
+from utils.rng import date_bucket
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Series per side of a cached block of the cross-product matrix
+BLOCK_SIZE = 256
+
+# Price histories are refetched (and new bars folded in) once per bucket of this size
+CORRELATION_REFRESH = 'h'
+
+
+class BlockedCorrelation:
+    """
+    Pairwise return correlation of many series, cached in blocks.
+
+    The state is the number of return dates, the per-series sums of
+    returns and of squared returns, and the cross products x_i . x_j,
+    which is all a Pearson correlation needs. Cross products are kept in
+    BLOCK_SIZE x BLOCK_SIZE blocks, built from the return history the first
+    time a selection touches them; a selection of any size then only
+    gathers from cached blocks. New dates are folded into every cached
+    block with one small matrix product (and dates leaving the window are
+    subtracted), so the history is never rescanned.
+
+    A missing return (no bar that day) counts as zero, as when the previous
+    close is carried forward.
+
+    Args:
+        tickers (list): Series names, in row order
+        dates (array): Date of each return column (datetime-like, increasing)
+        returns (array): (series x date) simple returns
+        block_size (int): Series per side of a cached block
+    """
+
+    def __init__(self, tickers, dates, returns, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.RLock()
+        self._reset(tickers, dates, returns)
+
+    def _reset(self, tickers, dates, returns):
+        self.tickers = []
+        self.index = {}
+        self.dates = pd.DatetimeIndex(dates).as_unit('ns').asi8
+        self.returns = np.empty((0, len(self.dates)))
+        self.sums = np.empty(0)
+        self.squares = np.empty(0)
+        self._blocks = {}
+        self.add(tickers, returns)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @staticmethod
+    def _clean(returns, width):
+        returns = np.asarray(returns, dtype=np.float64).reshape(-1, width)
+        return np.where(np.isfinite(returns), returns, 0.0)
+
+    def add(self, tickers, returns):
+        """
+        Add series on the same dates; tickers already present are skipped.
+
+        Cached blocks covering the last, partly filled block of series are
+        dropped, since the new series land in it.
+
+        Args:
+            tickers (list): New series names
+            returns (array): Their (series x date) returns
+        """
+        returns = self._clean(returns, len(self.dates))
+        with self._lock:
+            keep = [i for i, ticker in enumerate(tickers) if ticker not in self.index]
+            if not keep:
+                return
+            first_block = len(self.tickers) // self.block_size
+            for ticker in (tickers[i] for i in keep):
+                self.index[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+            returns = returns[keep]
+            self.returns = np.vstack((self.returns, returns))
+            self.sums = np.concatenate((self.sums, returns.sum(axis=1)))
+            self.squares = np.concatenate((self.squares, np.einsum('ij,ij->i', returns, returns)))
+            self._blocks = {key: block for key, block in self._blocks.items() if max(key) < first_block}
+
+    def _span(self, block):
+        return slice(block * self.block_size, min((block + 1) * self.block_size, len(self.tickers)))
+
+    def _block(self, row, column):
+        """Cross products of two blocks of series (row <= column), built on first use."""
+        block = self._blocks.get((row, column))
+        if block is None:
+            block = self.returns[self._span(row)] @ self.returns[self._span(column)].T
+            self._blocks[(row, column)] = block
+        return block
+
+    def update(self, dates, returns):
+        """
+        Move to a newer window of the same series.
+
+        Dates before the new window are subtracted from the running sums
+        and every cached block, and dates after the old window are added,
+        each with one matrix product per block. The old last date is
+        subtracted and added back from the new returns, since it may have
+        come from a bar still in progress. A window that does not overlap
+        the old one (or moved backwards) is rebuilt from scratch.
+
+        Args:
+            dates (array): Date of each return column of the new window
+            returns (array): (series x date) returns, rows in self.tickers order
+
+        Returns:
+            bool: True if the update was incremental
+        """
+        stamps = pd.DatetimeIndex(dates).as_unit('ns').asi8
+        returns = self._clean(returns, len(stamps))
+        with self._lock:
+            old = self.dates
+            if not (len(stamps) and len(old) and old[0] <= stamps[0] <= old[-1] <= stamps[-1]):
+                self._reset(list(self.tickers), stamps, returns)
+                return False
+
+            leaving = (old < stamps[0]) | (old == old[-1])
+            arriving = stamps >= old[-1]
+            changes = [(self.returns[:, leaving], -1.0), (returns[:, arriving], 1.0)]
+            for values, sign in changes:
+                if not values.shape[1]:
+                    continue
+                self.sums += sign * values.sum(axis=1)
+                self.squares += sign * np.einsum('ij,ij->i', values, values)
+                for (row, column), block in self._blocks.items():
+                    block += sign * (values[self._span(row)] @ values[self._span(column)].T)
+
+            self.dates = stamps
+            self.returns = returns
+            return True
+
+    def cross_products(self, rows):
+        """
+        Cross products among some series, gathered from cached blocks.
+
+        Args:
+            rows (array): Series row numbers
+
+        Returns:
+            np.ndarray: (k x k) matrix of x_i . x_j
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        blocks = rows // self.block_size
+        local = rows % self.block_size
+        result = np.empty((len(rows), len(rows)))
+        groups = {}
+        for block in np.unique(blocks).tolist():
+            members = np.flatnonzero(blocks == block)
+            inner = local[members]
+            # A run of consecutive series in order is copied as a slice rather than gathered
+            run = None
+            if members[-1] - members[0] + 1 == len(members) and inner[-1] - inner[0] + 1 == len(members):
+                run = (slice(members[0], members[-1] + 1), slice(inner[0], inner[-1] + 1))
+            groups[block] = (members, inner, run)
+        with self._lock:
+            for row_block, (row_members, row_inner, row_run) in groups.items():
+                for column_block, (column_members, column_inner, column_run) in groups.items():
+                    if row_block > column_block:
+                        continue
+                    block = self._block(row_block, column_block)
+                    if row_run and column_run:
+                        values = block[row_run[1], column_run[1]]
+                        result[row_run[0], column_run[0]] = values
+                        result[column_run[0], row_run[0]] = values.T
+                    else:
+                        values = block[np.ix_(row_inner, column_inner)]
+                        result[np.ix_(row_members, column_members)] = values
+                        result[np.ix_(column_members, row_members)] = values.T
+        return result
+
+    def correlation(self, tickers):
+        """
+        Correlation matrix of some series.
+
+        Args:
+            tickers (list): Series names (all must have been added)
+
+        Returns:
+            pd.DataFrame: (k x k) Pearson correlations; NaN for a series
+                with no variation
+        """
+        rows = np.array([self.index[ticker] for ticker in tickers], dtype=np.int64)
+        with self._lock:
+            count = len(self.dates)
+            cross = self.cross_products(rows)
+            sums = self.sums[rows]
+            squares = self.squares[rows]
+
+        # In place, since a full selection is tens of millions of entries
+        count = max(count, 1)
+        spread = np.sqrt(np.maximum(squares - sums * sums / count, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = np.where(spread > 0, 1 / spread, np.nan)
+        values = cross
+        values -= np.outer(sums / np.sqrt(count), sums / np.sqrt(count))
+        values *= inverse[:, None]
+        values *= inverse[None, :]
+        np.clip(values, -1.0, 1.0, out=values)
+        np.fill_diagonal(values, np.where(spread > 0, 1.0, np.nan))
+        return pd.DataFrame(values, index=list(tickers), columns=list(tickers), copy=False)
+
+
+class CorrelationService:
+    """
+    One growing BlockedCorrelation per period, fed from stored price histories.
+
+    A selection only fetches the price histories of tickers the matrix has
+    not seen yet. Once per CORRELATION_REFRESH the histories of every known
+    ticker are refetched and the new bars folded into the cached blocks.
+    """
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._matrices = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(tickers, period):
+        """(tickers, return dates, (ticker x date) returns) from get_stock_data_batch closes."""
+        from utils.finance import get_stock_data_batch
+
+        panel = get_stock_data_batch(list(tickers), period)
+        returns = returns_from_prices(panel['Close'])
+        return panel['tickers'], panel['Date'][1:], returns
+
+    def get(self, tickers, period="1y"):
+        """
+        Get the matrix of a period, covering at least some tickers.
+
+        Price histories are fetched outside the service lock. If another
+        caller moved the matrix on meanwhile, the fetch is redone against
+        its new state.
+
+        Args:
+            tickers (list): Tickers the caller is about to select
+            period (str): Time period of the price histories
+
+        Returns:
+            BlockedCorrelation: Up-to-date matrix
+        """
+        bucket = date_bucket(freq=CORRELATION_REFRESH)
+        refetch = False
+        while True:
+            with self._lock:
+                matrix = self._matrices.get(period)
+                seen = self._buckets.get(period)
+                known = list(matrix.tickers) if matrix is not None else []
+                stale = matrix is not None and (refetch or seen != bucket)
+            known_set = set(known)
+            missing = [ticker for ticker in dict.fromkeys(tickers) if ticker not in known_set]
+            if not stale and not missing:
+                return matrix
+
+            # A refresh refetches every known ticker, together with the new ones
+            loaded, dates, returns = self._load((known if stale else []) + missing, period)
+            loaded = list(loaded)
+            dates = pd.DatetimeIndex(dates).as_unit('ns').asi8
+
+            with self._lock:
+                current = self._matrices.get(period)
+                if current is not matrix or self._buckets.get(period) != seen or \
+                        (current is not None and list(current.tickers) != known):
+                    continue
+                if matrix is None or (stale and loaded[:len(known)] != known):
+                    matrix = BlockedCorrelation(loaded, dates, returns, self.block_size)
+                elif stale:
+                    # Fold the new bars of every known ticker into the cached blocks
+                    matrix.update(dates, returns[:len(known)])
+                    matrix.add(loaded[len(known):], returns[len(known):])
+                elif np.array_equal(dates, matrix.dates):
+                    matrix.add(loaded, returns)
+                else:
+                    # The new tickers' histories end elsewhere: refetch the known ones too
+                    refetch = True
+                    continue
+                self._matrices[period] = matrix
+                self._buckets[period] = bucket
+                return matrix
+
+
+_service = CorrelationService()
+
+
+def get_correlation_service():
+    """
+    Get the process-wide correlation service.
+
+    Returns:
+        CorrelationService: Shared service instance
+    """
+    return _service
+
+
+def get_correlation_matrix(tickers, period="1y"):
+    """
+    Pairwise daily-return correlation of funds or stocks.
+
+    Args:
+        tickers (list): Fund or stock tickers
+        period (str): Time period of the price histories (1mo, 3mo, 6mo, 1y, 2y, 5y)
+
+    Returns:
+        pd.DataFrame: (ticker x ticker) correlations, or None on error
+    """
+    try:
+        tickers = list(dict.fromkeys(tickers))
+        return get_correlation_service().get(tickers, period).correlation(tickers)
+    except Exception as e:
+        logger.error(f"Error in get_correlation_matrix: {str(e)}")
+        return None
@@ -3,115 +3,587 @@ import pandas as pd
 import numpy as np
 import json
 import os
-import random
 import time
 from datetime import datetime, timedelta
+import asyncio
+import threading
 import logging
 
+from utils.store import get_store, to_dataframe
+from utils.providers import get_provider
+from utils.resample import GRID_ORIGIN, align_to_grid, get_resample_cache, resample_ohlcv
+from utils.rng import date_bucket, stream
+from utils.risk import TRADING_DAYS, risk_report
+from utils.accumulators import get_accumulators
+from utils.funds import get_fund_universe
+from utils.search import get_fund_search_index, query_tokens, rank_page
+from utils.paging import PAGE_SIZE, get_page_cache, page_cursors
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_stock_data(ticker_symbol, period="1y"):
+# Lookback window (days), bar frequency and bar length for each period
+PERIODS = {
+    "1d": (1, "1h", pd.Timedelta(hours=1)),
+    "5d": (5, "2h", pd.Timedelta(hours=2)),
+    "1mo": (30, "1D", pd.Timedelta(days=1)),
+    "3mo": (90, "1D", pd.Timedelta(days=1)),
+    "6mo": (180, "1D", pd.Timedelta(days=1)),
+    "1y": (365, "1D", pd.Timedelta(days=1)),
+    "2y": (730, "3D", pd.Timedelta(days=3)),
+    "5y": (1825, "1W", pd.Timedelta(weeks=1)),
+}
+DEFAULT_PERIOD = "1y"
+
+# Finest-grain base series (freq, bar) each frequency is derived from
+BASE_FREQS = {
+    "1h": ("1h", pd.Timedelta(hours=1)),
+    "2h": ("1h", pd.Timedelta(hours=1)),
+    "1D": ("1D", pd.Timedelta(days=1)),
+    "3D": ("1D", pd.Timedelta(days=1)),
+    "1W": ("1D", pd.Timedelta(days=1)),
+}
+
+# A stored bar still in progress is re-requested at most once per bucket of this size
+REVISION_REFRESH = 'min'
+_REVISION_NS = pd.Timedelta(1, unit=REVISION_REFRESH).value
+_revisions = {}
+_revisions_lock = threading.Lock()
+
+# Stored series brought up to an end date in the current revision bucket:
+# (store root, ticker, freq) -> (end_date, bucket) of their last refresh
+_refreshed = {}
+
+STOCK_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close']
+
+# Column dtypes of compact mode (Date as epoch ns rather than datetime64)
+COMPACT_DTYPES = {
+    'Date': np.int64,
+    'Open': np.float32,
+    'High': np.float32,
+    'Low': np.float32,
+    'Close': np.float32,
+    'Volume': np.uint32,
+    'Adj Close': np.float32,
+}
+
+def _grid_floor(timestamp, bar):
+    """Round a timestamp down to the bar grid."""
+    return GRID_ORIGIN + ((timestamp - GRID_ORIGIN) // bar) * bar
+
+def _period_window(period):
+    """
+    Resolve a period into its bar-aligned window.
+    
+    Args:
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        
+    Returns:
+        tuple: (start_date, end_date, freq, bar) with both ends on the bar grid
+    """
+    days, freq, bar = PERIODS.get(period, PERIODS[DEFAULT_PERIOD])
+    
+    # Align the window to a fixed grid so repeated calls hit the same timestamps
+    end_date = _grid_floor(pd.Timestamp(datetime.now()), bar)
+    start_date = end_date - (pd.Timedelta(days=days) // bar) * bar
+    return start_date, end_date, freq, bar
+
+def periods_per_year(period):
+    """
+    Bars per year of a period's frequency, for annualizing.
+    
+    A daily bar counts as one of TRADING_DAYS and other bars in proportion
+    to their length, so annualized figures agree across periods.
+    
+    Args:
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        
+    Returns:
+        float: Bars per year
+    """
+    _, _, bar = PERIODS.get(period, PERIODS[DEFAULT_PERIOD])
+    return TRADING_DAYS * (pd.Timedelta(days=1) / bar)
+
+def _base_window(freq):
+    """
+    Resolve the window of the base series a frequency is derived from.
+    
+    The base series reaches back far enough to serve every period built on
+    it, plus one coarse bar so the oldest derived bar is complete.
+    
+    Args:
+        freq (str): Bar frequency of the requested series
+        
+    Returns:
+        tuple: (start_date, end_date, base_freq, base_bar)
+    """
+    base_freq, base_bar = BASE_FREQS[freq]
+    lookback = max(pd.Timedelta(days=days) + bar
+                   for days, period_freq, bar in PERIODS.values()
+                   if BASE_FREQS[period_freq][0] == base_freq)
+    
+    end_date = _grid_floor(pd.Timestamp(datetime.now()), base_bar)
+    start_date = end_date - (lookback // base_bar) * base_bar
+    return start_date, end_date, base_freq, base_bar
+
+def _slice_window(columns, start_date, end_date):
+    """Slice columns (epoch ns 'Date') to [start_date, end_date] without copying."""
+    dates = columns['Date']
+    lo = int(np.searchsorted(dates, start_date.as_unit('ns').value, side='left'))
+    hi = int(np.searchsorted(dates, end_date.as_unit('ns').value, side='right'))
+    return {name: values[..., lo:hi] for name, values in columns.items()}
+
+def _compact(columns):
+    """
+    Cast OHLCV columns to COMPACT_DTYPES.
+    
+    Volumes beyond the uint32 range saturate at its maximum; NaN volumes
+    (panel slots before a ticker's first bar) become 0.
+    
+    Args:
+        columns (dict): Column name to array; 'Date' as epoch ns or datetime64
+        
+    Returns:
+        dict: Compact copies of the columns
+    """
+    compact = {}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if name == 'Date':
+            compact[name] = values.astype('datetime64[ns]').view(np.int64) if values.dtype.kind == 'M' else values.astype(np.int64)
+        elif name == 'Volume':
+            limit = np.iinfo(np.uint32).max
+            compact[name] = np.clip(np.nan_to_num(values), 0, limit).astype(np.uint32)
+        elif name in COMPACT_DTYPES:
+            compact[name] = values.astype(np.float32)
+        else:
+            compact[name] = values
+    return compact
+
+def _to_frame(columns, compact):
+    """Wrap columns in a get_stock_data DataFrame, compact or not."""
+    if compact:
+        return pd.DataFrame(_compact({name: columns[name] for name in STOCK_COLUMNS}), columns=STOCK_COLUMNS)
+    return to_dataframe(columns)
+
+def _empty_frame(compact):
+    """Empty get_stock_data DataFrame."""
+    if compact:
+        return pd.DataFrame({name: np.empty(0, dtype=COMPACT_DTYPES[name]) for name in STOCK_COLUMNS})
+    return pd.DataFrame(columns=STOCK_COLUMNS)
+
+def _provider_store():
+    """Get the OHLCV store holding series from the current bars provider."""
+    provider = get_provider()
+    return get_store(provider.store_namespace, provider.store_version)
+
+def _load_window(ticker_symbol, start_date, end_date, freq, bar):
+    """
+    Load a window of a ticker's series from its stored base series.
+    
+    Base frequencies are sliced straight out of the memory-mapped store;
+    coarser ones come from the resample cache, which only rebuilds a view
+    after the base series has gained bars.
+    
+    Returns:
+        dict: Column name to array, 'Date' as epoch ns
+    """
+    store = _provider_store()
+    base_freq, _ = BASE_FREQS[freq]
+    if freq == base_freq:
+        return store.load_range(ticker_symbol, start_date, end_date, freq)
+    
+    base = store.load(ticker_symbol, base_freq)
+    view = get_resample_cache().get((ticker_symbol, base_freq, freq), base, bar, GRID_ORIGIN)
+    return _slice_window(view, start_date, end_date)
+
+def _revision_bucket():
+    """Index of the current REVISION_REFRESH bucket (cheaper than date_bucket on the warm path)."""
+    return time.time_ns() // _REVISION_NS
+
+def _revision_due(ticker, freq):
+    """Whether the stored bar in progress of a series is due to be re-requested."""
+    key = (get_provider().store_namespace, ticker, freq)
+    bucket = _revision_bucket()
+    with _revisions_lock:
+        if _revisions.get(key) == bucket:
+            return False
+        _revisions[key] = bucket
+        return True
+
+def _refresh_stored_series(tickers, start_date, end_date, freq, bar):
+    """
+    Bring the stored series of some tickers up to end_date.
+    
+    Series already in the store get their last stored bar again (it may
+    have been partial when stored) plus the bars after it, requested from
+    the provider together per shared last timestamp and written in place.
+    A last bar that is still in progress is re-requested at most once per
+    REVISION_REFRESH. Tickers with no usable series get the whole window in
+    one provider call, so both paths store the same bars. Series this
+    process already brought up to end_date in the current REVISION_REFRESH
+    bucket are skipped without touching the store.
+    
+    Returns:
+        int: Number of bars added to the store
+    """
+    provider = get_provider()
+    store = _provider_store()
+    current = (end_date, _revision_bucket())
+    with _revisions_lock:
+        tickers = [ticker for ticker in tickers if _refreshed.get((store.root, ticker, freq)) != current]
+    if not tickers:
+        return 0
+    
+    rebuild = []
+    stale = {}
+    for ticker in tickers:
+        bounds = store.bounds(ticker, freq)
+        if bounds is None or (provider.backfills and bounds[0] > start_date):
+            rebuild.append(ticker)
+        elif bounds[1] < end_date or (bounds[1] == end_date and _revision_due(ticker, freq)):
+            stale.setdefault(bounds[1], []).append(ticker)
+    
+    added = 0
+    
+    # Incremental path: the last stored bar, revised, and the bars after it
+    for last, group in stale.items():
+        bars = provider.get_bars(group, last, end_date, bar)
+        for ticker, columns in bars.items():
+            added += store.append(ticker, columns, freq, revise=True)
+    
+    # Full path: nothing stored (or not far enough back)
+    if rebuild:
+        bars = provider.get_bars(rebuild, start_date, end_date, bar)
+        for ticker, columns in bars.items():
+            if len(columns['Date']):
+                store.write(ticker, columns, freq)
+                added += len(columns['Date'])
+    
+    with _revisions_lock:
+        for ticker in tickers:
+            _refreshed[(store.root, ticker, freq)] = current
+    return added
+
+def refresh_stock_data(tickers, period="1y"):
+    """
+    Incrementally update the stored price history of one or more tickers.
+    
+    Only the last stored bar of each ticker's base series (revised, since
+    it may have been partial) and the bars after it are requested from the
+    provider and written, so a refresh costs O(new bars) rather than
+    O(window). Views derived from the base series are rebuilt
+    lazily on their next read.
+    
+    Args:
+        tickers (str or list): Stock ticker symbol(s)
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        
+    Returns:
+        int: Number of bars added to the store
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    try:
+        _, _, freq, _ = _period_window(period)
+        return _refresh_stored_series(list(tickers), *_base_window(freq))
+    except Exception as e:
+        logger.error(f"Error in refresh_stock_data: {str(e)}")
+        return 0
+
+def get_stock_data(ticker_symbol, period="1y", compact=False):
     """
     Get historical stock data for a specific ticker symbol.
     
+    Bars come from the configured market-data provider (see
+    utils.providers; synthetic by default). Each ticker has one
+    finest-grain base series (hourly for 1d/5d, daily otherwise) kept in the
+    on-disk OHLCV store (see utils.store) and refreshed incrementally: only
+    the last stored bar and newer ones are requested. Base-frequency
+    windows are zero-copy views of the memory-mapped file; coarser periods
+    (2y, 5y) are resampled from the base series (see utils.resample), so
+    every period of a ticker agrees.
+    
     Args:
         ticker_symbol (str): The stock ticker symbol
-        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        compact (bool): Return float32 prices, uint32 volume and int64
+            epoch-ns dates (see COMPACT_DTYPES) instead of a zero-copy view
         
     Returns:
         pd.DataFrame: DataFrame containing the historical stock data
     """
     try:
-        # In a real implementation, you would use yfinance or another API
-        # For simulation, we'll generate synthetic data
         logger.info(f"Getting stock data for {ticker_symbol} with period {period}")
         
-        # Generate date range
-        end_date = datetime.now()
-        
-        # Determine start date based on period
-        if period == "1d":
-            start_date = end_date - timedelta(days=1)
-            freq = "1H"
-        elif period == "5d":
-            start_date = end_date - timedelta(days=5)
-            freq = "2H"
-        elif period == "1mo":
-            start_date = end_date - timedelta(days=30)
-            freq = "1D"
-        elif period == "3mo":
-            start_date = end_date - timedelta(days=90)
-            freq = "1D"
-        elif period == "6mo":
-            start_date = end_date - timedelta(days=180)
-            freq = "1D"
-        elif period == "1y":
-            start_date = end_date - timedelta(days=365)
-            freq = "1D"
-        elif period == "2y":
-            start_date = end_date - timedelta(days=730)
-            freq = "3D"
-        elif period == "5y":
-            start_date = end_date - timedelta(days=1825)
-            freq = "1W"
-        else:  # Default to 1y
-            start_date = end_date - timedelta(days=365)
-            freq = "1D"
-        
-        # Generate date range
-        date_range = pd.date_range(start=start_date, end=end_date, freq=freq)
-        
-        # Generate synthetic prices based on ticker symbol
-        ticker_hash = sum(ord(c) for c in ticker_symbol) % 100
-        base_price = 50 + ticker_hash  # Different base price for different tickers
-        
-        # Generate a random walk
-        random_walk = np.random.normal(0, 1, size=len(date_range)).cumsum() * 0.5
-        
-        # Add a trend component based on ticker
-        trend_factor = (ticker_hash % 10 - 5) / 10  # Range: -0.5 to 0.4
-        trend = np.linspace(0, len(date_range) * trend_factor, len(date_range))
+        start_date, end_date, freq, bar = _period_window(period)
+        base_start, base_end, base_freq, base_bar = _base_window(freq)
+        
+        try:
+            _refresh_stored_series([ticker_symbol], base_start, base_end, base_freq, base_bar)
+            columns = _load_window(ticker_symbol, start_date, end_date, freq, bar)
+            if columns is not None:
+                return _to_frame(columns, compact)
+        except Exception as e:
+            logger.warning(f"OHLCV store unavailable for {ticker_symbol}: {str(e)}")
+        
+        # Go straight to the provider when the store cannot serve the window
+        columns = get_provider().get_bars([ticker_symbol], base_start, base_end, base_bar).get(ticker_symbol)
+        if columns is None:
+            return _empty_frame(compact)
+        if freq != base_freq:
+            columns = resample_ohlcv(columns, bar, GRID_ORIGIN)
+        return _to_frame(_slice_window(columns, start_date, end_date), compact)
+    except Exception as e:
+        logger.error(f"Error in get_stock_data: {str(e)}")
+        # Return an empty DataFrame with correct columns
+        return _empty_frame(compact)
+
+async def aget_stock_data(ticker_symbol, period="1y", compact=False):
+    """Async version of get_stock_data (runs in a worker thread)."""
+    return await asyncio.to_thread(get_stock_data, ticker_symbol, period, compact)
+
+def get_stock_data_batch(tickers, period="1y", use_store=True, compact=False):
+    """
+    Get historical stock data for many ticker symbols as one panel.
+    
+    The base series of every ticker is refreshed in the store (tickers with
+    no stored history are fetched from the provider in one call), aligned
+    onto a shared (ticker x date) grid, and resampled to the period's
+    frequency in a single pass over the whole panel. Without the store, the
+    base panel comes straight from the provider.
+    
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        use_store (bool): Read from and write to the OHLCV store
+        compact (bool): Cast the fields to COMPACT_DTYPES; 'Date' is then
+            an int64 epoch-ns array
         
-        # Add some seasonality
-        seasonality = np.sin(np.linspace(0, 10, len(date_range))) * 2
-        
-        # Calculate prices
-        prices = base_price + random_walk + trend + seasonality
-        
-        # Create a DataFrame
-        df = pd.DataFrame({
-            'Date': date_range,
-            'Open': prices,
-            'High': prices + np.random.uniform(0.1, 1, size=len(date_range)),
-            'Low': prices - np.random.uniform(0.1, 1, size=len(date_range)),
-            'Close': prices + np.random.uniform(-0.5, 0.5, size=len(date_range)),
-            'Volume': np.random.randint(100000, 10000000, size=len(date_range))
-        })
+    Returns:
+        dict: Panel with 'tickers', 'Date' (pd.DatetimeIndex) and one
+            (ticker x date) array per OHLCV field
+    """
+    tickers = list(dict.fromkeys(tickers))
+    try:
+        logger.info(f"Getting stock data for {len(tickers)} tickers with period {period}")
+        
+        start_date, end_date, freq, bar = _period_window(period)
+        base_start, base_end, base_freq, base_bar = _base_window(freq)
+        grid = pd.date_range(start=base_start, end=base_end, freq=base_bar).as_unit('ns').asi8
+        fields = STOCK_COLUMNS[1:]
+        provider = get_provider()
+        
+        missing = list(range(len(tickers)))
+        if use_store:
+            panel = {field: np.empty((len(tickers), len(grid)),
+                                     dtype=np.int64 if field == 'Volume' else np.float64)
+                     for field in fields}
+            try:
+                _refresh_stored_series(tickers, base_start, base_end, base_freq, base_bar)
+                store = _provider_store()
+                missing = []
+                for i, ticker in enumerate(tickers):
+                    columns = store.load_range(ticker, base_start, base_end, base_freq)
+                    if columns is None:
+                        missing.append(i)
+                        continue
+                    aligned = align_to_grid(columns, grid)
+                    for field in fields:
+                        panel[field][i] = aligned[field]
+            except Exception as e:
+                logger.warning(f"OHLCV store unavailable for batch: {str(e)}")
+            
+            # Anything the store could not serve comes from the provider in one call
+            if missing:
+                fetched = provider.get_panel([tickers[i] for i in missing], base_start, base_end, base_bar)
+                for field in fields:
+                    panel[field][missing] = fetched[field]
+        else:
+            panel = provider.get_panel(tickers, base_start, base_end, base_bar)
         
-        # Ensure Open, High, Low, Close make sense
-        df['High'] = df[['Open', 'High', 'Close']].max(axis=1)
-        df['Low'] = df[['Open', 'Low', 'Close']].min(axis=1)
+        panel['Date'] = grid
+        if freq != base_freq:
+            panel = resample_ohlcv(panel, bar, GRID_ORIGIN)
+        panel = _slice_window(panel, start_date, end_date)
         
-        # Calculate Adjusted Close (simulating dividends and splits)
-        df['Adj Close'] = df['Close']
+        if compact:
+            panel = _compact(panel)
+        else:
+            panel['Date'] = pd.DatetimeIndex(panel['Date'].view('datetime64[ns]'))
+        panel['tickers'] = tickers
+        return panel
+    except Exception as e:
+        logger.error(f"Error in get_stock_data_batch: {str(e)}")
+        empty = {field: np.empty((len(tickers), 0), dtype=COMPACT_DTYPES[field] if compact else np.float64)
+                 for field in STOCK_COLUMNS[1:]}
+        empty['tickers'] = tickers
+        empty['Date'] = np.empty(0, dtype=np.int64) if compact else pd.DatetimeIndex([])
+        return empty
+
+async def aget_stock_data_batch(tickers, period="1y", use_store=True, compact=False):
+    """Async version of get_stock_data_batch (runs in a worker thread)."""
+    return await asyncio.to_thread(get_stock_data_batch, tickers, period, use_store, compact)
+
+def panel_to_frame(panel, field='Close'):
+    """
+    Turn one field of a stock panel into a date-indexed DataFrame.
+    
+    Args:
+        panel (dict): Panel as returned by get_stock_data_batch
+        field (str): OHLCV field to extract
         
-        # Ensure all values are positive
-        for col in ['Open', 'High', 'Low', 'Close', 'Adj Close']:
-            df[col] = df[col].apply(lambda x: max(0.1, x))
+    Returns:
+        pd.DataFrame: One column per ticker, indexed by date
+    """
+    dates = panel['Date']
+    if not isinstance(dates, pd.DatetimeIndex):
+        dates = pd.DatetimeIndex(np.asarray(dates).view('datetime64[ns]'))
+    return pd.DataFrame(panel[field].T, index=dates, columns=panel['tickers'])
+
+def _live_quote(ticker, columns, now, simulated):
+    """
+    Quote a ticker off its latest bars.
+    
+    The price is the close of the bar in progress. For simulated providers
+    the close only moves once per bar, so ticks inside a bar are drawn
+    between its low and high from a stream keyed by ticker and tick time,
+    which keeps them reproducible.
+    
+    Returns:
+        dict: 'price', 'change' and 'change_percent' (vs. the previous close)
+            and 'time' of the tick
+    """
+    price = float(columns['Close'][-1])
+    if simulated:
+        rng = stream('tick', ticker, now.isoformat())
+        low, high = float(columns['Low'][-1]), float(columns['High'][-1])
+        price = low + rng.random() * (high - low)
+    previous = float(columns['Close'][-2]) if len(columns['Date']) > 1 else float(columns['Open'][-1])
+    change = price - previous
+    return {
+        'price': round(price, 2),
+        'change': round(change, 2),
+        'change_percent': round(change / previous * 100, 2) if previous else 0.0,
+        'time': now,
+    }
+
+def _poll_market_data(tickers, period, last_seen):
+    """
+    Collect the bars and quotes that appeared since the previous poll.
+    
+    Args:
+        tickers (list): Subscribed ticker symbols
+        period (str): Period whose bar frequency is streamed
+        last_seen (dict): Ticker to (timestamp as epoch ns, close) of the
+            last bar sent; updated in place
         
-        return df
-    except Exception as e:
-        logger.error(f"Error in get_stock_data: {str(e)}")
-        # Return an empty DataFrame with correct columns
-        return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close'])
+    Returns:
+        dict: Update with 'time', 'bars' (ticker to DataFrame of new or
+            revised bars) and 'quotes' (ticker to quote tick)
+    """
+    now = pd.Timestamp(datetime.now()).floor('s')
+    start_date, end_date, freq, bar = _period_window(period)
+    base_start, base_end, base_freq, base_bar = _base_window(freq)
+    _refresh_stored_series(tickers, base_start, base_end, base_freq, base_bar)
+    
+    simulated = get_provider().backfills
+    update = {'time': now, 'bars': {}, 'quotes': {}}
+    for ticker in tickers:
+        columns = _load_window(ticker, start_date, end_date, freq, bar)
+        if columns is None or len(columns['Date']) == 0:
+            continue
+        
+        sent, sent_close = last_seen.get(ticker, (None, None))
+        if sent is None:
+            # Subscribing: the caller already has the history up to here
+            new = np.zeros(len(columns['Date']), dtype=bool)
+        else:
+            # The last bar sent may have been in progress and revised since
+            at = int(np.searchsorted(columns['Date'], sent))
+            revised = at < len(columns['Date']) and float(columns['Close'][at]) != sent_close
+            new = columns['Date'] >= sent if revised else columns['Date'] > sent
+        
+        if new.any():
+            update['bars'][ticker] = to_dataframe({name: values[new] for name, values in columns.items()})
+        last_seen[ticker] = (int(columns['Date'][-1]), float(columns['Close'][-1]))
+        update['quotes'][ticker] = _live_quote(ticker, columns, now, simulated)
+    return update
+
+def stream_market_data(tickers, period="1d", interval=5.0, max_updates=None):
+    """
+    Stream new bars and quote ticks for a set of tickers.
+    
+    Every `interval` seconds the subscribed tickers' base series are
+    refreshed incrementally (see refresh_stock_data) and one update is
+    yielded with the bars that appeared since the previous one plus a quote
+    tick per ticker. The first update only carries quotes; load the history
+    with get_stock_data or get_stock_data_batch first and extend it with the
+    streamed bars. The latest bar already sent may come again with revised
+    values while it is in progress, so replace points with the same Date.
+    
+    Args:
+        tickers (str or list): Stock ticker symbol(s) to subscribe to
+        period (str): Period whose bar frequency is streamed (1d = hourly bars)
+        interval (float): Seconds between updates
+        max_updates (int): Stop after this many updates (None streams forever)
+        
+    Yields:
+        dict: 'time' (pd.Timestamp), 'bars' (ticker to DataFrame of new or
+            revised bars) and 'quotes' (ticker to dict with 'price', 'change',
+            'change_percent' and 'time')
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    tickers = list(dict.fromkeys(tickers))
+    last_seen = {}
+    count = 0
+    while max_updates is None or count < max_updates:
+        started = time.monotonic()
+        try:
+            yield _poll_market_data(tickers, period, last_seen)
+        except Exception as e:
+            logger.error(f"Error in stream_market_data: {str(e)}")
+        count += 1
+        if max_updates is None or count < max_updates:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
-def get_portfolio_metrics():
+async def astream_market_data(tickers, period="1d", interval=5.0, max_updates=None):
+    """
+    Async version of stream_market_data.
+    
+    Polls run in a worker thread and the waits use asyncio.sleep, so the
+    event loop stays free between updates.
+    
+    Yields:
+        dict: Same updates as stream_market_data
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    tickers = list(dict.fromkeys(tickers))
+    last_seen = {}
+    count = 0
+    loop = asyncio.get_running_loop()
+    while max_updates is None or count < max_updates:
+        started = loop.time()
+        try:
+            yield await asyncio.to_thread(_poll_market_data, tickers, period, last_seen)
+        except Exception as e:
+            logger.error(f"Error in astream_market_data: {str(e)}")
+        count += 1
+        if max_updates is None or count < max_updates:
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+def get_portfolio_metrics(compact=False):
     """
     Calculate metrics for a user's portfolio.
     In a production environment, this would use real portfolio data.
     
+    Args:
+        compact (bool): Return 'date' as int64 epoch ns and 'value' as
+            float32, without the 'date_range'/'value_series' aliases
+    
     Returns:
         dict: Dictionary containing portfolio metrics
     """
@@ -132,7 +604,8 @@ def get_portfolio_metrics():
         trend = np.linspace(0, growth_factor, len(date_range))
         
         # Add random walk component
-        random_walk = np.random.normal(0, 0.01, size=len(date_range)).cumsum()
+        # Same walk for every call on the same day
+        random_walk = stream('portfolio', date_bucket()).normal(0, 0.01, size=len(date_range)).cumsum()
         
         # Add some seasonality
         seasonality = np.sin(np.linspace(0, 12, len(date_range))) * 0.03
@@ -157,15 +630,29 @@ def get_portfolio_metrics():
         # Calculate volatility (annualized)
         volatility = portfolio_df['daily_return'].std() * np.sqrt(252) * 100
         
+        # Risk-adjusted figures from the same daily returns
+        risk = risk_report(portfolio_df['daily_return'].to_numpy()[1:], rolling=False)
+        
         result = {
-            'date_range': date_range,
-            'value_series': values,
             'current_value': int(current_value),
             'growth_rate': round(growth_pct, 1),
             'volatility': round(volatility, 2),
+            'sharpe_ratio': round(float(risk['sharpe'][0]), 2),
+            'sortino_ratio': round(float(risk['sortino'][0]), 2),
+            'max_drawdown': round(float(risk['max_drawdown'][0]) * 100, 2),
+            'max_drawdown_days': int(risk['drawdown_duration'][0]),
+            'var_95': round(float(risk['var'][0]) * 100, 2),
+            'cvar_95': round(float(risk['cvar'][0]) * 100, 2),
             'date': date_range,
             'value': values
         }
+        if compact:
+            result['date'] = date_range.as_unit('ns').asi8
+            result['value'] = values.astype(np.float32)
+        else:
+            # Older callers read the series under these names
+            result['date_range'] = date_range
+            result['value_series'] = values
         
         return result
     except Exception as e:
@@ -179,106 +666,163 @@ def get_portfolio_metrics():
             'value': [1000000]
         }
 
+def get_portfolio_snapshot(name='default'):
+    """
+    Serve the portfolio's headline metrics from its streaming accumulator.
+    
+    The accumulator is seeded from get_portfolio_metrics history at most
+    once per day; every other call reads the running state only. A reseed
+    only takes the day-to-day moves of the days after the last stored
+    value and chains them onto it, since each day's history is redrawn and
+    would otherwise make the stored series jump. Feed new values with
+    get_accumulators().update('portfolio', name, value, time).
+    
+    Args:
+        name (str): Portfolio name
+        
+    Returns:
+        dict: StreamingStats.snapshot fields ('growth_pct' is the growth
+            since the first stored value); 'current_value' is an int
+    """
+    try:
+        book = get_accumulators()
+        stats = book.portfolio(name)
+        today = pd.Timestamp(date_bucket())
+        if stats.last_time is None or pd.Timestamp(stats.last_time) < today:
+            metrics = get_portfolio_metrics()
+            dates = pd.DatetimeIndex(metrics['date'])
+            values = np.asarray(metrics['value'], dtype=np.float64)
+            if stats.last is not None:
+                # Carry the last stored value forward
+                at = max(int(dates.searchsorted(pd.Timestamp(stats.last_time), side='right')) - 1, 0)
+                values = values * (stats.last / values[at])
+            book.extend('portfolio', name, values, dates)
+            book.checkpoint()
+        
+        snapshot = stats.snapshot()
+        snapshot['current_value'] = int(snapshot['current_value'])
+        return snapshot
+    except Exception as e:
+        logger.error(f"Error in get_portfolio_snapshot: {str(e)}")
+        return {
+            'current_value': 1000000,
+            'growth_pct': 5.0,
+            'volatility': 12.5,
+            'ewma_volatility': 12.5,
+            'drawdown': 0.0,
+            'max_drawdown': 0.0,
+        }
+
 def get_fund_data(fund_category=None, limit=10):
     """
     Get fund data based on category.
     
+    Funds come from the shared fund universe (see utils.funds), built once
+    per day; a category's best funds are read off its precomputed index, so
+    a call costs O(limit) rather than O(universe).
+    
     Args:
         fund_category (str): Category of funds (e.g., 'Technology', 'Global', 'ESG')
         limit (int): Maximum number of funds to return
         
     Returns:
-        list: List of dictionaries containing fund data
+        list: List of dictionaries containing fund data, best one-year return first
     """
     try:
-        # In a real implementation, you would fetch this from an API or database
-        # For demonstration, we'll use synthetic data
-        
-        # Define some fund categories and subcategories
-        categories = {
-            'Technology': ['Tech Giants', 'Emerging Tech', 'Biotech', 'Fintech', 'AI & Robotics'],
-            'Global': ['Developed Markets', 'Emerging Markets', 'Global Diversified', 'International Small Cap'],
-            'ESG': ['Clean Energy', 'Sustainable Investments', 'Social Impact', 'Green Bonds'],
-            'Fixed Income': ['Government Bonds', 'Corporate Bonds', 'High Yield', 'Municipal Bonds'],
-            'Sector': ['Healthcare', 'Real Estate', 'Energy', 'Materials', 'Consumer Goods'],
-            'Alternative': ['Commodities', 'Hedge Fund Strategies', 'Private Equity', 'Infrastructure']
-        }
-        
-        # Generate fund names
-        prefixes = ['Global', 'Emerging', 'Strategic', 'Enhanced', 'Dynamic', 'Sustainable', 'Prime', 'Select', 'Value']
-        core_names = ['Growth', 'Income', 'Balanced', 'Opportunity', 'Leaders', 'Index', 'Capital', 'Alpha', 'Beta']
-        suffixes = ['Fund', 'ETF', 'Portfolio', 'Trust', 'Allocation', 'Strategy']
-        
-        # Generate a list of funds
-        all_funds = []
-        
-        # Seed random for consistent results
-        random.seed(42)
-        
-        for category, subcategories in categories.items():
-            for subcategory in subcategories:
-                # Generate a few funds for each subcategory
-                for _ in range(random.randint(1, 3)):
-                    prefix = random.choice(prefixes)
-                    core = random.choice(core_names)
-                    suffix = random.choice(suffixes)
-                    
-                    # Generate the fund name
-                    fund_name = f"{prefix} {subcategory} {core} {suffix}"
-                    
-                    # Generate fund ticker (random 3-5 letter combination)
-                    ticker_length = random.randint(3, 5)
-                    ticker = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=ticker_length))
-                    
-                    # Generate performance metrics
-                    one_year_return = random.uniform(-10, 30)
-                    three_year_return = random.uniform(-5, 25)
-                    five_year_return = random.uniform(0, 20)
-                    ytd_return = random.uniform(-15, 25)
-                    
-                    # Risk metrics
-                    sharpe_ratio = random.uniform(0.5, 2.5)
-                    volatility = random.uniform(5, 25)
-                    
-                    # Fund details
-                    expense_ratio = random.uniform(0.05, 1.5)
-                    aum = random.uniform(10, 10000)  # Assets under management in millions
-                    min_investment = random.choice([0, 1000, 2500, 5000, 10000, 25000, 50000])
-                    
-                    # Risk score (1-5, higher is riskier)
-                    risk_score = random.randint(1, 5)
-                    
-                    fund = {
-                        'name': fund_name,
-                        'ticker': ticker,
-                        'category': category,
-                        'subcategory': subcategory,
-                        'one_year_return': round(one_year_return, 2),
-                        'three_year_return': round(three_year_return, 2),
-                        'five_year_return': round(five_year_return, 2),
-                        'ytd_return': round(ytd_return, 2),
-                        'sharpe_ratio': round(sharpe_ratio, 2),
-                        'volatility': round(volatility, 2),
-                        'expense_ratio': round(expense_ratio, 2),
-                        'aum': round(aum, 2),
-                        'min_investment': min_investment,
-                        'risk_score': risk_score,
-                        'inception_date': (datetime.now() - timedelta(days=random.randint(365, 7300))).strftime('%Y-%m-%d')
-                    }
-                    
-                    all_funds.append(fund)
-        
-        # If a category is specified, filter by it
-        if fund_category:
-            filtered_funds = [f for f in all_funds if f['category'].lower() == fund_category.lower()]
-        else:
-            filtered_funds = all_funds
-        
-        # Sort by one_year_return (default sorting)
-        sorted_funds = sorted(filtered_funds, key=lambda x: x['one_year_return'], reverse=True)
-        
-        # Return limited number of funds
-        return sorted_funds[:limit]
+        return get_fund_universe().top(limit, fund_category)
     except Exception as e:
         logger.error(f"Error in get_fund_data: {str(e)}")
         return []
+
+def screen_funds(filters=None, match='all', fund_category=None, sort_by='one_year_return', ascending=False, limit=10):
+    """
+    Screen the fund universe with range filters and rank the matches.
+    
+    Args:
+        filters (dict): Field to (low, high) inclusive bounds, None for an
+            open side, e.g. {'volatility': (None, 12), 'risk_score': (1, 3)};
+            fields are utils.funds.SCREEN_FIELDS
+        match (str): 'all' to require every filter, 'any' for at least one
+        fund_category (str): Only funds of this category (all if None)
+        sort_by (str): Numeric field to rank by
+        ascending (bool): Lowest values first
+        limit (int): Maximum number of funds to return
+        
+    Returns:
+        dict: 'funds' (list of fund dicts, best first) and 'total' (number
+            of funds matching before the limit)
+    """
+    try:
+        universe = get_fund_universe()
+        rows, total = universe.screen(filters, match, fund_category, sort_by, ascending, limit)
+        return {'funds': universe.records(rows), 'total': total}
+    except Exception as e:
+        logger.error(f"Error in screen_funds: {str(e)}")
+        return {'funds': [], 'total': 0}
+
+def _build_fund_page(query, filters, match, fund_category, sort_by, ascending, cursor, page_size):
+    """Build one page of get_fund_page from the current universe."""
+    universe = get_fund_universe()
+    if not query:
+        rows, total = universe.screen(filters, match, fund_category, sort_by, ascending, page_size, cursor)
+        return {'funds': universe.records(rows), 'total': total}
+    
+    # Search matches ranked by relevance, restricted to the screen
+    docs, scores = get_fund_search_index().match(query)
+    if filters or fund_category:
+        mask = np.zeros(len(universe), dtype=bool)
+        mask[universe.matches(filters, match, fund_category)] = True
+        keep = mask[docs]
+        docs, scores = docs[keep], scores[keep]
+    docs, scores, total = rank_page(docs, scores, page_size, cursor)
+    funds = universe.records(docs)
+    for fund, score in zip(funds, scores):
+        fund['score'] = round(float(score), 3)
+    return {'funds': funds, 'total': total}
+
+def get_fund_page(query='', filters=None, match='all', fund_category=None, sort_by='one_year_return',
+                  ascending=False, cursor=0, page_size=PAGE_SIZE):
+    """
+    One page of funds, for grids that only render what is visible.
+    
+    Without a query funds are screened and ranked by `sort_by`; with one
+    they are searched (see utils.search) and ranked by relevance, keeping
+    only those passing the filters. Only the rows of the requested page are
+    turned into dicts, and pages are cached per (query, filters, page) for
+    as long as the fund universe is unchanged, so a rerun costs the same
+    whatever the size of the universe.
+    
+    Args:
+        query (str): Free text search (empty, or too short to filter on, for none)
+        filters (dict): Field to (low, high) inclusive bounds (see screen_funds)
+        match (str): 'all' to require every filter, 'any' for at least one
+        fund_category (str): Only funds of this category (all if None)
+        sort_by (str): Numeric field to rank by when there is no query
+        ascending (bool): Lowest values first
+        cursor (int): Position of the first fund of the page, from
+            'next_cursor'/'prev_cursor' of another page (0 for the first)
+        page_size (int): Funds per page
+        
+    Returns:
+        dict: 'funds' (fund dicts of the page), 'total' (matching funds) and
+            the page_cursors fields ('cursor', 'next_cursor', 'prev_cursor',
+            'page', 'pages')
+    """
+    try:
+        # A query too short to filter on (see query_tokens) lists the screen unsearched
+        query = ' '.join(query_tokens(query or ''))
+        filters = {field: tuple(bounds) for field, bounds in sorted((filters or {}).items())}
+        page_size = max(1, int(page_size))
+        cursor = max(0, int(cursor or 0))
+        key = (query, tuple(filters.items()), match, fund_category, sort_by, ascending, cursor, page_size)
+        page = get_page_cache().get(key, get_fund_universe(), lambda: _build_fund_page(
+            query, filters, match, fund_category, sort_by, ascending, cursor, page_size))
+        
+        # A cursor past the end falls back to the last page
+        cursors = page_cursors(cursor, page_size, page['total'])
+        if cursors['cursor'] != cursor:
+            return get_fund_page(query, filters, match, fund_category, sort_by, ascending, cursors['cursor'], page_size)
+        return {'funds': [dict(fund) for fund in page['funds']], 'total': page['total'], **cursors}
+    except Exception as e:
+        logger.error(f"Error in get_fund_page: {str(e)}")
+        return {'funds': [], 'total': 0, **page_cursors(0, PAGE_SIZE, 0)}
@@ -0,0 +1,435 @@
+import os
+import threading
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.rng import date_bucket, pick, stream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fund categories and their subcategories
+FUND_CATEGORIES = {
+    'Technology': ['Tech Giants', 'Emerging Tech', 'Biotech', 'Fintech', 'AI & Robotics'],
+    'Global': ['Developed Markets', 'Emerging Markets', 'Global Diversified', 'International Small Cap'],
+    'ESG': ['Clean Energy', 'Sustainable Investments', 'Social Impact', 'Green Bonds'],
+    'Fixed Income': ['Government Bonds', 'Corporate Bonds', 'High Yield', 'Municipal Bonds'],
+    'Sector': ['Healthcare', 'Real Estate', 'Energy', 'Materials', 'Consumer Goods'],
+    'Alternative': ['Commodities', 'Hedge Fund Strategies', 'Private Equity', 'Infrastructure']
+}
+
+# Parts of generated fund names
+NAME_PREFIXES = ['Global', 'Emerging', 'Strategic', 'Enhanced', 'Dynamic', 'Sustainable', 'Prime', 'Select', 'Value']
+NAME_CORES = ['Growth', 'Income', 'Balanced', 'Opportunity', 'Leaders', 'Index', 'Capital', 'Alpha', 'Beta']
+NAME_SUFFIXES = ['Fund', 'ETF', 'Portfolio', 'Trust', 'Allocation', 'Strategy']
+
+MIN_INVESTMENTS = [0, 1000, 2500, 5000, 10000, 25000, 50000]
+
+# Fields of a fund record, in order
+FUND_FIELDS = ['name', 'ticker', 'category', 'subcategory', 'one_year_return', 'three_year_return',
+               'five_year_return', 'ytd_return', 'sharpe_ratio', 'volatility', 'expense_ratio', 'aum',
+               'min_investment', 'risk_score', 'inception_date']
+TEXT_FIELDS = ['name', 'ticker', 'category', 'subcategory', 'inception_date']
+INT_FIELDS = ['min_investment', 'risk_score']
+
+DEFAULT_SORT = 'one_year_return'
+
+# Numeric fields the screener can filter and rank on
+SCREEN_FIELDS = ['one_year_return', 'three_year_return', 'five_year_return', 'ytd_return', 'sharpe_ratio',
+                 'volatility', 'expense_ratio', 'aum', 'min_investment', 'risk_score']
+
+# The universe is rebuilt when the date bucket of this size changes
+FUND_REFRESH = 'D'
+
+# Size of a generated stress-test universe; 0 keeps the regular fund list
+FUND_UNIVERSE_SIZE = int(os.environ.get('TRAID_FUND_UNIVERSE_SIZE', 0))
+
+
+def _generate_funds():
+    """
+    Build the synthetic fund list.
+
+    Returns:
+        list: Fund dicts with FUND_FIELDS
+    """
+    all_funds = []
+
+    # Dedicated stream for consistent results without touching global RNG state
+    rng = stream('funds')
+
+    for category, subcategories in FUND_CATEGORIES.items():
+        for subcategory in subcategories:
+            # Generate a few funds for each subcategory
+            for _ in range(rng.integers(1, 4)):
+                prefix = pick(rng, NAME_PREFIXES)
+                core = pick(rng, NAME_CORES)
+                suffix = pick(rng, NAME_SUFFIXES)
+
+                # Generate fund ticker (random 3-5 letter combination)
+                ticker_length = rng.integers(3, 6)
+                ticker = ''.join(rng.choice(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), size=ticker_length))
+
+                # Performance metrics
+                one_year_return = rng.uniform(-10, 30)
+                three_year_return = rng.uniform(-5, 25)
+                five_year_return = rng.uniform(0, 20)
+                ytd_return = rng.uniform(-15, 25)
+
+                # Risk metrics
+                sharpe_ratio = rng.uniform(0.5, 2.5)
+                volatility = rng.uniform(5, 25)
+
+                # Fund details
+                expense_ratio = rng.uniform(0.05, 1.5)
+                aum = rng.uniform(10, 10000)  # Assets under management in millions
+                min_investment = pick(rng, MIN_INVESTMENTS)
+
+                # Risk score (1-5, higher is riskier)
+                risk_score = int(rng.integers(1, 6))
+
+                all_funds.append({
+                    'name': f"{prefix} {subcategory} {core} {suffix}",
+                    'ticker': ticker,
+                    'category': category,
+                    'subcategory': subcategory,
+                    'one_year_return': round(one_year_return, 2),
+                    'three_year_return': round(three_year_return, 2),
+                    'five_year_return': round(five_year_return, 2),
+                    'ytd_return': round(ytd_return, 2),
+                    'sharpe_ratio': round(sharpe_ratio, 2),
+                    'volatility': round(volatility, 2),
+                    'expense_ratio': round(expense_ratio, 2),
+                    'aum': round(aum, 2),
+                    'min_investment': min_investment,
+                    'risk_score': risk_score,
+                    'inception_date': (datetime.now() - timedelta(days=int(rng.integers(365, 7301)))).strftime('%Y-%m-%d')
+                })
+
+    return all_funds
+
+
+def generate_fund_columns(n_funds, rng=None):
+    """
+    Build a synthetic universe of any size, column by column.
+
+    Every metric is one vectorized draw from the same range as
+    _generate_funds. Category and subcategory are drawn as integer codes
+    into the flattened FUND_CATEGORIES table, and names index a precomputed
+    table of every prefix/subcategory/core/suffix combination, so no Python
+    code runs per fund; a million funds take a few seconds.
+
+    Args:
+        n_funds (int): Number of funds
+        rng (np.random.Generator): Generator to draw from (defaults to a
+            stream keyed on the size, so the same size gives the same funds)
+
+    Returns:
+        dict: FUND_FIELDS to arrays of length n_funds, ready for FundUniverse
+    """
+    n_funds = int(n_funds)
+    rng = stream('funds', n_funds) if rng is None else rng
+
+    # Categorical codes: subcategory indexes the flattened table, category follows from it
+    subcategories = [(category, sub) for category, subs in FUND_CATEGORIES.items() for sub in subs]
+    category_names = np.array(list(FUND_CATEGORIES), dtype=object)
+    category_of = np.array([list(FUND_CATEGORIES).index(category) for category, _ in subcategories])
+    subcategory_codes = rng.integers(0, len(subcategories), n_funds)
+    category_codes = category_of[subcategory_codes]
+
+    # Names: one flat index into every combination of the name parts
+    names = np.array([f"{prefix} {sub} {core} {suffix}" for prefix in NAME_PREFIXES for _, sub in subcategories
+                      for core in NAME_CORES for suffix in NAME_SUFFIXES], dtype=object)
+    name_codes = rng.integers(0, len(NAME_PREFIXES), n_funds)
+    for size, codes in ((len(subcategories), subcategory_codes), (len(NAME_CORES), None), (len(NAME_SUFFIXES), None)):
+        name_codes = name_codes * size + (rng.integers(0, size, n_funds) if codes is None else codes)
+
+    # Tickers: 3-5 random capitals, NUL-padded bytes trimmed on conversion
+    letters = rng.integers(ord('A'), ord('Z') + 1, (n_funds, 5), dtype=np.uint8)
+    letters[np.arange(5) >= rng.integers(3, 6, n_funds)[:, None]] = 0
+    tickers = letters.view('S5').ravel().astype('U5').astype(object)
+
+    today = np.datetime64(datetime.now().date(), 'D')
+    inception = today - rng.integers(365, 7301, n_funds).astype('timedelta64[D]')
+
+    return {
+        'name': names[name_codes],
+        'ticker': tickers,
+        'category': category_names[category_codes],
+        'subcategory': np.array([sub for _, sub in subcategories], dtype=object)[subcategory_codes],
+        'one_year_return': rng.uniform(-10, 30, n_funds).round(2),
+        'three_year_return': rng.uniform(-5, 25, n_funds).round(2),
+        'five_year_return': rng.uniform(0, 20, n_funds).round(2),
+        'ytd_return': rng.uniform(-15, 25, n_funds).round(2),
+        'sharpe_ratio': rng.uniform(0.5, 2.5, n_funds).round(2),
+        'volatility': rng.uniform(5, 25, n_funds).round(2),
+        'expense_ratio': rng.uniform(0.05, 1.5, n_funds).round(2),
+        'aum': rng.uniform(10, 10000, n_funds).round(2),
+        'min_investment': rng.choice(MIN_INVESTMENTS, n_funds),
+        'risk_score': rng.integers(1, 6, n_funds),
+        'inception_date': np.datetime_as_string(inception, unit='D').astype(object),
+    }
+
+
+def _frozen(values):
+    """Make an array read-only so the shared universe cannot be changed."""
+    values.flags.writeable = False
+    return values
+
+
+def rank_top(values, rows, limit):
+    """
+    Positions of the `limit` smallest values, ranked, ties by row number.
+
+    Only the selected rows are sorted: argpartition finds the cut-off value
+    and the rows tied at the cut-off are settled by row number, so the
+    result matches a full stable sort of the table.
+    """
+    if limit >= len(values):
+        return np.lexsort((rows, values))
+    cutoff = values[np.argpartition(values, limit - 1)[:limit]].max()
+    below = np.flatnonzero(values < cutoff)
+    tied = np.flatnonzero(values == cutoff)
+    tied = tied[np.argsort(rows[tied], kind='stable')][:limit - len(below)]
+    best = np.concatenate((below, tied))
+    return best[np.lexsort((rows[best], values[best]))]
+
+
+class FundUniverse:
+    """
+    Immutable, columnar table of funds shared by every caller.
+
+    Each field is one read-only array. A category index (category to row
+    numbers, best one-year return first) is built once, so the default
+    listing of a category is a slice; other orderings use a partial
+    selection of the top rows. Callers get freshly built dicts for the rows
+    they ask for and never a reference into the table.
+
+    Args:
+        columns (dict): Field to array-like of values, for every FUND_FIELDS
+            field (see from_records for a list of fund dicts)
+    """
+
+    def __init__(self, columns):
+        self.columns = {}
+        for field in FUND_FIELDS:
+            if field in TEXT_FIELDS:
+                values = np.asarray(columns[field], dtype=object)
+            elif field in INT_FIELDS:
+                values = np.asarray(columns[field], dtype=np.int64)
+            else:
+                values = np.asarray(columns[field], dtype=np.float64)
+            self.columns[field] = _frozen(values.copy())
+        self.size = len(self.columns[DEFAULT_SORT])
+
+        # Rows ranked by the default sort, overall and per category
+        self._ranked = _frozen(np.argsort(-self.columns[DEFAULT_SORT], kind='stable'))
+        codes, names = pd.factorize(self.columns['category'])
+        self.category_codes = _frozen(codes.astype(np.int64))
+        self.category_names = {name.lower(): code for code, name in enumerate(names)}
+        ranked_codes = codes[self._ranked]
+        self.category_index = {
+            name: _frozen(self._ranked[ranked_codes == code]) for name, code in self.category_names.items()
+        }
+
+        # Sorted views of the screenable fields, built on first use
+        self._sorted = {}
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the universe from a list of fund dicts with FUND_FIELDS."""
+        return cls({field: [record[field] for record in records] for field in FUND_FIELDS})
+
+    def __len__(self):
+        return self.size
+
+    def rows(self, category=None):
+        """
+        Row numbers of a category (all rows if None), best one-year return first.
+
+        Returns:
+            np.ndarray: Read-only row numbers (empty for unknown categories)
+        """
+        if not category:
+            return self._ranked
+        return self.category_index.get(category.lower(), np.empty(0, dtype=np.int64))
+
+    def records(self, rows):
+        """
+        Fund dicts for some rows.
+
+        Args:
+            rows (array): Row numbers
+
+        Returns:
+            list: One new dict per row, with FUND_FIELDS
+        """
+        columns = [(field, self.columns[field][rows]) for field in FUND_FIELDS]
+        records = [{} for _ in range(len(rows))]
+        for field, values in columns:
+            values = values.tolist()
+            for record, value in zip(records, values):
+                record[field] = value
+        return records
+
+    def top(self, limit=10, category=None, key=DEFAULT_SORT, ascending=False):
+        """
+        Best funds of a category by one field.
+
+        The default ordering is read straight off the category index; for
+        other fields only the `limit` best rows are selected (argpartition)
+        and sorted.
+
+        Args:
+            limit (int): Maximum number of funds to return
+            category (str): Category to filter by (all if None)
+            key (str): Numeric field to rank by
+            ascending (bool): Lowest values first
+
+        Returns:
+            list: Fund dicts, best first
+        """
+        rows = self.rows(category)
+        limit = max(0, min(int(limit), len(rows)))
+        if key == DEFAULT_SORT and not ascending:
+            return self.records(rows[:limit])
+        if limit == 0:
+            return []
+
+        values = self.columns[key][rows]
+        return self.records(rows[rank_top(values if ascending else -values, rows, limit)])
+
+    def _sorted_field(self, field):
+        """(sorted values, row order) of a field, cached on the immutable table."""
+        cached = self._sorted.get(field)
+        if cached is None:
+            order = np.argsort(self.columns[field], kind='stable')
+            cached = (_frozen(self.columns[field][order]), _frozen(order))
+            self._sorted[field] = cached
+        return cached
+
+    def _range_rows(self, field, low, high):
+        """Rows with low <= field <= high (either bound may be None), via binary search."""
+        if field not in SCREEN_FIELDS:
+            raise ValueError(f"Cannot screen on {field}")
+        values, order = self._sorted_field(field)
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return order[start:max(start, stop)]
+
+    def matches(self, filters=None, match='all', category=None):
+        """
+        Unranked rows passing range filters.
+
+        Every filter is a binary search on the field's sorted view. With
+        match='all' the smallest filter result seeds the candidates and the
+        other filters are only checked on those rows; with match='any' the
+        results are merged in a mask.
+
+        Args:
+            filters (dict): Field (one of SCREEN_FIELDS) to (low, high)
+                bounds, inclusive; None leaves a side open
+            match (str): 'all' to AND the filters, 'any' to OR them
+            category (str): Only funds of this category (all if None)
+
+        Returns:
+            np.ndarray: Row numbers, in no particular order
+        """
+        if match not in ('all', 'any'):
+            raise ValueError(f"Unknown match mode: {match}")
+        ranges = [(field, bounds[0], bounds[1]) for field, bounds in (filters or {}).items()]
+
+        if not ranges:
+            return self.rows(category) if category else np.arange(self.size)
+        if match == 'all':
+            hits = sorted((self._range_rows(*r) for r in ranges), key=len)
+            rows = hits[0]
+            for field, low, high in ranges:
+                values = self.columns[field][rows]
+                keep = np.ones(len(rows), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                rows = rows[keep]
+        else:
+            mask = np.zeros(self.size, dtype=bool)
+            for r in ranges:
+                mask[self._range_rows(*r)] = True
+            rows = np.flatnonzero(mask)
+
+        if category:
+            code = self.category_names.get(category.lower(), -1)
+            rows = rows[self.category_codes[rows] == code]
+        return rows
+
+    def screen(self, filters=None, match='all', category=None, sort_by=DEFAULT_SORT, ascending=False, limit=10,
+               offset=0):
+        """
+        Rows passing range filters, ranked by one field.
+
+        Candidates come from matches, and only the best `offset + limit`
+        of them are picked with argpartition and sorted, so a selective
+        query or an early page never sorts the table. The unfiltered
+        default listing is a slice of the precomputed ranking.
+
+        Args:
+            filters (dict): Field (one of SCREEN_FIELDS) to (low, high)
+                bounds, inclusive; None leaves a side open
+            match (str): 'all' to AND the filters, 'any' to OR them
+            category (str): Only funds of this category (all if None)
+            sort_by (str): Numeric field to rank by
+            ascending (bool): Lowest values first
+            limit (int): Maximum number of rows (None for all)
+            offset (int): Ranked rows to skip (for paging)
+
+        Returns:
+            tuple: (rows, total) - ranked row numbers and the number of
+                funds matching before the limit
+        """
+        if match not in ('all', 'any'):
+            raise ValueError(f"Unknown match mode: {match}")
+        offset = max(0, int(offset))
+        if not filters and sort_by == DEFAULT_SORT and not ascending:
+            rows = self.rows(category)
+            stop = len(rows) if limit is None else offset + max(0, int(limit))
+            return rows[offset:stop], len(rows)
+
+        rows = self.matches(filters, match, category)
+        total = len(rows)
+        limit = total if limit is None else max(0, min(int(limit), total - offset))
+        if limit <= 0:
+            return rows[:0], total
+
+        values = self.columns[sort_by][rows]
+        return rows[rank_top(values if ascending else -values, rows, offset + limit)[offset:]], total
+
+
+_universe = None
+_universe_bucket = None
+_universe_lock = threading.Lock()
+
+
+def get_fund_universe():
+    """
+    Get the process-wide fund universe, rebuilding it once per FUND_REFRESH.
+
+    With TRAID_FUND_UNIVERSE_SIZE set, the universe is a generated one of
+    that many funds instead of the regular list.
+
+    Returns:
+        FundUniverse: Shared immutable universe
+    """
+    global _universe, _universe_bucket
+    bucket = date_bucket(freq=FUND_REFRESH)
+    with _universe_lock:
+        if _universe is None or _universe_bucket != bucket:
+            if FUND_UNIVERSE_SIZE > 0:
+                _universe = FundUniverse(generate_fund_columns(FUND_UNIVERSE_SIZE, stream('funds', FUND_UNIVERSE_SIZE, bucket)))
+            else:
+                _universe = FundUniverse.from_records(_generate_funds())
+            _universe_bucket = bucket
+        return _universe
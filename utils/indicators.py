@@ -0,0 +1,397 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDICATORS = ['sma_20', 'ema_20', 'rsi_14', 'macd', 'bbands_20', 'atr_14']
+
+# Default windows for indicators given without one
+_DEFAULT_WINDOWS = {'sma': 20, 'ema': 20, 'rsi': 14, 'bbands': 20, 'atr': 14}
+
+# MACD fast/slow/signal spans
+MACD_SPANS = (12, 26, 9)
+BBANDS_WIDTH = 2.0
+
+# Time steps solved per matrix product in _ema
+_EMA_BLOCK = 64
+
+# IndicatorState fields of each recursive indicator
+_SEEDS = {'ema': ('ema',), 'rsi': ('gain', 'loss'), 'macd': ('fast', 'slow', 'signal'), 'atr': ('atr',)}
+
+
+def _parse(spec):
+    """Split an indicator spec such as 'rsi_14' into ('rsi', 14)."""
+    match = re.fullmatch(r'([a-z]+)(?:_(\d+))?', spec.lower())
+    if match is None:
+        raise ValueError(f"Unknown indicator spec: {spec}")
+    name, window = match.group(1), match.group(2)
+    if name == 'macd':
+        return name, None
+    if name not in _DEFAULT_WINDOWS:
+        raise ValueError(f"Unknown indicator: {name}")
+    return name, int(window) if window else _DEFAULT_WINDOWS[name]
+
+
+def _as_2d(values):
+    """View a series or panel field as a float (ticker x date) array."""
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def _ema(x, alpha):
+    """
+    Exponential moving average along the last axis, seeded with the first value.
+
+    The recursion y_t = (1 - alpha) * y_{t-1} + alpha * x_t is solved in
+    blocks of _EMA_BLOCK steps: inside a block it is one matrix product with
+    a lower-triangular decay matrix, and only the carry between blocks is a
+    Python loop (T / 64 iterations for every ticker at once).
+    """
+    n_dates = x.shape[-1]
+    out = np.empty_like(x)
+    if n_dates == 0:
+        return out
+
+    decay = 1.0 - alpha
+    steps = np.arange(_EMA_BLOCK)
+    lags = steps[:, None] - steps[None, :]
+    weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    carry = decay ** (steps + 1)
+
+    previous = x[..., 0]
+    for start in range(0, n_dates, _EMA_BLOCK):
+        block = x[..., start:start + _EMA_BLOCK]
+        size = block.shape[-1]
+        y = block @ weights[:size, :size].T + previous[..., None] * carry[:size]
+        out[..., start:start + size] = y
+        previous = y[..., -1]
+    return out
+
+
+def _rolling_sum(x, window):
+    """Rolling sum along the last axis via a cumulative sum (NaN until full)."""
+    csum = np.cumsum(x, axis=-1)
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < window:
+        return out
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    return out
+
+
+def sma(close, window=20):
+    """
+    Simple moving average.
+
+    Args:
+        close (array): Closes, (date,) or (ticker x date)
+        window (int): Number of bars averaged
+
+    Returns:
+        np.ndarray: (ticker x date) averages, NaN for the first window-1 bars
+    """
+    return _rolling_sum(_as_2d(close), window) / window
+
+
+def ema(close, window=20):
+    """
+    Exponential moving average with span `window` (alpha = 2 / (window + 1)).
+
+    Returns:
+        np.ndarray: (ticker x date) averages
+    """
+    return _ema(_as_2d(close), 2.0 / (window + 1))
+
+
+def rsi(close, window=14):
+    """
+    Relative strength index with Wilder smoothing (alpha = 1 / window).
+
+    Returns:
+        np.ndarray: (ticker x date) RSI in [0, 100]; the first bar is NaN
+    """
+    close = _as_2d(close)
+    avg_gain, avg_loss = _rsi_averages(close, window)
+    out = np.full_like(close, np.nan)
+    out[..., 1:] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
+def _rsi_averages(close, window):
+    delta = np.diff(close, axis=-1)
+    alpha = 1.0 / window
+    return _ema(np.maximum(delta, 0.0), alpha), _ema(np.maximum(-delta, 0.0), alpha)
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses at all means maximum strength
+    return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), value)
+
+
+def macd(close, spans=MACD_SPANS):
+    """
+    Moving average convergence/divergence.
+
+    Args:
+        close (array): Closes, (date,) or (ticker x date)
+        spans (tuple): Fast, slow and signal EMA spans
+
+    Returns:
+        dict: 'macd', 'signal' and 'hist' (ticker x date) arrays
+    """
+    fast, slow, signal = spans
+    close = _as_2d(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {'macd': line, 'signal': signal_line, 'hist': line - signal_line}
+
+
+def bollinger_bands(close, window=20, width=BBANDS_WIDTH):
+    """
+    Bollinger bands: SMA plus/minus `width` rolling standard deviations.
+
+    The rolling variance comes from cumulative sums of the values and their
+    squares (shifted by the first value to limit cancellation).
+
+    Returns:
+        dict: 'middle', 'upper' and 'lower' (ticker x date) arrays
+    """
+    close = _as_2d(close)
+    shifted = close - close[..., :1]
+    mean = _rolling_sum(shifted, window) / window
+    variance = np.maximum(_rolling_sum(shifted ** 2, window) / window - mean ** 2, 0.0)
+    std = np.sqrt(variance)
+    middle = mean + close[..., :1]
+    return {'middle': middle, 'upper': middle + width * std, 'lower': middle - width * std}
+
+
+def _true_range(high, low, close):
+    previous_close = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    return np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def atr(high, low, close, window=14):
+    """
+    Average true range with Wilder smoothing.
+
+    Returns:
+        np.ndarray: (ticker x date) ATR
+    """
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    return _ema(_true_range(high, low, close), 1.0 / window)
+
+
+def compute_indicators(data, indicators=None):
+    """
+    Compute many indicators over many tickers at once.
+
+    Args:
+        data (dict or pd.DataFrame): A panel from get_stock_data_batch, or a
+            get_stock_data frame; needs High, Low and Close
+        indicators (list): Specs such as 'sma_50', 'ema_12', 'rsi_14',
+            'macd', 'bbands_20', 'atr_14' (defaults to DEFAULT_INDICATORS)
+
+    Returns:
+        dict: Output name (e.g. 'sma_50', 'macd_signal', 'bbands_20_upper')
+            to (ticker x date) array. Rows of a panel that start with NaN
+            (tickers listed after the panel start) stay NaN for the
+            recursive indicators.
+    """
+    indicators = indicators or DEFAULT_INDICATORS
+    high, low, close = (_as_2d(data[field]) for field in ('High', 'Low', 'Close'))
+
+    results = {}
+    for spec in indicators:
+        name, window = _parse(spec)
+        if name == 'sma':
+            results[f"sma_{window}"] = sma(close, window)
+        elif name == 'ema':
+            results[f"ema_{window}"] = ema(close, window)
+        elif name == 'rsi':
+            results[f"rsi_{window}"] = rsi(close, window)
+        elif name == 'macd':
+            for key, values in macd(close).items():
+                results['macd' if key == 'macd' else f"macd_{key}"] = values
+        elif name == 'bbands':
+            for key, values in bollinger_bands(close, window).items():
+                results[f"bbands_{window}_{key}"] = values
+        elif name == 'atr':
+            results[f"atr_{window}"] = atr(high, low, close, window)
+    return results
+
+
+def add_indicators(df, indicators=None):
+    """
+    Add indicator columns to a single-ticker get_stock_data frame.
+
+    Args:
+        df (pd.DataFrame): Frame with High, Low and Close columns
+        indicators (list): Indicator specs (see compute_indicators)
+
+    Returns:
+        pd.DataFrame: Copy of df with one extra column per output
+    """
+    try:
+        results = compute_indicators(df, indicators)
+        return df.assign(**{name: values[0] for name, values in results.items()})
+    except Exception as e:
+        logger.error(f"Error in add_indicators: {str(e)}")
+        return df
+
+
+def _advance(state, field, value, alpha, seed):
+    """One step of an exponential average kept in state[field]; a seed step takes the value itself."""
+    if seed:
+        state[field] = np.array(value, dtype=np.float64)
+    else:
+        state[field] += alpha * (value - state[field])
+
+
+class IndicatorState:
+    """
+    Indicator values that update in O(1) per new bar.
+
+    Built once from a history (panel or frame), it keeps only what each
+    indicator needs to advance: the last EMA values, Wilder averages for
+    RSI and ATR, and a ring buffer with running sums for SMA and Bollinger
+    bands. update() then costs a few array operations per indicator,
+    however long the history. A history too short to seed an indicator
+    (no bars, or a single bar for RSI) leaves it NaN until update() has
+    seen enough bars, the same values compute_indicators gives then.
+
+    Args:
+        data (dict or pd.DataFrame): History with High, Low and Close
+        indicators (list): Indicator specs (see compute_indicators)
+    """
+
+    def __init__(self, data, indicators=None):
+        self.indicators = [_parse(spec) for spec in (indicators or DEFAULT_INDICATORS)]
+        high, low, close = (_as_2d(data[field]) for field in ('High', 'Low', 'Close'))
+        self.bars = close.shape[1]
+        self.last_close = close[:, -1].copy() if self.bars else np.full(len(close), np.nan)
+        self._state = {}
+        unseeded = np.full(len(close), np.nan)
+
+        for name, window in self.indicators:
+            key = (name, window)
+            if name in ('sma', 'bbands'):
+                # Pad short histories so the ring buffer always holds `window` bars
+                recent = close[:, -window:]
+                if recent.shape[1] < window:
+                    padding = np.full((recent.shape[0], window - recent.shape[1]), np.nan)
+                    recent = np.concatenate([padding, recent], axis=1)
+                self._state[key] = {
+                    'buffer': recent.copy(),
+                    'position': 0,
+                    'sum': recent.sum(axis=1),
+                    'sumsq': (recent ** 2).sum(axis=1),
+                }
+            elif not self.bars:
+                self._state[key] = {field: unseeded.copy() for field in _SEEDS[name]}
+            elif name == 'ema':
+                self._state[key] = {'ema': ema(close, window)[:, -1].copy()}
+            elif name == 'rsi':
+                # One bar has no price change to seed the averages with
+                if self.bars < 2:
+                    self._state[key] = {'gain': unseeded.copy(), 'loss': unseeded.copy()}
+                    continue
+                avg_gain, avg_loss = _rsi_averages(close, window)
+                self._state[key] = {'gain': avg_gain[:, -1].copy(), 'loss': avg_loss[:, -1].copy()}
+            elif name == 'macd':
+                fast, slow, signal = MACD_SPANS
+                fast_ema, slow_ema = ema(close, fast), ema(close, slow)
+                self._state[key] = {
+                    'fast': fast_ema[:, -1].copy(),
+                    'slow': slow_ema[:, -1].copy(),
+                    'signal': ema(fast_ema - slow_ema, signal)[:, -1].copy(),
+                }
+            elif name == 'atr':
+                self._state[key] = {'atr': atr(high, low, close, window)[:, -1].copy()}
+
+        self.values = self._snapshot()
+
+    def update(self, bar):
+        """
+        Advance every indicator by one bar.
+
+        Args:
+            bar (dict): 'High', 'Low' and 'Close' of the new bar, one value
+                per ticker
+
+        Returns:
+            dict: Latest value of every output, one entry per ticker
+        """
+        high, low, close = (np.asarray(bar[field], dtype=np.float64).reshape(-1)
+                            for field in ('High', 'Low', 'Close'))
+        # The first bar seeds the recursive averages, as in _ema
+        first = self.bars == 0
+        previous_close = close if first else self.last_close
+
+        for (name, window), state in self._state.items():
+            if name in ('sma', 'bbands'):
+                # Swap the oldest value in the ring buffer for the new close
+                position = state['position']
+                oldest = state['buffer'][:, position].copy()
+                state['buffer'][:, position] = close
+                state['position'] = (position + 1) % window
+                state['sum'] += close - oldest
+                state['sumsq'] += close ** 2 - oldest ** 2
+                # Sums stay NaN until the padding has been pushed out
+                warming = np.isnan(state['sum'])
+                if warming.any():
+                    state['sum'][warming] = state['buffer'][warming].sum(axis=1)
+                    state['sumsq'][warming] = (state['buffer'][warming] ** 2).sum(axis=1)
+            elif name == 'ema':
+                _advance(state, 'ema', close, 2.0 / (window + 1), first)
+            elif name == 'rsi':
+                if first:
+                    continue
+                delta = close - self.last_close
+                alpha = 1.0 / window
+                _advance(state, 'gain', np.maximum(delta, 0.0), alpha, self.bars == 1)
+                _advance(state, 'loss', np.maximum(-delta, 0.0), alpha, self.bars == 1)
+            elif name == 'macd':
+                fast, slow, signal = MACD_SPANS
+                _advance(state, 'fast', close, 2.0 / (fast + 1), first)
+                _advance(state, 'slow', close, 2.0 / (slow + 1), first)
+                _advance(state, 'signal', state['fast'] - state['slow'], 2.0 / (signal + 1), first)
+            elif name == 'atr':
+                true_range = np.maximum(high - low, np.maximum(np.abs(high - previous_close),
+                                                               np.abs(low - previous_close)))
+                _advance(state, 'atr', true_range, 1.0 / window, first)
+
+        self.last_close = close
+        self.bars += 1
+        self.values = self._snapshot()
+        return self.values
+
+    def _snapshot(self):
+        values = {}
+        for (name, window), state in self._state.items():
+            if name == 'sma':
+                values[f"sma_{window}"] = state['sum'] / window
+            elif name == 'bbands':
+                mean = state['sum'] / window
+                std = np.sqrt(np.maximum(state['sumsq'] / window - mean ** 2, 0.0))
+                values[f"bbands_{window}_middle"] = mean
+                values[f"bbands_{window}_upper"] = mean + BBANDS_WIDTH * std
+                values[f"bbands_{window}_lower"] = mean - BBANDS_WIDTH * std
+            elif name == 'ema':
+                values[f"ema_{window}"] = state['ema'].copy()
+            elif name == 'rsi':
+                values[f"rsi_{window}"] = _rsi_from_averages(state['gain'], state['loss'])
+            elif name == 'macd':
+                line = state['fast'] - state['slow']
+                values['macd'] = line
+                values['macd_signal'] = state['signal'].copy()
+                values['macd_hist'] = line - state['signal']
+            elif name == 'atr':
+                values[f"atr_{window}"] = state['atr'].copy()
+        return values
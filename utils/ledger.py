@@ -0,0 +1,374 @@
+import os
+import sqlite3
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Same database as the usuarios table (see traid.py, run from the repository root)
+DB_PATH = os.environ.get(
+    'TRAID_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'usuarios.db')
+)
+
+TRANSACTION_TYPES = ('buy', 'sell', 'dividend')
+LEDGER_COLUMNS = ['id', 'ticker', 'type', 'shares', 'price', 'fees', 'timestamp']
+
+# Positions smaller than this are treated as closed (float dust from partial sells)
+DUST = 1e-9
+
+# Ledger rows are pulled from SQLite in chunks of this many rows
+FETCH_ROWS = 1 << 16
+
+# Ledger owner used while the app has no logged-in user id
+DEMO_USER_ID = 1
+
+# Example operations shown (never stored) until the user records their own
+DEMO_TRANSACTIONS = [
+    {'ticker': 'NVO', 'type': 'buy', 'shares': 0.5, 'price': 78.00, 'time': '14:30'},
+    {'ticker': 'ORCL', 'type': 'buy', 'shares': 1, 'price': 148.42, 'time': '16:20'},
+    {'ticker': 'ORCL', 'type': 'buy', 'shares': 3, 'price': 148.42, 'time': '18:20'},
+]
+
+
+# Databases whose ledger schema is known to exist
+_ready = set()
+
+
+def _connect(db_path):
+    """Open the database, creating the ledger table and indexes on first use."""
+    if db_path in _ready:
+        return sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS operaciones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES usuarios(id),
+            ticker TEXT NOT NULL,
+            type TEXT NOT NULL CHECK (type IN ('buy', 'sell', 'dividend')),
+            shares REAL NOT NULL,
+            price REAL NOT NULL,
+            fees REAL NOT NULL DEFAULT 0,
+            timestamp INTEGER NOT NULL
+        )
+    ''')
+    # Position history reads go by user and ticker in time order
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_operaciones_user_ticker_time '
+                 'ON operaciones (user_id, ticker, timestamp)')
+    # Latest operations across tickers
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_operaciones_user_time '
+                 'ON operaciones (user_id, timestamp)')
+    _ready.add(db_path)
+    return conn
+
+
+def _to_ns(values):
+    """Epoch nanoseconds of datetime-like values."""
+    return pd.DatetimeIndex(pd.to_datetime(values)).as_unit('ns').asi8
+
+
+def record_transactions(user_id, transactions, db_path=DB_PATH):
+    """
+    Insert many transactions in a single database transaction.
+
+    Args:
+        user_id (int): Owner (usuarios.id)
+        transactions (list or pd.DataFrame): Rows with 'ticker', 'type'
+            ('buy', 'sell' or 'dividend'), 'shares', 'price' and optionally
+            'fees' and 'timestamp' (defaults to now). For dividends 'price'
+            is the amount paid per share
+        db_path (str): SQLite database file
+
+    Returns:
+        int: Number of rows inserted
+    """
+    frame = transactions if isinstance(transactions, pd.DataFrame) else pd.DataFrame(list(transactions))
+    if frame.empty:
+        return 0
+    types = frame['type'].str.lower()
+    unknown = set(types) - set(TRANSACTION_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown transaction types: {', '.join(sorted(unknown))}")
+
+    n_rows = len(frame)
+    timestamps = _to_ns(frame['timestamp']) if 'timestamp' in frame else np.full(n_rows, _to_ns([pd.Timestamp.now()])[0])
+    fees = frame['fees'].to_numpy(np.float64) if 'fees' in frame else np.zeros(n_rows)
+    rows = zip(
+        [int(user_id)] * n_rows,
+        frame['ticker'].astype(str).str.upper().tolist(),
+        types.tolist(),
+        frame['shares'].astype(np.float64).tolist(),
+        frame['price'].astype(np.float64).tolist(),
+        fees.tolist(),
+        timestamps.tolist(),
+    )
+
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                'INSERT INTO operaciones (user_id, ticker, type, shares, price, fees, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        return n_rows
+    finally:
+        conn.close()
+
+
+def record_transaction(user_id, ticker, type, shares, price, fees=0.0, timestamp=None, db_path=DB_PATH):
+    """
+    Insert one transaction.
+
+    Returns:
+        int: Number of rows inserted (1)
+    """
+    row = {'ticker': ticker, 'type': type, 'shares': shares, 'price': price, 'fees': fees,
+           'timestamp': pd.Timestamp.now() if timestamp is None else timestamp}
+    return record_transactions(user_id, [row], db_path)
+
+
+def load_transactions(user_id, ticker=None, db_path=DB_PATH):
+    """
+    Load a user's transactions ordered by ticker and time.
+
+    Args:
+        user_id (int): Owner (usuarios.id)
+        ticker (str): Only this ticker (all if None)
+        db_path (str): SQLite database file
+
+    Returns:
+        pd.DataFrame: LEDGER_COLUMNS, with 'timestamp' as datetime64
+    """
+    query = 'SELECT id, ticker, type, shares, price, fees, timestamp FROM operaciones WHERE user_id = ?'
+    params = [int(user_id)]
+    if ticker is not None:
+        query += ' AND ticker = ?'
+        params.append(ticker.upper())
+    query += ' ORDER BY ticker, timestamp, id'
+
+    conn = _connect(db_path)
+    try:
+        cursor = conn.execute(query, params)
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            chunks.append(pd.DataFrame.from_records(rows, columns=LEDGER_COLUMNS))
+    finally:
+        conn.close()
+
+    frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=LEDGER_COLUMNS)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'].astype(np.int64), unit='ns')
+    return frame
+
+
+def recent_transactions(user_id, limit=10, db_path=DB_PATH):
+    """
+    Latest transactions of a user, newest first.
+
+    Returns:
+        pd.DataFrame: Up to `limit` rows with LEDGER_COLUMNS
+    """
+    conn = _connect(db_path)
+    try:
+        frame = pd.read_sql_query(
+            'SELECT id, ticker, type, shares, price, fees, timestamp FROM operaciones '
+            'WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?',
+            conn, params=(int(user_id), int(limit)),
+        )
+    finally:
+        conn.close()
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'].astype(np.int64), unit='ns')
+    return frame
+
+
+def demo_transactions(limit=10):
+    """
+    DEMO_TRANSACTIONS (timed today) as recent_transactions would return them.
+
+    Nothing is written to the ledger, so the example operations never count
+    towards a user's cost basis or P&L.
+
+    Returns:
+        pd.DataFrame: Up to `limit` rows with LEDGER_COLUMNS, newest first
+    """
+    today = pd.Timestamp.now().normalize()
+    frame = pd.DataFrame(DEMO_TRANSACTIONS)
+    frame['timestamp'] = (today + pd.to_timedelta(frame['time'] + ':00')).astype('datetime64[ns]')
+    frame['fees'] = 0.0
+    frame['id'] = np.arange(1, len(frame) + 1)
+    frame = frame.sort_values(['timestamp', 'id'], ascending=False, kind='stable').head(int(limit))
+    return frame[LEDGER_COLUMNS].reset_index(drop=True)
+
+
+def _linear_scan(a, b):
+    """
+    Solve x[t] = a[t] * x[t-1] + b[t] (x[-1] = 0) for a in [0, 1], vectorized.
+
+    With P the running product of a, x[t] = P[t] * sum(b[s] / P[s]) since
+    the last reset (a == 0). P is renormalized in blocks where it drops by
+    e^-500, so 1 / P never overflows.
+    """
+    x = np.empty(len(a))
+    reset = a <= 0
+    log_p = np.cumsum(np.log(np.where(reset, 1.0, a)))
+    block = np.floor(-log_p / 500).astype(np.int64)
+    starts = np.flatnonzero(np.diff(block, prepend=-1))
+    ends = np.append(starts[1:], len(a))
+
+    carry = 0.0
+    for start, end in zip(starts, ends):
+        base = log_p[start - 1] if start else 0.0
+        p = np.exp(log_p[start:end] - base)
+        sums = np.cumsum(b[start:end] / p)
+
+        # Sum before the last reset in the block (or minus the carried value)
+        positions = np.arange(end - start)
+        last_reset = np.maximum.accumulate(np.where(reset[start:end], positions, -1))
+        before = np.concatenate(([0.0], sums))[np.maximum(last_reset, 0)]
+        x[start:end] = p * (sums - np.where(last_reset >= 0, before, -carry))
+        carry = x[end - 1]
+    return x
+
+
+def cost_basis(transactions, method='fifo', prices=None):
+    """
+    Cost basis and realized/unrealized P&L of a transaction ledger.
+
+    FIFO: the cost of the first q shares bought in a ticker is piecewise
+    linear in q with knots at the cumulative buy quantities, so the cost of
+    every sale is the difference of one np.interp over all tickers at once
+    (tickers are laid end to end on the quantity axis). Average cost: the
+    cost held follows x = a * x + b with a = shares left after a sale over
+    shares before and b = the cost of a purchase, solved by _linear_scan.
+    Fees are added to purchase cost and deducted from sale proceeds.
+
+    Args:
+        transactions (pd.DataFrame): Ledger rows as from load_transactions
+        method (str): 'fifo' or 'average'
+        prices (dict): Latest price per ticker, for unrealized P&L
+
+    Returns:
+        dict: 'positions' (DataFrame per ticker with Shares, Cost Basis,
+            Avg Cost, Realized P&L, Dividends and, if prices were given,
+            Price, Market Value and Unrealized P&L), 'realized' (Series of
+            realized P&L per transaction, aligned with the input index) and
+            totals 'realized_pnl', 'unrealized_pnl' and 'dividends'
+    """
+    if method not in ('fifo', 'average'):
+        raise ValueError(f"Unknown cost basis method: {method}")
+
+    # Sort by ticker then time on integer codes (strings sort slowly)
+    codes, tickers = pd.factorize(transactions['ticker'], sort=True)
+    order = np.lexsort((_to_ns(transactions['timestamp']), codes))
+    codes = codes[order]
+    kind_codes, kinds = pd.factorize(transactions['type'])
+    kind_codes = kind_codes[order]
+    shares = transactions['shares'].to_numpy(np.float64)[order]
+    price = transactions['price'].to_numpy(np.float64)[order]
+    fees = transactions['fees'].to_numpy(np.float64)[order] if 'fees' in transactions else np.zeros(len(order))
+    n_tickers = len(tickers)
+
+    kind_of = {kind: i for i, kind in enumerate(kinds)}
+    is_buy = kind_codes == kind_of.get('buy', -2)
+    is_sell = kind_codes == kind_of.get('sell', -2)
+    is_dividend = kind_codes == kind_of.get('dividend', -2)
+    bought = np.where(is_buy, shares, 0.0)
+    sold = np.where(is_sell, shares, 0.0)
+    buy_cost = np.where(is_buy, shares * price + fees, 0.0)
+    proceeds = np.where(is_sell, shares * price - fees, 0.0)
+    dividends = np.where(is_dividend, shares * price - fees, 0.0)
+
+    # Shares held after each row, restarting at every ticker
+    first = np.flatnonzero(np.diff(codes, prepend=-1))
+    held = np.cumsum(bought - sold)
+    held -= np.repeat(np.append(0.0, held)[first], np.diff(np.append(first, len(codes))))
+    held[np.abs(held) < DUST] = 0.0
+    if (held < 0).any():
+        short = tickers[codes[np.flatnonzero(held < 0)[0]]]
+        raise ValueError(f"Sales exceed the shares held in {short}")
+
+    if method == 'fifo':
+        # Global quantity axis: cumulative shares bought across all tickers
+        global_bought = np.cumsum(bought)
+        knots_q = np.append(0.0, global_bought[is_buy])
+        knots_cost = np.append(0.0, np.cumsum(buy_cost)[is_buy])
+        offset = np.repeat(np.append(0.0, global_bought)[first], np.diff(np.append(first, len(codes))))
+        sold_after = np.cumsum(sold)
+        sold_after -= np.repeat(np.append(0.0, sold_after)[first], np.diff(np.append(first, len(codes))))
+        sold_before = sold_after - sold
+        cost_out = np.where(is_sell, np.interp(offset + sold_after, knots_q, knots_cost)
+                            - np.interp(offset + sold_before, knots_q, knots_cost), 0.0)
+        remaining_cost = np.bincount(codes, buy_cost, n_tickers) - np.bincount(codes, cost_out, n_tickers)
+    else:
+        held_before = held + sold - bought
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep = np.where(is_sell, np.where(held_before > 0, held / held_before, 0.0), 1.0)
+        keep[first] = 0.0
+        cost_held = _linear_scan(keep, buy_cost)
+        cost_before = np.append(0.0, cost_held[:-1])
+        cost_before[first] = 0.0
+        cost_out = np.where(is_sell, cost_before - cost_held, 0.0)
+        last = np.append(first[1:], len(codes)) - 1
+        remaining_cost = cost_held[last] if n_tickers else np.zeros(0)
+
+    realized = np.where(is_sell, proceeds - cost_out, 0.0)
+    last = np.append(first[1:], len(codes)) - 1
+    open_shares = held[last] if n_tickers else np.zeros(0)
+    remaining_cost = np.where(open_shares > 0, remaining_cost, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_cost = np.where(open_shares > 0, remaining_cost / open_shares, 0.0)
+
+    positions = pd.DataFrame({
+        'Ticker': np.asarray(tickers, dtype=object),
+        'Shares': open_shares,
+        'Cost Basis': remaining_cost.round(2),
+        'Avg Cost': avg_cost.round(4),
+        'Realized P&L': np.bincount(codes, realized, n_tickers).round(2),
+        'Dividends': np.bincount(codes, dividends, n_tickers).round(2),
+    })
+    unrealized_pnl = 0.0
+    if prices is not None:
+        last_price = np.array([prices.get(t, np.nan) for t in tickers], dtype=np.float64)
+        market_value = open_shares * last_price
+        unrealized = np.where(open_shares > 0, market_value - remaining_cost, 0.0)
+        positions['Price'] = last_price
+        positions['Market Value'] = market_value.round(2)
+        positions['Unrealized P&L'] = unrealized.round(2)
+        unrealized_pnl = float(np.nansum(unrealized))
+
+    realized_series = pd.Series(0.0, index=transactions.index)
+    realized_series.iloc[order] = realized
+    return {
+        'positions': positions,
+        'realized': realized_series,
+        'realized_pnl': round(float(realized.sum()), 2),
+        'unrealized_pnl': round(unrealized_pnl, 2),
+        'dividends': round(float(dividends.sum()), 2),
+    }
+
+
+def get_ledger_summary(user_id, method='fifo', prices=None, db_path=DB_PATH):
+    """
+    Load a user's ledger and compute its cost basis and P&L.
+
+    Args:
+        user_id (int): Owner (usuarios.id)
+        method (str): 'fifo' or 'average'
+        prices (dict): Latest price per ticker, for unrealized P&L
+        db_path (str): SQLite database file
+
+    Returns:
+        dict: As returned by cost_basis, or None on error
+    """
+    try:
+        return cost_basis(load_transactions(user_id, db_path=db_path), method, prices)
+    except Exception as e:
+        logger.error(f"Error in get_ledger_summary: {str(e)}")
+        return None
@@ -0,0 +1,438 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import logging
+from itertools import islice
+
+import pandas as pd
+
+from utils.rng import date_bucket
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NEWS_DB_PATH = os.environ.get(
+    'TRAID_NEWS_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'news.db')
+)
+
+# Market news is pulled into the store once per bucket of this size
+NEWS_REFRESH = 'h'
+
+# Articles generated per market news refresh
+NEWS_BATCH = 50
+
+# Dates are shown the way get_financial_news formats them
+DATE_FORMAT = '%b %d, %Y'
+
+_WORD = re.compile(r'\w+')
+
+
+# Databases whose schema was already checked by this process
+_ready = set()
+
+
+def _connect(db_path):
+    """Open the news database, creating the tables, indexes and FTS5 index on first use."""
+    if db_path in _ready:
+        return sqlite3.connect(db_path)
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hash TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            summary TEXT NOT NULL DEFAULT '',
+            source TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL DEFAULT '',
+            published INTEGER NOT NULL,
+            ingested INTEGER NOT NULL,
+            sentiment REAL
+        );
+        -- Latest articles overall and per source
+        CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published);
+        CREATE INDEX IF NOT EXISTS idx_articles_source_published ON articles (source, published);
+
+        -- Latest articles per ticker read straight off the primary key
+        CREATE TABLE IF NOT EXISTS article_tickers (
+            ticker TEXT NOT NULL,
+            published INTEGER NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            PRIMARY KEY (ticker, published, article_id)
+        ) WITHOUT ROWID;
+
+        -- Full-text index over title and summary, kept in sync by the trigger;
+        -- two- and three-character prefixes are indexed for search-as-you-type
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title, summary, content='articles', content_rowid='id', prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END;
+    ''')
+    _ready.add(db_path)
+    return conn
+
+
+def content_hash(article):
+    """
+    Dedupe key of an article: its title and summary, ignoring case, spacing and punctuation.
+
+    The same story syndicated by several sources, or scraped again with a
+    different URL, gets the same hash.
+    """
+    words = _WORD.findall(f"{article.get('title', '')} {article.get('summary', '')}".lower())
+    return hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _published(values, now):
+    """Epoch nanoseconds of article dates; unparseable dates ('N/A', '2 hours ago') become now."""
+    dates = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', format='mixed')
+    return dates.fillna(now).astype('datetime64[ns]').astype('int64').tolist()
+
+
+def ingest_articles(articles, tickers=None, db_path=NEWS_DB_PATH):
+    """
+    Store articles, skipping any whose content is already stored.
+
+    Args:
+        articles (list): Dicts with 'title' and optionally 'summary',
+            'source', 'date', 'url', 'sentiment' and 'tickers'
+        tickers (list): Tickers every article is about, besides its own
+            'tickers'
+        db_path (str): SQLite database file
+
+    Returns:
+        int: Number of new articles
+    """
+    articles = [article for article in articles if article.get('title')]
+    if not articles:
+        return 0
+    now = pd.Timestamp.now()
+    published = _published([article.get('date') for article in articles], now)
+    hashes = [content_hash(article) for article in articles]
+    rows = [(digest, article['title'], article.get('summary') or '', article.get('source') or '',
+             article.get('url') or '', stamp, now.value, article.get('sentiment'))
+            for digest, article, stamp in zip(hashes, articles, published)]
+    links = [(ticker.upper(), digest)
+             for digest, article in zip(hashes, articles)
+             for ticker in dict.fromkeys(list(tickers or []) + list(article.get('tickers') or []))]
+
+    conn = _connect(db_path)
+    try:
+        with conn:
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM articles').fetchone()[0]
+            conn.executemany(
+                'INSERT OR IGNORE INTO articles (hash, title, summary, source, url, published, ingested, sentiment) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+            added = conn.execute('SELECT COUNT(*) FROM articles WHERE id > ?', (last_id,)).fetchone()[0]
+            # Links point at the stored copy, also for duplicates of older articles
+            conn.executemany(
+                'INSERT OR IGNORE INTO article_tickers (ticker, published, article_id) '
+                'SELECT ?, published, id FROM articles WHERE hash = ?',
+                links,
+            )
+        return added
+    finally:
+        conn.close()
+
+
+def _to_articles(rows):
+    """Article dicts in the shape get_financial_news returns."""
+    return [{
+        'id': row[0],
+        'title': row[1],
+        'summary': row[2],
+        'source': row[3],
+        'url': row[4],
+        'date': pd.Timestamp(row[5]).strftime(DATE_FORMAT),
+        'published': pd.Timestamp(row[5]),
+        'sentiment': row[6],
+    } for row in rows]
+
+
+_ARTICLE_COLUMNS = 'a.id, a.title, a.summary, a.source, a.url, a.published, a.sentiment'
+
+
+def latest_articles(tickers=None, source=None, limit=10, db_path=NEWS_DB_PATH):
+    """
+    Most recent stored articles, optionally about some tickers or from one source.
+
+    Args:
+        tickers (list): Only articles about any of these tickers (all if None)
+        source (str): Only articles from this source
+        limit (int): Maximum number of articles
+        db_path (str): SQLite database file
+
+    Returns:
+        list: Article dicts, newest first
+    """
+    conn = _connect(db_path)
+    try:
+        params = []
+        if tickers:
+            marks = ', '.join('?' * len(tickers))
+            query = (f'SELECT {_ARTICLE_COLUMNS} FROM articles a WHERE a.id IN '
+                     f'(SELECT article_id FROM article_tickers WHERE ticker IN ({marks}))')
+            params += [ticker.upper() for ticker in tickers]
+            if source:
+                query += ' AND a.source = ?'
+                params.append(source)
+        elif source:
+            query = f'SELECT {_ARTICLE_COLUMNS} FROM articles a WHERE a.source = ?'
+            params.append(source)
+        else:
+            query = f'SELECT {_ARTICLE_COLUMNS} FROM articles a'
+        query += ' ORDER BY a.published DESC, a.id DESC LIMIT ?'
+        params.append(int(limit))
+        return _to_articles(conn.execute(query, params).fetchall())
+    finally:
+        conn.close()
+
+
+def _encode_cursor(article):
+    return f"{article['published'].value}:{article['id']}"
+
+
+def _decode_cursor(cursor):
+    published, article_id = str(cursor).split(':')
+    return int(published), int(article_id)
+
+
+def news_page(since=None, cursor=None, page_size=10, db_path=NEWS_DB_PATH):
+    """
+    One page of stored articles, newest first, by keyset pagination.
+
+    The cursor is the (published, id) key of the last article of the
+    previous page, so a page is one index range scan of page_size rows
+    however deep into the feed it is, and articles ingested meanwhile do
+    not shift later pages.
+
+    Args:
+        since (datetime-like): Only articles published at or after this
+        cursor (str): 'next_cursor' of the previous page (None for the first)
+        page_size (int): Articles per page
+        db_path (str): SQLite database file
+
+    Returns:
+        tuple: (articles, next_cursor) - next_cursor is None on the last page
+    """
+    conditions, params = [], []
+    if since is not None:
+        conditions.append('a.published >= ?')
+        params.append(pd.Timestamp(since).as_unit('ns').value)
+    if cursor:
+        conditions.append('(a.published, a.id) < (?, ?)')
+        params += list(_decode_cursor(cursor))
+    query = f'SELECT {_ARTICLE_COLUMNS} FROM articles a'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    # One row beyond the page tells whether there is a next page
+    query += ' ORDER BY a.published DESC, a.id DESC LIMIT ?'
+    params.append(int(page_size) + 1)
+
+    conn = _connect(db_path)
+    try:
+        articles = _to_articles(conn.execute(query, params).fetchall())
+    finally:
+        conn.close()
+    if len(articles) <= page_size:
+        return articles, None
+    articles = articles[:page_size]
+    return articles, _encode_cursor(articles[-1])
+
+
+def iter_news(since=None, cursor=None, page_size=10, db_path=NEWS_DB_PATH):
+    """
+    Lazily iterate over stored news, newest first, after pulling in new market news.
+
+    Articles are fetched one page at a time as the caller consumes them,
+    so memory depends on the page size rather than the length of the feed.
+
+    Args:
+        since (datetime-like): Only articles published at or after this
+        cursor (str): Resume after the page this cursor ended (see news_page)
+        page_size (int): Articles fetched per query
+        db_path (str): SQLite database file
+
+    Yields:
+        dict: Article, with 'cursor' set to resume right after it
+    """
+    refresh_market_news(db_path)
+    while True:
+        articles, next_cursor = news_page(since, cursor, page_size, db_path)
+        for article in articles:
+            article['cursor'] = _encode_cursor(article)
+            yield article
+        if next_cursor is None:
+            return
+        cursor = next_cursor
+
+
+def news_version(db_path=NEWS_DB_PATH):
+    """
+    Version of the stored feed: the id of the last ingested article.
+
+    Ids only grow, so the version changes whenever any process stores a new
+    article, and pages read under an older version may be missing them.
+
+    Returns:
+        int: Last article id (0 while the store is empty)
+    """
+    conn = _connect(db_path)
+    try:
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM articles').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _match_expression(text):
+    """FTS5 query matching every word of free text; the last word also as a prefix."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' AND '.join(terms)
+
+
+def search_articles(text, tickers=None, limit=10, db_path=NEWS_DB_PATH):
+    """
+    Full-text search of stored articles, best match first.
+
+    Args:
+        text (str): Free text, e.g. 'Fed' or 'interest rates'
+        tickers (list): Only articles about any of these tickers (all if None)
+        limit (int): Maximum number of articles
+        db_path (str): SQLite database file
+
+    Returns:
+        list: Article dicts ranked by BM25 (newest first among equal ranks)
+    """
+    expression = _match_expression(text)
+    if expression is None:
+        return []
+    conn = _connect(db_path)
+    try:
+        query = (f'SELECT {_ARTICLE_COLUMNS} FROM articles_fts f JOIN articles a ON a.id = f.rowid '
+                 f'WHERE articles_fts MATCH ?')
+        params = [expression]
+        if tickers:
+            marks = ', '.join('?' * len(tickers))
+            query += f' AND a.id IN (SELECT article_id FROM article_tickers WHERE ticker IN ({marks}))'
+            params += [ticker.upper() for ticker in tickers]
+        query += ' ORDER BY bm25(articles_fts), a.published DESC LIMIT ?'
+        params.append(int(limit))
+        return _to_articles(conn.execute(query, params).fetchall())
+    finally:
+        conn.close()
+
+
+_refreshed = {}
+_refresh_lock = threading.Lock()
+
+
+def refresh_market_news(db_path=NEWS_DB_PATH):
+    """
+    Pull the current batch of market news into the store, once per NEWS_REFRESH.
+
+    Returns:
+        int: Number of new articles (0 if this bucket was already ingested)
+    """
+    from utils.news import iter_financial_news
+
+    bucket = date_bucket(freq=NEWS_REFRESH)
+    with _refresh_lock:
+        if _refreshed.get(db_path) == bucket:
+            return 0
+        _refreshed[db_path] = bucket
+    return ingest_articles(islice(iter_financial_news(), NEWS_BATCH), db_path=db_path)
+
+
+def get_news_page(cursor=None, page_size=10, since=None, db_path=NEWS_DB_PATH):
+    """
+    One page of the news feed, for "load more" pagination.
+
+    Args:
+        cursor (str): 'next_cursor' of the previous page (None for the first)
+        page_size (int): Articles per page
+        since (datetime-like): Only articles published at or after this
+        db_path (str): SQLite database file
+
+    Returns:
+        dict: 'articles' (newest first) and 'next_cursor' (None at the end)
+    """
+    try:
+        refresh_market_news(db_path)
+        articles, next_cursor = news_page(since, cursor, page_size, db_path)
+        return {'articles': articles, 'next_cursor': next_cursor}
+    except Exception as e:
+        logger.error(f"Error in get_news_page: {str(e)}")
+        return {'articles': [], 'next_cursor': None}
+
+
+def get_news_version(db_path=NEWS_DB_PATH):
+    """
+    Version of the news feed, after pulling in any new market news.
+
+    Pages read with get_news_page are stale once this changes.
+
+    Args:
+        db_path (str): SQLite database file
+
+    Returns:
+        int: Feed version (see news_version), or None on error
+    """
+    try:
+        refresh_market_news(db_path)
+        return news_version(db_path)
+    except Exception as e:
+        logger.error(f"Error in get_news_version: {str(e)}")
+        return None
+
+
+def get_latest_news(limit=10, tickers=None, db_path=NEWS_DB_PATH):
+    """
+    Latest news from the store, after pulling in any new market news.
+
+    Args:
+        limit (int): Maximum number of articles
+        tickers (list): Only articles about any of these tickers (all if None)
+        db_path (str): SQLite database file
+
+    Returns:
+        list: Article dicts, newest first
+    """
+    try:
+        refresh_market_news(db_path)
+        return latest_articles(tickers, limit=limit, db_path=db_path)
+    except Exception as e:
+        logger.error(f"Error in get_latest_news: {str(e)}")
+        return []
+
+
+def search_news(text, limit=10, tickers=None, db_path=NEWS_DB_PATH):
+    """
+    Search stored news, after pulling in any new market news.
+
+    Args:
+        text (str): Free text
+        limit (int): Maximum number of articles
+        tickers (list): Only articles about any of these tickers (all if None)
+        db_path (str): SQLite database file
+
+    Returns:
+        list: Article dicts, best match first
+    """
+    try:
+        refresh_market_news(db_path)
+        return search_articles(text, tickers, limit, db_path)
+    except Exception as e:
+        logger.error(f"Error in search_news: {str(e)}")
+        return []
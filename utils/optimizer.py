@@ -0,0 +1,371 @@
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = 7
+TRADING_DAYS = 252
+DEFAULT_MAX_WEIGHT = 0.4
+
+# Solver settings
+MAX_ITERATIONS = 2000
+TOLERANCE = 1e-9
+FRONTIER_POINTS = 25
+
+
+class ShrinkageCovariance:
+    """
+    Ledoit-Wolf shrinkage covariance built from running moment sums.
+
+    The estimator keeps sums of x, x x', x^2 x' and x^2 (x^2)' over the
+    return rows it has seen. Those are all the Ledoit-Wolf estimate needs
+    (sample covariance, distance to the scaled-identity target and the
+    variance of the sample covariance), so adding or dropping one day of
+    returns costs O(assets^2) instead of a pass over the whole history.
+
+    Args:
+        returns (array): Initial (date x asset) returns; rows with
+            missing values are skipped
+    """
+
+    def __init__(self, returns):
+        returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        n_assets = returns.shape[1]
+        self.count = 0
+        self.m1 = np.zeros(n_assets)
+        self.m2 = np.zeros(n_assets)
+        self.m11 = np.zeros((n_assets, n_assets))
+        self.m21 = np.zeros((n_assets, n_assets))
+        self.m22 = np.zeros((n_assets, n_assets))
+        self._add(returns, 1)
+
+    def _add(self, rows, sign):
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        rows = rows[~np.isnan(rows).any(axis=1)]
+        squares = rows * rows
+        self.count += sign * len(rows)
+        self.m1 += sign * rows.sum(axis=0)
+        self.m2 += sign * squares.sum(axis=0)
+        self.m11 += sign * rows.T @ rows
+        self.m21 += sign * squares.T @ rows
+        self.m22 += sign * squares.T @ squares
+
+    def append(self, rows):
+        """Add one or more (date x asset) return rows."""
+        self._add(rows, 1)
+
+    def remove(self, rows):
+        """Drop return rows that were added before (e.g. leaving a window)."""
+        self._add(rows, -1)
+
+    def mean(self):
+        """Mean return per bar of each asset."""
+        return self.m1 / max(self.count, 1)
+
+    def estimate(self):
+        """
+        Shrunk covariance of the returns (per bar).
+
+        Returns:
+            tuple: (covariance, shrinkage) where shrinkage in [0, 1] is the
+                weight on the scaled-identity target
+        """
+        t = self.count
+        if t < 2:
+            raise ValueError("Need at least two return rows")
+        m = self.m1 / t
+        sample = self.m11 / t - np.outer(m, m)
+
+        # Sum over dates of (y_i y_j)^2 for the demeaned returns y = x - m
+        mi, mj = m[:, None], m[None, :]
+        fourth = (self.m22
+                  - 2 * mj * self.m21 - 2 * mi * self.m21.T
+                  + 4 * mi * mj * self.m11
+                  + mj ** 2 * self.m2[:, None] + mi ** 2 * self.m2[None, :]
+                  - 2 * mi * mj ** 2 * self.m1[:, None] - 2 * mi ** 2 * mj * self.m1[None, :]
+                  + t * mi ** 2 * mj ** 2)
+
+        scale = np.trace(sample) / len(sample)
+        target = scale * np.eye(len(sample))
+        distance = np.sum((sample - target) ** 2)
+        spread = max(fourth.sum() - t * np.sum(sample ** 2), 0.0) / t ** 2
+        shrinkage = min(spread, distance) / distance if distance > 0 else 1.0
+        return shrinkage * target + (1 - shrinkage) * sample, shrinkage
+
+
+def _project(values, lower, upper):
+    """
+    Euclidean projection onto {lower <= w <= upper, sum(w) = 1}.
+
+    The projection is clip(values - tau) for the shift tau where the clipped
+    sum is 1. That sum is piecewise linear in tau with breakpoints at
+    values - upper and values - lower, so it is evaluated at every
+    breakpoint from prefix sums of the sorted values and tau is
+    interpolated inside the bracketing segment, in O(n log n).
+    """
+    ordered = np.sort(values)
+    n_assets = len(ordered)
+    prefix = np.concatenate(([0.0], np.cumsum(ordered)))
+    taus = np.sort(np.concatenate((ordered - upper, ordered - lower)))
+
+    # At each breakpoint: how many weights sit at each bound, and the rest
+    n_lower = np.searchsorted(ordered, taus + lower, side='right')
+    n_upper = n_assets - np.searchsorted(ordered, taus + upper, side='left')
+    n_free = n_assets - n_lower - n_upper
+    free_sum = prefix[n_assets - n_upper] - prefix[n_lower]
+    totals = upper * n_upper + lower * n_lower + free_sum - taus * n_free
+
+    # totals falls from n * upper to n * lower; find the segment crossing 1
+    k = int(np.clip(np.searchsorted(-totals, -1.0, side='right') - 1, 0, len(taus) - 2))
+    drop = totals[k] - totals[k + 1]
+    tau = taus[k] + (totals[k] - 1) / drop * (taus[k + 1] - taus[k]) if drop > 0 else taus[k]
+    return np.clip(values - tau, lower, upper)
+
+
+def _bounds(n_assets, max_weight, long_only):
+    """Per-asset weight bounds, checking a fully invested portfolio fits."""
+    if max_weight * n_assets < 1 - 1e-12:
+        raise ValueError(f"max_weight {max_weight} is too small for {n_assets} assets")
+    return (0.0 if long_only else -max_weight), max_weight
+
+
+def optimize(mean, covariance, risk_aversion, max_weight=1.0, long_only=True, initial=None, lipschitz=None):
+    """
+    Solve max w'mean - risk_aversion / 2 * w'covariance w.
+
+    Subject to sum(w) = 1 and lower <= w <= max_weight, where lower is 0
+    for long-only portfolios and -max_weight otherwise. Uses accelerated
+    projected gradient ascent with adaptive restart, warm-started from
+    `initial` when given.
+
+    Args:
+        mean (np.ndarray): Expected return per asset
+        covariance (np.ndarray): Return covariance
+        risk_aversion (float): Weight of the variance penalty
+        max_weight (float): Cap on each asset's weight
+        long_only (bool): Forbid negative weights
+        initial (np.ndarray): Starting weights (e.g. a previous solution)
+        lipschitz (float): Largest eigenvalue of covariance, if known
+
+    Returns:
+        np.ndarray: Optimal weights
+    """
+    n_assets = len(mean)
+    lower, upper = _bounds(n_assets, max_weight, long_only)
+    if lipschitz is None:
+        lipschitz = float(np.linalg.eigvalsh(covariance)[-1])
+    step = 1.0 / max(risk_aversion * lipschitz, 1e-12)
+
+    weights = _project(np.full(n_assets, 1.0 / n_assets) if initial is None else initial, lower, upper)
+    momentum = weights.copy()
+    t = 1.0
+    for _ in range(MAX_ITERATIONS):
+        gradient = mean - risk_aversion * (covariance @ momentum)
+        updated = _project(momentum + step * gradient, lower, upper)
+        # Restart the momentum as soon as it points away from the ascent
+        if (momentum - updated) @ (updated - weights) > 0:
+            t = 1.0
+        t_next = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        momentum = updated + (t - 1) / t_next * (updated - weights)
+        converged = np.max(np.abs(updated - weights)) < TOLERANCE
+        weights, t = updated, t_next
+        if converged:
+            break
+    return weights
+
+
+def _aversion_range(mean, covariance):
+    """Risk aversions spanning return-seeking to minimum-variance portfolios."""
+    scale = max(np.max(np.abs(mean)), 1e-12) / max(np.max(np.diag(covariance)), 1e-12)
+    return scale * 1e-2, scale * 1e4
+
+
+def efficient_frontier(mean, covariance, points=FRONTIER_POINTS, max_weight=1.0, long_only=True):
+    """
+    Trace the efficient frontier by sweeping the risk aversion.
+
+    Each point is warm-started from the previous one.
+
+    Returns:
+        dict: 'risk_aversion', 'returns', 'volatility' (arrays, one entry
+            per point, riskiest first) and 'weights' (points x assets)
+    """
+    low, high = _aversion_range(mean, covariance)
+    aversions = np.geomspace(low, high, points)
+    lipschitz = float(np.linalg.eigvalsh(covariance)[-1])
+
+    weights = []
+    previous = None
+    for aversion in aversions:
+        previous = optimize(mean, covariance, aversion, max_weight, long_only, previous, lipschitz)
+        weights.append(previous)
+    weights = np.array(weights)
+    return {
+        'risk_aversion': aversions,
+        'returns': weights @ mean,
+        'volatility': np.sqrt(np.einsum('pi,ij,pj->p', weights, covariance, weights)),
+        'weights': weights,
+    }
+
+
+def risk_level_portfolios(mean, covariance, max_weight=1.0, long_only=True, levels=RISK_LEVELS, frontier=None):
+    """
+    Pick one frontier portfolio per risk level.
+
+    Target volatilities are spread evenly from the minimum-variance
+    portfolio (level 1) to the most return-seeking one (the top level). The
+    risk aversion hitting each target is bracketed on the frontier grid and
+    refined by false position on log risk aversion, warm-started from the
+    nearest frontier point, until the volatility is within 0.1% of target.
+
+    Args:
+        frontier (dict): Result of efficient_frontier for the same inputs,
+            traced here if not given
+
+    Returns:
+        list: One dict per level with 'level', 'weights', 'return' and
+            'volatility'
+    """
+    if frontier is None:
+        frontier = efficient_frontier(mean, covariance, max_weight=max_weight, long_only=long_only)
+    lipschitz = float(np.linalg.eigvalsh(covariance)[-1])
+    vols = frontier['volatility']
+    targets = np.linspace(vols.min(), vols.max(), levels)
+    log_aversions = np.log(frontier['risk_aversion'])
+
+    portfolios = []
+    for level, target in enumerate(targets, start=1):
+        # Volatility falls as risk aversion rises; bracket the target on the grid
+        above = np.flatnonzero(vols >= target)
+        below = np.flatnonzero(vols <= target)
+        i = above[-1] if len(above) else 0
+        j = below[0] if len(below) else len(vols) - 1
+        weights = frontier['weights'][i]
+        vol = vols[i]
+        lo, lo_vol = log_aversions[i], vols[i]
+        hi, hi_vol = log_aversions[j], vols[j]
+        for _ in range(30):
+            if abs(vol - target) <= 1e-3 * target or lo_vol - hi_vol <= 0:
+                break
+            middle = lo + (hi - lo) * (lo_vol - target) / (lo_vol - hi_vol)
+            middle = min(max(middle, lo + 0.01 * (hi - lo)), hi - 0.01 * (hi - lo))
+            weights = optimize(mean, covariance, np.exp(middle), max_weight, long_only, weights, lipschitz)
+            vol = np.sqrt(weights @ covariance @ weights)
+            if vol > target:
+                lo, lo_vol = middle, vol
+            else:
+                hi, hi_vol = middle, vol
+        portfolios.append({
+            'level': level,
+            'weights': weights,
+            'return': float(weights @ mean),
+            'volatility': float(np.sqrt(weights @ covariance @ weights)),
+        })
+    return portfolios
+
+
+class CovarianceCache:
+    """
+    Shrinkage covariance estimators kept per (period, universe).
+
+    When the same universe is requested again after new bars arrived, only
+    the new return rows are appended and the rows that left the window are
+    dropped, instead of re-estimating from the whole history. The last row
+    is always refolded, since it may have come from a bar still in progress.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, tickers, dates, returns, period):
+        """
+        Get the estimator for a universe, updated to the given returns.
+
+        Args:
+            tickers (list): Universe, in column order
+            dates (pd.DatetimeIndex): Date of each return row
+            returns (np.ndarray): (date x asset) returns
+            period (str): Period the returns come from; each period (and so
+                each bar length) has its own estimator
+
+        Returns:
+            ShrinkageCovariance: Estimator covering exactly these rows
+        """
+        key = (period, tuple(tickers))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                estimator, old_dates, old_returns = cached
+                # Reusable while the window only slid forward over known dates
+                if len(dates) and len(old_dates) and old_dates[0] <= dates[0] <= old_dates[-1] <= dates[-1]:
+                    # The old last row goes out with the leaving rows and comes back revised
+                    leaving = (old_dates < dates[0]) | (old_dates == old_dates[-1])
+                    estimator.remove(old_returns[leaving])
+                    estimator.append(returns[dates >= old_dates[-1]])
+                    self._entries[key] = (estimator, dates, returns)
+                    return estimator
+
+            estimator = ShrinkageCovariance(returns)
+            self._entries[key] = (estimator, dates, returns)
+            return estimator
+
+
+_covariance_cache = CovarianceCache()
+
+
+def get_risk_profile_portfolios(tickers, period="1y", max_weight=DEFAULT_MAX_WEIGHT, long_only=True):
+    """
+    Build the efficient frontier of a universe and one portfolio per risk level.
+
+    Returns come from get_stock_data_batch closes; the covariance is the
+    cached Ledoit-Wolf estimate, so asking again after a price update only
+    folds in the new days.
+
+    Args:
+        tickers (list): Stock or fund tickers forming the universe
+        period (str): Time period for data (1mo, 3mo, 6mo, 1y, 2y, 5y)
+        max_weight (float): Cap on each asset's weight
+        long_only (bool): Forbid short positions
+
+    Returns:
+        dict: 'tickers', 'shrinkage', 'frontier' (see efficient_frontier,
+            annualized) and 'portfolios' (one per risk level 1-7, each with
+            'level', 'weights' as ticker to weight, 'return' and
+            'volatility' annualized in %), or None on error
+    """
+    from utils.finance import get_stock_data_batch, periods_per_year
+
+    try:
+        tickers = list(dict.fromkeys(tickers))
+        panel = get_stock_data_batch(tickers, period)
+        close = np.asarray(panel['Close'], dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (close[:, 1:] / close[:, :-1] - 1).T
+        dates = pd.DatetimeIndex(panel['Date'])[1:]
+
+        estimator = _covariance_cache.get(tickers, dates, returns, period)
+        covariance, shrinkage = estimator.estimate()
+        scale = periods_per_year(period)
+        mean = estimator.mean() * scale
+        covariance = covariance * scale
+
+        frontier = efficient_frontier(mean, covariance, max_weight=max_weight, long_only=long_only)
+        portfolios = []
+        for portfolio in risk_level_portfolios(mean, covariance, max_weight, long_only, frontier=frontier):
+            weights = {t: round(float(w), 4) for t, w in zip(tickers, portfolio['weights']) if abs(w) > 1e-4}
+            portfolios.append({
+                'level': portfolio['level'],
+                'weights': weights,
+                'return': round(portfolio['return'] * 100, 2),
+                'volatility': round(portfolio['volatility'] * 100, 2),
+            })
+        return {'tickers': tickers, 'shrinkage': shrinkage, 'frontier': frontier, 'portfolios': portfolios}
+    except Exception as e:
+        logger.error(f"Error in get_risk_profile_portfolios: {str(e)}")
+        return None
@@ -0,0 +1,104 @@
+import threading
+import logging
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Funds per page of the fund grid (three rows of three)
+PAGE_SIZE = 9
+
+# Maximum number of result pages kept in memory
+MAX_CACHED_PAGES = 512
+
+
+def page_cursors(cursor, page_size, total):
+    """
+    Cursors around a page of a result list.
+
+    A cursor is the position of the first item of a page, so it stays valid
+    for as long as the underlying result list does.
+
+    Args:
+        cursor (int): Position of the first item of the page
+        page_size (int): Items per page
+        total (int): Length of the result list
+
+    Returns:
+        dict: 'cursor' (clamped to the list), 'next_cursor' and
+            'prev_cursor' (None at either end), 'page' (1-based) and 'pages'
+    """
+    page_size = max(1, int(page_size))
+    last = max(0, (total - 1) // page_size * page_size)
+    cursor = min(max(0, int(cursor or 0)), last)
+    return {
+        'cursor': cursor,
+        'next_cursor': cursor + page_size if cursor + page_size < total else None,
+        'prev_cursor': max(0, cursor - page_size) if cursor > 0 else None,
+        'page': cursor // page_size + 1,
+        'pages': max(1, -(-total // page_size)),
+    }
+
+
+class PageCache:
+    """
+    Cache of result pages keyed by query and page.
+
+    Each entry remembers the version of the data it was built from (e.g.
+    the fund universe object), so pages are rebuilt once the data changes
+    and an unchanged query costs one dictionary lookup on every rerun.
+
+    Args:
+        max_pages (int): Maximum number of pages kept (least recently used
+            pages are dropped first)
+    """
+
+    def __init__(self, max_pages=MAX_CACHED_PAGES):
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """
+        Get a cached page, building it if missing or stale.
+
+        Args:
+            key (tuple): Hashable description of the query and page
+            version (object): Data version; compared by identity
+            build (callable): Builds the page when it is not cached
+
+        Returns:
+            object: The page
+        """
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] is version:
+                self._pages.move_to_end(key)
+                return cached[1]
+
+        page = build()
+        with self._lock:
+            self._pages[key] = (version, page)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    def clear(self):
+        """Drop every cached page."""
+        with self._lock:
+            self._pages.clear()
+
+
+_default_cache = PageCache()
+
+
+def get_page_cache():
+    """
+    Get the process-wide cache of result pages.
+
+    Returns:
+        PageCache: Shared cache instance
+    """
+    return _default_cache
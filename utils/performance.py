@@ -0,0 +1,145 @@
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils.risk import TRADING_DAYS, returns_from_prices
+from utils.rng import date_bucket
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BENCHMARKS = ['SPY']
+
+# Cached benchmark closes are refetched once per bucket of this size
+BENCHMARK_REFRESH = 'h'
+
+# (ticker, period) -> (bucket, close series); shared by every session in the process
+_benchmark_cache = {}
+_benchmark_lock = threading.Lock()
+
+
+def get_benchmark_series(ticker, period="1y"):
+    """
+    Close series of a benchmark, cached once per process.
+
+    The first request in each refresh bucket loads the series with
+    get_stock_data; every other caller (any user, any session) gets the
+    same cached series.
+
+    Args:
+        ticker (str): Benchmark ticker symbol
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+
+    Returns:
+        pd.Series: Closes indexed by date (empty if no data)
+    """
+    from utils.finance import get_stock_data
+
+    key = (ticker.upper(), period)
+    bucket = date_bucket(freq=BENCHMARK_REFRESH)
+    with _benchmark_lock:
+        cached = _benchmark_cache.get(key)
+        if cached is not None and cached[0] == bucket:
+            return cached[1]
+
+    data = get_stock_data(key[0], period)
+    series = pd.Series(data['Close'].to_numpy(np.float64), index=pd.DatetimeIndex(data['Date']), name=key[0])
+    with _benchmark_lock:
+        _benchmark_cache[key] = (bucket, series)
+    return series
+
+
+def align_series(portfolio, benchmarks):
+    """
+    Put a portfolio series and benchmark series on the portfolio's calendar.
+
+    Each benchmark takes its last value at or before every portfolio date
+    (an as-of join, so holidays and missing bars carry the previous close).
+    Leading dates where any series has no value yet are dropped.
+
+    Args:
+        portfolio (pd.Series): Portfolio values indexed by date
+        benchmarks (dict): Benchmark name to pd.Series of closes
+
+    Returns:
+        pd.DataFrame: One column for the portfolio (its name, or
+            'Portfolio') and one per benchmark
+    """
+    dates = pd.DatetimeIndex(portfolio.index).as_unit('ns')
+    stamps = dates.asi8
+    columns = {portfolio.name or 'Portfolio': portfolio.to_numpy(np.float64)}
+    for name, series in benchmarks.items():
+        series_dates = pd.DatetimeIndex(series.index).as_unit('ns').asi8
+        values = series.to_numpy(np.float64)
+        position = np.searchsorted(series_dates, stamps, side='right') - 1
+        columns[name] = np.where(position >= 0, values[np.maximum(position, 0)], np.nan)
+
+    frame = pd.DataFrame(columns, index=dates)
+    complete = np.flatnonzero(frame.notna().all(axis=1).to_numpy())
+    return frame.iloc[complete[0]:] if len(complete) else frame.iloc[:0]
+
+
+def relative_performance(aligned, periods_per_year=TRADING_DAYS):
+    """
+    Cumulative and excess return, tracking error and information ratio.
+
+    Args:
+        aligned (pd.DataFrame): Output of align_series; the first column is
+            the portfolio, the others benchmarks
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        dict: 'cumulative' (DataFrame, % since the first date, all series),
+            'excess' (DataFrame, portfolio minus benchmark cumulative %),
+            and per benchmark 'active_return' (annualized mean of the return
+            difference, %), 'tracking_error' (annualized %) and
+            'information_ratio'
+    """
+    values = aligned.to_numpy(np.float64).T
+    names = list(aligned.columns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cumulative = (values / values[:, :1] - 1) * 100
+
+    # Active returns of the portfolio against each benchmark
+    returns = returns_from_prices(values)
+    active = returns[:1] - returns[1:]
+    scale = np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nanmean(active, axis=1) if active.shape[1] else np.full(len(active), np.nan)
+        deviation = np.nanstd(active, axis=1, ddof=1) if active.shape[1] > 1 else np.full(len(active), np.nan)
+        ratio = np.where(deviation > 0, mean / deviation * scale, np.nan)
+
+    benchmarks = names[1:]
+    return {
+        'cumulative': pd.DataFrame(cumulative.T, index=aligned.index, columns=names),
+        'excess': pd.DataFrame((cumulative[:1] - cumulative[1:]).T, index=aligned.index, columns=benchmarks),
+        'active_return': {name: round(float(m * periods_per_year * 100), 2) for name, m in zip(benchmarks, mean)},
+        'tracking_error': {name: round(float(d * scale * 100), 2) for name, d in zip(benchmarks, deviation)},
+        'information_ratio': {name: round(float(r), 2) for name, r in zip(benchmarks, ratio)},
+    }
+
+
+def get_relative_performance(portfolio, benchmarks=None, period="1y", periods_per_year=TRADING_DAYS):
+    """
+    Compare a portfolio series with cached benchmark series.
+
+    Args:
+        portfolio (pd.Series): Portfolio values indexed by date
+        benchmarks (list): Benchmark tickers (defaults to DEFAULT_BENCHMARKS)
+        period (str): Period the benchmark closes are loaded for; should
+            cover the portfolio dates
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        dict: relative_performance output, or None on error
+    """
+    try:
+        tickers = DEFAULT_BENCHMARKS if benchmarks is None else benchmarks
+        series = {ticker: get_benchmark_series(ticker, period) for ticker in tickers}
+        return relative_performance(align_series(portfolio, series), periods_per_year)
+    except Exception as e:
+        logger.error(f"Error in get_relative_performance: {str(e)}")
+        return None
@@ -0,0 +1,192 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils.finance import get_stock_data_batch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ASSET_CLASSES = ['Stocks', 'Bonds', 'Cash', 'Alternatives', 'Real Estate']
+
+# Positions in this class are valued at 1.0 per unit and need no price data
+CASH_CLASS = 'Cash'
+
+POSITION_COLUMNS = ['Symbol', 'Name', 'Asset Class', 'Shares', 'Cost Basis']
+
+# Example holdings shown until the user's own positions are recorded
+DEMO_HOLDINGS = [
+    {'symbol': 'AAPL', 'name': 'Apple Inc.', 'shares': 100, 'cost_basis': 136.78, 'asset_class': 'Stocks'},
+    {'symbol': 'MSFT', 'name': 'Microsoft Corp', 'shares': 50, 'cost_basis': 275.12, 'asset_class': 'Stocks'},
+    {'symbol': 'GOOGL', 'name': 'Alphabet Inc', 'shares': 20, 'cost_basis': 120.42, 'asset_class': 'Stocks'},
+    {'symbol': 'AMZN', 'name': 'Amazon.com', 'shares': 15, 'cost_basis': 158.66, 'asset_class': 'Stocks'},
+    {'symbol': 'NVDA', 'name': 'NVIDIA Corp', 'shares': 40, 'cost_basis': 619.27, 'asset_class': 'Stocks'},
+    {'symbol': 'ORCL', 'name': 'Oracle Corp', 'shares': 50, 'cost_basis': 136.29, 'asset_class': 'Stocks'},
+    {'symbol': 'NVO', 'name': 'Novo Nordisk', 'shares': 75, 'cost_basis': 120.70, 'asset_class': 'Stocks'},
+    {'symbol': 'BND', 'name': 'Vanguard Total Bond Market', 'shares': 300, 'cost_basis': 72.40, 'asset_class': 'Bonds'},
+    {'symbol': 'GLD', 'name': 'SPDR Gold Shares', 'shares': 60, 'cost_basis': 181.35, 'asset_class': 'Alternatives'},
+    {'symbol': 'VNQ', 'name': 'Vanguard Real Estate ETF', 'shares': 60, 'cost_basis': 84.10, 'asset_class': 'Real Estate'},
+    {'symbol': 'CASH', 'name': 'Cash (USD)', 'shares': 20000, 'cost_basis': 1.0, 'asset_class': 'Cash'},
+]
+
+
+def positions_frame(positions):
+    """
+    Normalize positions into a DataFrame.
+
+    Args:
+        positions (list or pd.DataFrame): Position dicts with 'symbol',
+            'shares', 'cost_basis' (per share) and optionally 'name' and
+            'asset_class', or a DataFrame with POSITION_COLUMNS
+
+    Returns:
+        pd.DataFrame: One row per position with POSITION_COLUMNS
+    """
+    if isinstance(positions, pd.DataFrame):
+        frame = positions.copy()
+    else:
+        frame = pd.DataFrame(list(positions)).rename(columns={
+            'symbol': 'Symbol', 'name': 'Name', 'asset_class': 'Asset Class',
+            'shares': 'Shares', 'cost_basis': 'Cost Basis',
+        })
+    # Positions that leave out a name or asset class get the defaults
+    frame['Name'] = frame['Name'].fillna(frame['Symbol']) if 'Name' in frame else frame['Symbol']
+    frame['Asset Class'] = frame['Asset Class'].fillna('Stocks') if 'Asset Class' in frame else 'Stocks'
+    frame['Symbol'] = frame['Symbol'].astype(str).str.upper()
+    frame['Shares'] = frame['Shares'].astype(np.float64)
+    frame['Cost Basis'] = frame['Cost Basis'].astype(np.float64)
+    return frame[POSITION_COLUMNS].reset_index(drop=True)
+
+
+def value_positions(positions, panel):
+    """
+    Value a portfolio over every date of a price panel.
+
+    Positions on the same symbol and asset class are folded into one
+    exposure matrix of (total + one row per asset class) x symbols, so the
+    whole history comes out of a single matrix product with the
+    (symbols x dates) close panel. Per-position figures only need the last
+    close. Cash positions are valued at 1.0 per unit; missing prices (dates
+    before a symbol's first bar) count as 0.
+
+    Args:
+        positions (list or pd.DataFrame): Positions (see positions_frame)
+        panel (dict): Panel from get_stock_data_batch covering the
+            positions' symbols (cash symbols may be absent)
+
+    Returns:
+        dict: 'dates', 'value' (daily total value), 'class_values' (asset
+            class to daily value), 'returns' (daily), 'cumulative_return'
+            (% since the first date), 'positions' (DataFrame with price,
+            value, P&L, return and weight per position), 'allocation'
+            (asset class to % of the latest value) and summary figures
+            'total_value', 'total_cost', 'unrealized_pnl', 'return_pct'
+            and 'mtd_return_pct'
+    """
+    frame = positions_frame(positions)
+    dates = pd.DatetimeIndex(panel['Date'])
+    close = np.asarray(panel['Close'], dtype=np.float64)
+    row_of = {ticker: i for i, ticker in enumerate(panel['tickers'])}
+
+    # Price rows index the panel; cash gets the extra row len(panel tickers)
+    cash_row = len(row_of)
+    is_cash = (frame['Asset Class'] == CASH_CLASS).to_numpy()
+    symbols = frame['Symbol'].to_numpy()
+    rows = np.array([cash_row if cash else row_of.get(symbol, -1) for symbol, cash in zip(symbols, is_cash)],
+                    dtype=np.int64)
+    unpriced = rows < 0
+    if unpriced.any():
+        logger.warning(f"No prices for {', '.join(sorted(set(symbols[unpriced])))}")
+        rows[unpriced] = cash_row
+    shares = np.where(unpriced, 0.0, frame['Shares'].to_numpy())
+
+    classes = list(dict.fromkeys(list(ASSET_CLASSES) + list(frame['Asset Class'])))
+    class_codes = pd.Categorical(frame['Asset Class'], categories=classes).codes
+
+    # Exposure: row 0 is the whole portfolio, then one row per asset class
+    exposure = np.zeros((1 + len(classes), cash_row + 1))
+    np.add.at(exposure[0], rows, shares)
+    np.add.at(exposure, (1 + class_codes, rows), shares)
+
+    # Only the held symbols enter the product (no copy if all are held)
+    held = np.flatnonzero(exposure[0, :cash_row])
+    held_close = close if len(held) == cash_row else close[held]
+    if np.isnan(held_close).any():
+        held_close = np.nan_to_num(held_close)
+    series = exposure[:, held] @ held_close + exposure[:, cash_row:]
+
+    value = series[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(value[:-1] > 0, value[1:] / value[:-1] - 1, 0.0)
+        cumulative = (value / value[0] - 1) * 100 if len(value) and value[0] else np.zeros_like(value)
+
+    # Per-position figures at the latest close
+    last_close = np.append(np.nan_to_num(close[:, -1]), 1.0) if len(dates) else np.zeros(cash_row + 1)
+    last_price = last_close[rows]
+    position_value = shares * last_price
+    cost = shares * frame['Cost Basis'].to_numpy()
+    total_value = float(position_value.sum())
+    total_cost = float(cost.sum())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position_return = np.where(cost > 0, (position_value / cost - 1) * 100, 0.0)
+        weight = position_value / total_value * 100 if total_value else np.zeros_like(position_value)
+
+    table = frame.assign(**{
+        'Price': last_price.round(2),
+        'Value': position_value.round(2),
+        'P&L': (position_value - cost).round(2),
+        'Return': position_return.round(2),
+        'Weight': weight.round(2),
+    })
+
+    class_values = {name: series[1 + i] for i, name in enumerate(classes)}
+    latest = {name: float(values[-1]) if len(values) else 0.0 for name, values in class_values.items()}
+    allocation = {name: round(amount / total_value * 100, 2) if total_value else 0.0
+                  for name, amount in latest.items() if amount > 0}
+
+    # Month to date: against the last value before the current month
+    mtd = 0.0
+    if len(dates):
+        month_start = dates[-1].normalize().replace(day=1)
+        before = np.flatnonzero(dates < month_start)
+        base = value[before[-1]] if len(before) else value[0]
+        mtd = (value[-1] / base - 1) * 100 if base else 0.0
+
+    return {
+        'dates': dates,
+        'value': value,
+        'class_values': class_values,
+        'returns': returns,
+        'cumulative_return': cumulative,
+        'positions': table,
+        'allocation': allocation,
+        'total_value': round(total_value, 2),
+        'total_cost': round(total_cost, 2),
+        'unrealized_pnl': round(total_value - total_cost, 2),
+        'return_pct': round((total_value / total_cost - 1) * 100, 2) if total_cost else 0.0,
+        'mtd_return_pct': round(float(mtd), 2),
+    }
+
+
+def get_portfolio_valuation(positions=None, period="1y"):
+    """
+    Value a portfolio with prices from the market-data provider.
+
+    Args:
+        positions (list or pd.DataFrame): Positions (see positions_frame);
+            defaults to DEMO_HOLDINGS
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+
+    Returns:
+        dict: Valuation as returned by value_positions, or None on error
+    """
+    try:
+        frame = positions_frame(DEMO_HOLDINGS if positions is None else positions)
+        symbols = frame.loc[frame['Asset Class'] != CASH_CLASS, 'Symbol'].unique().tolist()
+        panel = get_stock_data_batch(symbols, period)
+        return value_positions(frame, panel)
+    except Exception as e:
+        logger.error(f"Error in get_portfolio_valuation: {str(e)}")
+        return None
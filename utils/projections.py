@@ -0,0 +1,362 @@
+import os
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.paging import PageCache
+from utils.rng import date_bucket, stream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODELS = ('gbm', 'bootstrap', 'correlated')
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+TRADING_DAYS = 252
+
+# Random values drawn per chunk; bounds the memory of a chunk to ~16 MB
+CHUNK_VALUES = 1 << 22
+
+# Log-growth histogram every step is accumulated into (factor e^-4 .. e^4)
+LOG_RANGE = 4.0
+HISTOGRAM_BINS = 4000
+
+# Projections are refitted once per bucket of this size; at most this many are kept
+PROJECTION_REFRESH = 'D'
+MAX_CACHED_PROJECTIONS = 64
+
+
+def calibrate(returns, periods_per_year=TRADING_DAYS):
+    """
+    Fit the inputs of the single-asset models to daily returns.
+
+    Args:
+        returns (array): Daily simple returns (NaN are dropped)
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        dict: 'mu' and 'sigma' (annualized, of log returns) and 'returns'
+            (the log returns the bootstrap draws from)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    log_returns = np.log1p(returns[~np.isnan(returns)])
+    sigma = float(log_returns.std(ddof=1)) * np.sqrt(periods_per_year) if len(log_returns) > 1 else 0.0
+    mu = float(log_returns.mean()) * periods_per_year + 0.5 * sigma ** 2 if len(log_returns) else 0.0
+    return {'mu': mu, 'sigma': sigma, 'returns': log_returns.astype(np.float32)}
+
+
+def calibrate_assets(returns, weights, periods_per_year=TRADING_DAYS):
+    """
+    Fit the correlated multi-asset model.
+
+    Args:
+        returns (array): (asset x date) daily simple returns
+        weights (array): Portfolio weight of each asset (rebalanced daily)
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        dict: 'drift' (daily mean log return per asset), 'cholesky' (of the
+            daily log-return covariance) and normalized 'weights'
+    """
+    log_returns = np.log1p(np.nan_to_num(np.asarray(returns, dtype=np.float64)))
+    weights = np.asarray(weights, dtype=np.float64)
+    covariance = np.atleast_2d(np.cov(log_returns))
+
+    # A tiny ridge keeps the factorization defined for flat or duplicate assets
+    ridge = 1e-12 * max(float(np.trace(covariance)), 1.0) * np.eye(len(covariance))
+    return {
+        'drift': log_returns.mean(axis=1),
+        'cholesky': np.linalg.cholesky(covariance + ridge),
+        'weights': weights / weights.sum() if weights.sum() else weights,
+    }
+
+
+def _chunk_log_growth(model, params, rng, n_paths, horizon):
+    """
+    Cumulative log growth of one chunk of paths.
+
+    Steps run along the first axis, so accumulating them is one vectorized
+    add across all paths per step.
+
+    Returns:
+        np.ndarray: (horizon x n_paths) float32 log growth after each step
+    """
+    if model == 'gbm':
+        dt = 1.0 / TRADING_DAYS
+        drift = (params['mu'] - 0.5 * params['sigma'] ** 2) * dt
+        steps = rng.standard_normal((horizon, n_paths), dtype=np.float32)
+        steps *= np.float32(params['sigma'] * np.sqrt(dt))
+        steps += np.float32(drift)
+    elif model == 'bootstrap':
+        history = params['returns']
+        steps = history[rng.integers(0, len(history), size=(horizon, n_paths))]
+    elif model == 'correlated':
+        chol = params['cholesky'].astype(np.float32)
+        draws = rng.standard_normal((horizon * n_paths, len(chol)), dtype=np.float32)
+        asset_steps = draws @ chol.T
+        asset_steps += params['drift'].astype(np.float32)
+
+        # Daily rebalanced portfolio: weighted simple returns, back to log
+        np.exp(asset_steps, out=asset_steps)
+        steps = np.log(asset_steps @ params['weights'].astype(np.float32)).reshape(horizon, n_paths)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+
+    for t in range(1, horizon):
+        np.add(steps[t], steps[t - 1], out=steps[t])
+    return steps
+
+
+def _simulate_chunks(model, params, horizon, chunks, seed):
+    """
+    Simulate some chunks and reduce them to a histogram per step.
+
+    Runs in worker processes, so it only takes and returns plain data.
+
+    Args:
+        chunks (list): (chunk index, paths in chunk) pairs
+
+    Returns:
+        tuple: (counts, wealth_sum, final_losses) where counts is the
+            (horizon x HISTOGRAM_BINS) histogram of log growth, wealth_sum the
+            sum of growth factors per step and final_losses the number of
+            paths ending below 1
+    """
+    counts = np.zeros(horizon * HISTOGRAM_BINS, dtype=np.int64)
+    wealth_sum = np.zeros(horizon)
+    losses = 0
+    scale = np.float32(HISTOGRAM_BINS / (2 * LOG_RANGE))
+    offsets = np.arange(horizon, dtype=np.int64)[:, None] * HISTOGRAM_BINS
+
+    for index, n_paths in chunks:
+        # Each chunk has its own stream, so results do not depend on workers
+        rng = stream('projection', model, seed, index)
+        growth = _chunk_log_growth(model, params, rng, n_paths, horizon)
+        losses += int((growth[-1] < 0).sum())
+        wealth_sum += np.exp(growth).sum(axis=1, dtype=np.float64)
+
+        # Bin in place: shift and scale, clamp to the edge bins, truncate
+        growth += np.float32(LOG_RANGE)
+        growth *= scale
+        np.clip(growth, 0, HISTOGRAM_BINS - 1, out=growth)
+        bins = growth.astype(np.int64)
+        bins += offsets
+        counts += np.bincount(bins.ravel(), minlength=len(counts))
+    return counts.reshape(horizon, HISTOGRAM_BINS), wealth_sum, losses
+
+
+def _histogram_percentiles(counts, percentiles):
+    """Percentiles of log growth per step, interpolated inside the bins."""
+    width = 2 * LOG_RANGE / HISTOGRAM_BINS
+    cdf = np.cumsum(counts, axis=1)
+    total = cdf[:, -1:]
+    result = {}
+    for p in percentiles:
+        target = p / 100 * total
+        index = np.minimum((cdf < target).sum(axis=1), HISTOGRAM_BINS - 1)
+        rows = np.arange(len(cdf))
+        below = np.where(index > 0, cdf[rows, np.maximum(index - 1, 0)], 0)
+        inside = counts[rows, index]
+        fraction = np.where(inside > 0, (target[:, 0] - below) / np.maximum(inside, 1), 0.5)
+        result[p] = -LOG_RANGE + (index + fraction) * width
+    return result
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """
+    Get the process pool shared by every simulation.
+
+    The pool is started on first use and only replaced when a call needs
+    more workers than it has, so worker start-up is paid once per process.
+
+    Args:
+        workers (int): Worker processes the caller needs
+
+    Returns:
+        ProcessPoolExecutor: Shared pool
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _drop_pool():
+    """Discard the shared pool (e.g. after a worker died); the next call starts a new one."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def simulate(model, params, n_paths=100_000, horizon=TRADING_DAYS, initial_value=1.0,
+             percentiles=DEFAULT_PERCENTILES, seed=0, workers=None):
+    """
+    Simulate future portfolio paths and summarize them as a fan chart.
+
+    Paths are generated in chunks of at most CHUNK_VALUES random values, and
+    every chunk is folded into a per-step histogram of log growth straight
+    away, so memory stays bounded whatever n_paths is. Chunks are spread
+    over a process pool shared by every call (see _get_pool); each chunk
+    has its own keyed random stream, so the result is the same for any
+    number of workers.
+
+    Args:
+        model (str): 'gbm', 'bootstrap' or 'correlated'
+        params (dict): calibrate() output (gbm, bootstrap) or
+            calibrate_assets() output (correlated)
+        n_paths (int): Number of simulated paths
+        horizon (int): Number of daily steps
+        initial_value (float): Portfolio value at step 0
+        percentiles (tuple): Percentiles of the fan chart
+        seed (int): Seed of the simulation
+        workers (int): Worker processes (defaults to the CPU count; 1 runs
+            in this process)
+
+    Returns:
+        dict: 'steps' (0..horizon), 'percentiles' (percentile to value per
+            step), 'mean' (value per step), 'prob_loss' (share of paths
+            ending below initial_value), plus 'model', 'n_paths' and
+            'initial_value'
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}")
+
+    values_per_path = horizon * (len(params['cholesky']) if model == 'correlated' else 1)
+    chunk_paths = max(1, CHUNK_VALUES // values_per_path)
+    chunks = [(i, min(chunk_paths, n_paths - start))
+              for i, start in enumerate(range(0, n_paths, chunk_paths))]
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers > 1:
+        try:
+            groups = [chunks[i::workers] for i in range(workers)]
+            parts = list(_get_pool(workers).map(_simulate_chunks, [model] * workers, [params] * workers,
+                                                [horizon] * workers, groups, [seed] * workers))
+        except Exception as e:
+            logger.warning(f"Process pool unavailable, simulating in-process: {str(e)}")
+            _drop_pool()
+            parts = [_simulate_chunks(model, params, horizon, chunks, seed)]
+    else:
+        parts = [_simulate_chunks(model, params, horizon, chunks, seed)]
+
+    counts = sum(part[0] for part in parts)
+    wealth_sum = sum(part[1] for part in parts)
+    losses = sum(part[2] for part in parts)
+
+    growth = _histogram_percentiles(counts, percentiles)
+    fan = {p: np.concatenate([[initial_value], initial_value * np.exp(values)]) for p, values in growth.items()}
+    return {
+        'model': model,
+        'n_paths': n_paths,
+        'initial_value': initial_value,
+        'steps': np.arange(horizon + 1),
+        'percentiles': fan,
+        'mean': np.concatenate([[initial_value], initial_value * wealth_sum / n_paths]),
+        'prob_loss': losses / n_paths if n_paths else 0.0,
+    }
+
+
+_projection_cache = PageCache(MAX_CACHED_PROJECTIONS)
+
+
+def _positions_key(positions):
+    """Hashable description of some holdings, for the projection cache."""
+    if positions is None:
+        return None
+    if isinstance(positions, pd.DataFrame):
+        return tuple(positions.columns), tuple(positions.itertuples(index=False, name=None))
+    return tuple(tuple(sorted(position.items())) for position in positions)
+
+
+def _project(positions, model, n_paths, horizon, percentiles, seed, workers, period):
+    """Fit and run one projection (see project_portfolio); raises on error."""
+    from utils.finance import get_portfolio_metrics, get_stock_data_batch
+    from utils.portfolio import CASH_CLASS, get_portfolio_valuation
+
+    if positions is None:
+        if model == 'correlated':
+            raise ValueError("The correlated model needs positions")
+        metrics = get_portfolio_metrics()
+        values = np.asarray(metrics['value'], dtype=np.float64)
+        initial_value = float(values[-1])
+        params = calibrate(values[1:] / values[:-1] - 1)
+    else:
+        valuation = get_portfolio_valuation(positions, period)
+        initial_value = valuation['total_value']
+        if model == 'correlated':
+            table = valuation['positions']
+            held = table[table['Value'] > 0]
+            weights = held.groupby('Symbol', sort=False)['Value'].sum()
+            symbols = [s for s in weights.index if s not in set(held.loc[held['Asset Class'] == CASH_CLASS, 'Symbol'])]
+            panel = get_stock_data_batch(symbols, period)
+            close = np.asarray(panel['Close'], dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = close[:, 1:] / close[:, :-1] - 1
+            cash = weights.drop(symbols).sum()
+            if cash > 0:
+                # Cash is one more asset that never moves
+                returns = np.vstack([returns, np.zeros((1, returns.shape[1]))])
+            params = calibrate_assets(returns, list(weights[symbols]) + ([cash] if cash > 0 else []))
+        else:
+            params = calibrate(valuation['returns'])
+
+    result = simulate(model, params, n_paths, horizon, initial_value, percentiles, seed, workers)
+    result['dates'] = pd.bdate_range(start=pd.Timestamp.now().normalize(), periods=horizon + 1)
+    years = horizon / TRADING_DAYS
+    result['annual_return'] = {
+        p: round(((values[-1] / initial_value) ** (1 / years) - 1) * 100, 2) if initial_value else 0.0
+        for p, values in result['percentiles'].items()
+    }
+    return result
+
+
+def project_portfolio(positions=None, model='gbm', n_paths=100_000, horizon=TRADING_DAYS,
+                      percentiles=DEFAULT_PERCENTILES, seed=0, workers=None, period="1y"):
+    """
+    Project a portfolio forward by Monte Carlo simulation.
+
+    Without positions, the model is fitted to the value history of
+    get_portfolio_metrics; with positions, to their valuation (gbm and
+    bootstrap) or to the returns of each holding (correlated). Results are
+    cached per set of arguments and PROJECTION_REFRESH bucket, so reruns
+    and repeated questions reuse the day's simulation.
+
+    Args:
+        positions (list or pd.DataFrame): Holdings (see utils.portfolio), or
+            None for the get_portfolio_metrics portfolio
+        model (str): 'gbm', 'bootstrap' or 'correlated'
+        n_paths (int): Number of simulated paths
+        horizon (int): Number of trading days to project
+        percentiles (tuple): Percentiles of the fan chart
+        seed (int): Seed of the simulation
+        workers (int): Worker processes (see simulate)
+        period (str): History the model is fitted to
+
+    Returns:
+        dict: simulate() output plus 'dates' (business days from today)
+            and 'annual_return' (percentile to annualized return in %), or
+            None on error
+    """
+    try:
+        key = (_positions_key(positions), model, n_paths, horizon, tuple(percentiles), seed, period,
+               date_bucket(freq=PROJECTION_REFRESH))
+        return _projection_cache.get(key, None, lambda: _project(positions, model, n_paths, horizon,
+                                                                 percentiles, seed, workers, period))
+    except Exception as e:
+        logger.error(f"Error in project_portfolio: {str(e)}")
+        return None
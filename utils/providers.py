@@ -0,0 +1,759 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from utils.resample import GRID_ORIGIN, align_to_grid, resample_ohlcv
+from utils.rng import keyed_uniforms, stable_seed
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OHLCV_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close')
+
+# Quote fields reported by scrape_financial_data, in display order
+QUOTE_FIELDS = (
+    'Previous Close', 'Open', 'Day Range', 'Volume', 'Market Cap',
+    '52 Week Range', 'Avg Volume', 'PE Ratio', 'EPS', 'Dividend'
+)
+
+DEFAULT_REPLAY_DIR = os.environ.get(
+    'TRAID_REPLAY_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'replay')
+)
+
+# Synthetic prices: a log-linear trend through each ticker's base price at
+# TREND_ANCHOR, a shared yearly season and bounded noise (see _daily_levels)
+TREND_ANCHOR = pd.Timestamp("2024-01-01")
+ANNUAL_DRIFT = 0.2  # Trend factors of -0.5 to 0.4 drift -10% to +8% a year
+SEASONAL_AMPLITUDE = 0.03
+DAILY_VOLATILITY = 0.015
+HOURLY_VOLATILITY = 0.003
+NOISE_DECAY = 0.98
+NOISE_LAGS = 192
+BAR_SPREAD = 0.01
+_YEAR_NS = pd.Timedelta(days=365.25).value
+
+# Random inputs of a bar, and the keyed draws behind them (see _bar_draws)
+BAR_DRAWS = ('step', 'high', 'low', 'volume')
+_DRAW_LANES = 5
+
+
+def _empty_columns():
+    """Columns of a series with no bars."""
+    columns = {name: np.empty(0) for name in OHLCV_FIELDS}
+    columns['Volume'] = np.empty(0, dtype=np.int64)
+    columns['Date'] = np.empty(0, dtype=np.int64)
+    return columns
+
+
+def _bar_label(bar):
+    """Short label of a bar length, matching the store frequencies ('1h', '1D')."""
+    if bar < pd.Timedelta(days=1):
+        return f"{int(bar / pd.Timedelta(hours=1))}h"
+    return f"{int(bar / pd.Timedelta(days=1))}D"
+
+
+def _snap_to_grid(columns, bar):
+    """Move raw bars onto the bar grid, merging bars that share a slot."""
+    order = np.argsort(columns['Date'], kind='stable')
+    columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+    return resample_ohlcv(columns, bar, GRID_ORIGIN)
+
+
+def _quote_from_bars(ticker, columns, source):
+    """
+    Build a quote in the scrape_financial_data layout from daily bars.
+
+    Args:
+        ticker (str): The stock ticker symbol
+        columns (dict): Recent daily bars, oldest first
+        source (str): Name of the provider the bars came from
+
+    Returns:
+        dict: Quote data
+    """
+    if len(columns['Date']) == 0:
+        return {'error': 'No market data available', 'ticker': ticker}
+
+    close = float(columns['Close'][-1])
+    previous = float(columns['Close'][-2]) if len(columns['Date']) > 1 else float(columns['Open'][-1])
+    change = close - previous
+
+    data = {
+        'ticker': ticker,
+        'price': f"{close:.2f}",
+        'change': f"{change:+.2f}",
+        'change_percent': f"{change / previous * 100:+.2f}%" if previous else "N/A",
+        'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    data.update({key: "N/A" for key in QUOTE_FIELDS})
+    data['Previous Close'] = f"{previous:.2f}"
+    data['Open'] = f"{float(columns['Open'][-1]):.2f}"
+    data['Day Range'] = f"{float(columns['Low'][-1]):.2f} - {float(columns['High'][-1]):.2f}"
+    data['Volume'] = f"{int(columns['Volume'][-1]):,}"
+    data['company_name'] = ticker
+    data['source'] = source
+    return data
+
+
+def _ticker_factors(tickers):
+    """
+    Derive the per-ticker base price and trend factor used by the generator.
+
+    Returns:
+        tuple: (base_price, trend_factor) arrays, one entry per ticker
+    """
+    ticker_hash = np.array([sum(ord(c) for c in t) % 100 for t in tickers], dtype=np.float64)
+    base_price = 50 + ticker_hash  # Different base price for different tickers
+    trend_factor = (ticker_hash % 10 - 5) / 10  # Range: -0.5 to 0.4
+    return base_price, trend_factor
+
+
+def _bar_draws(tickers, dates, bar, fields=BAR_DRAWS):
+    """
+    Draw the random inputs of every (ticker, bar).
+
+    Each (ticker, bar length) has one keyed sequence (see
+    utils.rng.keyed_uniforms), and a bar's draws sit at the positions of its
+    slot on the bar grid, so a bar gets the same numbers whichever window or
+    worker generates it.
+
+    Args:
+        tickers (list): Ticker symbols, one row each
+        dates (pd.DatetimeIndex): Sorted bar timestamps on the bar grid
+        bar (pd.Timedelta): Bar length
+        fields (tuple): Draws to make, from BAR_DRAWS
+
+    Returns:
+        dict: 'step' (standard normal), 'high', 'low' (uniform on [0, 1))
+            and 'volume' arrays of shape (len(tickers), len(dates))
+    """
+    dates_ns = pd.DatetimeIndex(dates).as_unit('ns').asi8
+    bar_ns = bar.as_unit('ns').value
+    slot = (dates_ns - GRID_ORIGIN.as_unit('ns').value) // bar_ns
+    seeds = [stable_seed('stock', ticker.upper(), bar_ns) for ticker in tickers]
+
+    def uniforms(lane):
+        return keyed_uniforms(seeds, slot * _DRAW_LANES + lane)
+
+    draws = {}
+    if 'step' in fields:
+        # Box-Muller over two lanes; 1 - u keeps the logarithm finite
+        radius = np.sqrt(-2 * np.log1p(-uniforms(0)))
+        draws['step'] = radius * np.cos(2 * np.pi * uniforms(1))
+    if 'high' in fields:
+        draws['high'] = uniforms(2)
+    if 'low' in fields:
+        draws['low'] = uniforms(3)
+    if 'volume' in fields:
+        draws['volume'] = 100000 + (uniforms(4) * 9900000).astype(np.int64)
+    return draws
+
+
+def _decayed_window_sums(values, decay, width):
+    """
+    Sum each run of width columns, weighting the newest 1 and older ones by decay per column.
+
+    Column i of the result covers columns i to i + width - 1 of values. The
+    sums are built by doubling (runs of 1, 2, 4, ... columns), so they take
+    about log2(width) whole-array steps, and each one goes through the same
+    operations on the same inputs however many columns values has.
+
+    Args:
+        values (np.ndarray): (row x column) array with at least width columns
+        decay (float): Weight of a column relative to the next one
+        width (int): Columns in a run
+
+    Returns:
+        np.ndarray: (row x (columns - width + 1)) sums
+    """
+    count = values.shape[1] - width + 1
+    sums = None
+    covered = 0  # Newest columns of each run already in sums
+    run, length = values, 1  # run[:, i]: sum of the length columns from i
+    while length <= width:
+        if width & length:
+            start = width - covered - length
+            part = decay ** covered * run[:, start:start + count]
+            sums = part if sums is None else sums + part
+            covered += length
+        if 2 * length <= width:
+            run = run[:, length:] + decay ** length * run[:, :-length]
+        length *= 2
+    return sums
+
+
+def _daily_levels(tickers, days_ns):
+    """
+    Log price of every ticker at some midnights of the day grid.
+
+    The level at midnight d is the ticker's trend and the shared season at
+    d, plus DAILY_VOLATILITY * sum over k < NOISE_LAGS of
+    NOISE_DECAY**k * e(d - 1 - k), where e(x) is the keyed normal draw of
+    day x. The noise is an AR(1) cut off after NOISE_LAGS days, so it stays
+    bounded however far d is from TREND_ANCHOR, and the level depends on d
+    alone: every window, bar length and refresh path sees the same price.
+
+    Args:
+        tickers (list): Ticker symbols, one row each
+        days_ns (np.ndarray): Sorted midnights on the day grid, epoch ns
+
+    Returns:
+        np.ndarray: (ticker x day) log prices
+    """
+    day = pd.Timedelta(days=1)
+    day_ns = day.value
+    first = int(days_ns[0]) - NOISE_LAGS * day_ns
+    steps = _bar_draws(tickers, pd.to_datetime(np.arange(first, int(days_ns[-1]), day_ns)), day, ('step',))['step']
+
+    # Column i of noise is the run of NOISE_LAGS draws ending the day before first + (i + NOISE_LAGS) days
+    noise = _decayed_window_sums(steps, NOISE_DECAY, NOISE_LAGS)
+
+    base_price, trend_factor = _ticker_factors(tickers)
+    years = (days_ns - TREND_ANCHOR.as_unit('ns').value) / _YEAR_NS
+    trend = np.log(base_price)[:, None] + (ANNUAL_DRIFT * trend_factor)[:, None] * years
+    seasonality = SEASONAL_AMPLITUDE * np.sin(2 * np.pi * years)
+    return trend + seasonality + DAILY_VOLATILITY * noise[:, (days_ns - first) // day_ns - NOISE_LAGS]
+
+
+def _log_prices(tickers, stamps_ns):
+    """
+    Log price of every ticker at timestamps on the hourly grid.
+
+    Inside a day, the price runs from one midnight level to the next along
+    a Brownian bridge of the day's hourly draws, so hourly and daily bars
+    agree wherever they meet.
+
+    Args:
+        tickers (list): Ticker symbols, one row each
+        stamps_ns (np.ndarray): Sorted timestamps on the hourly grid, epoch ns
+
+    Returns:
+        np.ndarray: (ticker x timestamp) log prices
+    """
+    hour = pd.Timedelta(hours=1)
+    day_ns = pd.Timedelta(days=1).value
+    origin_ns = GRID_ORIGIN.as_unit('ns').value
+    days = origin_ns + (stamps_ns - origin_ns) // day_ns * day_ns
+    hours = (stamps_ns - days) // hour.value
+
+    midnights = np.unique(np.concatenate((days, days + day_ns)))
+    levels = _daily_levels(tickers, midnights)
+    start = levels[:, np.searchsorted(midnights, days)]
+    end = levels[:, np.searchsorted(midnights, days + day_ns)]
+    prices = start + (end - start) * (hours / 24)
+
+    intraday = np.flatnonzero(hours)
+    if len(intraday):
+        bridged = np.unique(days[intraday])
+        hourly = (bridged[:, None] + np.arange(24) * hour.value).ravel()
+        steps = _bar_draws(tickers, pd.to_datetime(hourly), hour, ('step',))['step'].reshape(len(tickers), len(bridged), 24)
+        walk = np.concatenate((np.zeros(steps.shape[:2] + (1,)), steps.cumsum(axis=2)), axis=2)
+        bridge = walk - np.arange(25) / 24 * walk[..., -1:]
+        rows = np.searchsorted(bridged, days[intraday])
+        prices[:, intraday] += HOURLY_VOLATILITY * bridge[:, rows, hours[intraday]]
+    return prices
+
+
+def _synthetic_now():
+    """End of the hourly bar in progress: the latest moment synthetic prices reach."""
+    hour = pd.Timedelta(hours=1)
+    return GRID_ORIGIN + ((pd.Timestamp.now() - GRID_ORIGIN) // hour + 1) * hour
+
+
+def _synthesize_panel(tickers, date_range, bar, as_of=None):
+    """
+    Generate synthetic OHLCV series for many tickers in one vectorized pass.
+
+    A bar opens at the price at its timestamp and closes at the price at
+    its end, or at as_of for the bar in progress. Prices come from
+    _log_prices, so a bar is the same whichever window generates it, and
+    bars of any length agree at the moments they share.
+
+    Args:
+        tickers (list): Ticker symbols, one row of the panel each
+        date_range (pd.DatetimeIndex): Bar timestamps (on the hourly grid), one column each
+        bar (pd.Timedelta): Bar length, in whole hours
+        as_of (pd.Timestamp): Latest moment with a price (hourly grid); bars
+            reaching past it close at it
+        
+    Returns:
+        dict: Field name to array of shape (len(tickers), len(date_range))
+    """
+    stamps = pd.DatetimeIndex(date_range).as_unit('ns').asi8
+    if len(stamps) == 0:
+        return {name: np.empty((len(tickers), 0), dtype=np.int64 if name == 'Volume' else np.float64)
+                for name in OHLCV_FIELDS}
+    ends = stamps + bar.as_unit('ns').value
+    if as_of is not None:
+        ends = np.maximum(np.minimum(ends, as_of.as_unit('ns').value), stamps)
+
+    moments = np.unique(np.concatenate((stamps, ends)))
+    prices = np.exp(_log_prices(tickers, moments))
+    opens = prices[:, np.searchsorted(moments, stamps)]
+    closes = prices[:, np.searchsorted(moments, ends)]
+    return _bars_from_prices(opens, closes, _bar_draws(tickers, date_range, bar))
+
+
+def _bars_from_prices(opens, closes, draws):
+    """
+    Turn (ticker x date) arrays of opening and closing prices into OHLCV bars.
+
+    Returns:
+        dict: Field name to array with the same shape as the prices
+    """
+    # High and low reach up to BAR_SPREAD beyond the open and close
+    high = np.maximum(opens, closes) * (1 + BAR_SPREAD * draws['high'])
+    low = np.minimum(opens, closes) * (1 - BAR_SPREAD * draws['low'])
+
+    # Adj Close mirrors Close (no dividends or splits simulated)
+    return {
+        'Open': opens,
+        'High': high,
+        'Low': low,
+        'Close': closes,
+        'Volume': draws['volume'],
+        'Adj Close': closes,
+    }
+
+
+class MarketDataProvider:
+    """
+    Source of OHLCV bars and quotes.
+
+    Subclasses implement get_bars (and optionally get_quote); the panel,
+    batch-quote and async variants are built on top, so every backend
+    offers the same sync and async API. Bars are always returned on the
+    shared bar grid (see utils.resample.GRID_ORIGIN) with 'Date' as epoch
+    nanoseconds.
+    """
+
+    name = 'base'
+
+    # Whether the provider can fill in history older than a stored series
+    backfills = False
+
+    # Version of the data the provider makes; stored series of another
+    # version are dropped rather than extended (None: never changes)
+    store_version = None
+
+    @property
+    def store_namespace(self):
+        """Sub-directory of the OHLCV store holding this provider's series."""
+        return self.name
+
+    def get_bars(self, tickers, start, end, bar):
+        """
+        Get the bars of some tickers between two grid timestamps.
+
+        Args:
+            tickers (list): Stock ticker symbols
+            start (pd.Timestamp): First bar timestamp (on the bar grid)
+            end (pd.Timestamp): Last bar timestamp (on the bar grid)
+            bar (pd.Timedelta): Bar length
+
+        Returns:
+            dict: Ticker to columns ('Date' plus OHLCV fields); tickers with
+                no data may be missing. A bar still in progress is partial
+                and may be revised by a later call
+        """
+        raise NotImplementedError
+
+    def get_panel(self, tickers, start, end, bar):
+        """
+        Get the bars of some tickers as one (ticker x date) panel.
+
+        Series are aligned to the full grid between start and end (gaps are
+        filled with flat bars at the previous close).
+
+        Returns:
+            dict: 'Date' (epoch ns) plus one (ticker x date) array per field
+        """
+        grid = pd.date_range(start=start, end=end, freq=bar).as_unit('ns').asi8
+        bars = self.get_bars(tickers, start, end, bar)
+
+        panel = {name: np.empty((len(tickers), len(grid)),
+                                dtype=np.int64 if name == 'Volume' else np.float64)
+                 for name in OHLCV_FIELDS}
+        for i, ticker in enumerate(tickers):
+            aligned = align_to_grid(bars.get(ticker, _empty_columns()), grid)
+            for name in OHLCV_FIELDS:
+                panel[name][i] = aligned[name]
+        panel['Date'] = grid
+        return panel
+
+    def get_quote(self, ticker):
+        """
+        Get the latest quote of a ticker.
+
+        The default implementation derives it from the last two daily bars.
+
+        Args:
+            ticker (str): The stock ticker symbol
+
+        Returns:
+            dict: Quote data in the scrape_financial_data layout
+        """
+        day = pd.Timedelta(days=1)
+        end = GRID_ORIGIN + ((pd.Timestamp.now() - GRID_ORIGIN) // day) * day
+        bars = self.get_bars([ticker], end - 10 * day, end, day)
+        return _quote_from_bars(ticker, bars.get(ticker, _empty_columns()), self.name)
+
+    def get_quotes(self, tickers):
+        """Get the latest quote of several tickers."""
+        return [self.get_quote(ticker) for ticker in tickers]
+
+    async def aget_bars(self, tickers, start, end, bar):
+        """Async version of get_bars (runs in a worker thread)."""
+        return await asyncio.to_thread(self.get_bars, tickers, start, end, bar)
+
+    async def aget_panel(self, tickers, start, end, bar):
+        """Async version of get_panel (runs in a worker thread)."""
+        return await asyncio.to_thread(self.get_panel, tickers, start, end, bar)
+
+    async def aget_quote(self, ticker):
+        """Async version of get_quote (runs in a worker thread)."""
+        return await asyncio.to_thread(self.get_quote, ticker)
+
+    async def aget_quotes(self, tickers):
+        """Fetch the quotes of several tickers concurrently."""
+        return list(await asyncio.gather(*(self.aget_quote(ticker) for ticker in tickers)))
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic synthetic prices (the default backend).
+
+    A price depends only on the ticker and the moment (see _log_prices), so
+    every window, bar length and refresh path agrees; the bar in progress
+    closes at the end of the current hour.
+    """
+
+    name = 'synthetic'
+    backfills = True
+
+    # Bumped whenever the generator changes, so older stored series are dropped
+    store_version = 3
+
+    def get_bars(self, tickers, start, end, bar):
+        dates = pd.date_range(start=start, end=end, freq=bar)
+        panel = _synthesize_panel(list(tickers), dates, bar, _synthetic_now())
+        return self._rows(list(tickers), panel, dates.as_unit('ns').asi8)
+
+    def get_panel(self, tickers, start, end, bar):
+        dates = pd.date_range(start=start, end=end, freq=bar)
+        panel = _synthesize_panel(list(tickers), dates, bar, _synthetic_now())
+        panel['Date'] = dates.as_unit('ns').asi8
+        return panel
+
+    def get_quote(self, ticker):
+        # Quote off the stored daily series so it agrees with the charts
+        from utils.finance import get_stock_data
+        df = get_stock_data(ticker, '1mo')
+        columns = {name: df[name].to_numpy() for name in OHLCV_FIELDS}
+        columns['Date'] = df['Date'].to_numpy()
+        return _quote_from_bars(ticker, columns, self.name)
+
+    @staticmethod
+    def _rows(tickers, panel, grid):
+        """Split a panel into per-ticker columns (views, no copies)."""
+        rows = {}
+        for i, ticker in enumerate(tickers):
+            columns = {name: panel[name][i] for name in OHLCV_FIELDS}
+            columns['Date'] = grid
+            rows[ticker] = columns
+        return rows
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Replays recorded bars from CSV or Parquet files in a local directory.
+
+    Files are looked up as <dir>/<freq>/<TICKER>.parquet|.csv (e.g.
+    data/replay/1D/AAPL.csv) and then <dir>/<TICKER>.parquet|.csv. They need
+    a date column (Date, Datetime or Timestamp) and Open/High/Low/Close;
+    Volume and Adj Close are optional. Bars of any finer frequency are
+    aggregated onto the requested bar grid.
+
+    With align_to_now, the recording is slid forward by whole weeks so its
+    last bar falls in the current week, which keeps weekday and intraday
+    patterns intact and lets an old recording drive the live pages. Once a
+    recording is exhausted, its final week repeats.
+
+    Args:
+        directory (str): Folder holding the recordings
+        align_to_now (bool): Shift recordings so they end at the present
+    """
+
+    name = 'replay'
+
+    _DATE_COLUMNS = ('date', 'datetime', 'timestamp', 'time')
+
+    def __init__(self, directory=DEFAULT_REPLAY_DIR, align_to_now=True):
+        self.directory = directory
+        self.align_to_now = align_to_now
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _find(self, ticker, bar):
+        ticker = ticker.upper()
+        for folder in (os.path.join(self.directory, _bar_label(bar)), self.directory):
+            for extension in ('.parquet', '.csv'):
+                path = os.path.join(folder, f"{ticker}{extension}")
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def _read(self, path, bar):
+        """Load a recording onto the bar grid, cached until the file changes."""
+        key = (path, bar)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        lower = {c.lower().replace('_', ' '): c for c in df.columns}
+        date_column = next(lower[c] for c in self._DATE_COLUMNS if c in lower)
+        dates = pd.to_datetime(df[date_column], utc=True).dt.tz_convert(None)
+
+        columns = {'Date': dates.to_numpy(dtype='datetime64[ns]').view(np.int64)}
+        for name in OHLCV_FIELDS:
+            source = lower.get(name.lower())
+            if source is not None:
+                columns[name] = df[source].to_numpy(dtype=np.int64 if name == 'Volume' else np.float64)
+        columns.setdefault('Volume', np.zeros(len(df), dtype=np.int64))
+        columns.setdefault('Adj Close', columns['Close'])
+        columns = _snap_to_grid(columns, bar)
+
+        with self._lock:
+            self._cache[key] = (mtime, columns)
+        return columns
+
+    def get_bars(self, tickers, start, end, bar):
+        start_ns = pd.Timestamp(start).as_unit('ns').value
+        end_ns = pd.Timestamp(end).as_unit('ns').value
+        week_ns = pd.Timedelta(weeks=1).value
+        bars = {}
+
+        for ticker in tickers:
+            path = self._find(ticker, bar)
+            if path is None:
+                logger.warning(f"No replay recording for {ticker} in {self.directory}")
+                continue
+            try:
+                columns = self._read(path, bar)
+            except Exception as e:
+                logger.error(f"Error reading replay recording {path}: {str(e)}")
+                continue
+            if len(columns['Date']) == 0:
+                continue
+
+            shift = 0
+            if self.align_to_now:
+                shift = ((end_ns - int(columns['Date'][-1])) // week_ns) * week_ns
+
+            dates = columns['Date']
+            lo = int(np.searchsorted(dates, start_ns - shift, side='left'))
+            hi = int(np.searchsorted(dates, end_ns - shift, side='right'))
+            window = {name: values[lo:hi] for name, values in columns.items()}
+            window['Date'] = window['Date'] + shift
+            bars[ticker] = window
+        return bars
+
+
+class HTTPProvider(MarketDataProvider):
+    """
+    Fetches bars and quotes from Yahoo Finance over pooled HTTP sessions.
+
+    One requests.Session (with a sized connection pool and retries) is
+    shared by every call, and multi-ticker requests fan out over a thread
+    pool of the same size.
+
+    Args:
+        pool_size (int): Connections kept per host and concurrent requests
+        retries (int): Retries for failed connections
+        timeout (float): Per-request timeout in seconds
+    """
+
+    name = 'http'
+
+    CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+    QUOTE_URL = "https://finance.yahoo.com/quote/{ticker}"
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Referer': 'https://finance.yahoo.com/',
+        'DNT': '1'
+    }
+
+    def __init__(self, pool_size=10, retries=2, timeout=15):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(self.HEADERS)
+
+    def _fetch_chart(self, ticker, start, end, bar):
+        """Fetch one ticker's bars from the chart endpoint."""
+        interval = '1h' if bar < pd.Timedelta(days=1) else '1d'
+        params = {
+            'period1': int(pd.Timestamp(start).timestamp()),
+            'period2': int((pd.Timestamp(end) + bar).timestamp()),
+            'interval': interval,
+        }
+        response = self.session.get(self.CHART_URL.format(ticker=ticker), params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        result = response.json()['chart']['result'][0]
+        quote = result['indicators']['quote'][0]
+        timestamps = np.asarray(result.get('timestamp', []), dtype=np.int64) * 1_000_000_000
+
+        columns = {'Date': timestamps}
+        for name in ('Open', 'High', 'Low', 'Close'):
+            columns[name] = np.asarray(quote[name.lower()], dtype=np.float64)
+        columns['Volume'] = np.nan_to_num(np.asarray(quote['volume'], dtype=np.float64)).astype(np.int64)
+        adjclose = result['indicators'].get('adjclose')
+        columns['Adj Close'] = (np.asarray(adjclose[0]['adjclose'], dtype=np.float64)
+                                if adjclose else columns['Close'])
+
+        keep = ~np.isnan(columns['Close'])
+        columns = {name: values[keep] for name, values in columns.items()}
+        return _snap_to_grid(columns, bar)
+
+    def get_bars(self, tickers, start, end, bar):
+        def fetch(ticker):
+            try:
+                return ticker, self._fetch_chart(ticker, start, end, bar)
+            except Exception as e:
+                logger.error(f"Error fetching bars for {ticker}: {str(e)}")
+                return ticker, None
+
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            results = pool.map(fetch, tickers)
+        return {ticker: columns for ticker, columns in results if columns is not None}
+
+    def get_quote(self, ticker):
+        url = self.QUOTE_URL.format(ticker=ticker)
+        logger.info(f"Scraping financial data for {ticker} from {url}")
+
+        # Send a request to the website
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+
+        # Parse the HTML content
+        soup = BeautifulSoup(response.text, 'html.parser')
+
+        # Extract price data
+        price_element = soup.find('fin-streamer', {'data-field': 'regularMarketPrice'})
+        price = price_element.text if price_element else "N/A"
+
+        # Try to get price change and percentage
+        change_element = soup.find('fin-streamer', {'data-field': 'regularMarketChange'})
+        change = change_element.text if change_element else "N/A"
+
+        change_percent_element = soup.find('fin-streamer', {'data-field': 'regularMarketChangePercent'})
+        change_percent = change_percent_element.text if change_percent_element else "N/A"
+
+        # Extract additional data
+        data = {
+            'ticker': ticker,
+            'price': price,
+            'change': change,
+            'change_percent': change_percent,
+            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        # Additional data elements to try to extract
+        data_elements = {
+            'Previous Close': 'PREV_CLOSE-value',
+            'Open': 'OPEN-value',
+            'Day Range': 'DAYS_RANGE-value',
+            'Volume': 'TD_VOLUME-value',
+            'Market Cap': 'MARKET_CAP-value',
+            '52 Week Range': 'FIFTY_TWO_WK_RANGE-value',
+            'Avg Volume': 'AVERAGE_VOLUME_3MONTH-value',
+            'PE Ratio': 'PE_RATIO-value',
+            'EPS': 'EPS_RATIO-value',
+            'Dividend': 'DIVIDEND_AND_YIELD-value'
+        }
+
+        for key, value_id in data_elements.items():
+            element = soup.find('td', {'data-test': value_id})
+            data[key] = element.text if element else "N/A"
+
+        # Try to extract company name
+        try:
+            company_name_element = soup.find('h1', {'class': 'D(ib)'})
+            if company_name_element:
+                full_text = company_name_element.text
+                data['company_name'] = full_text.split('(')[0].strip()
+        except Exception:
+            data['company_name'] = ticker
+
+        return data
+
+
+PROVIDERS = {
+    'synthetic': SyntheticProvider,
+    'replay': ReplayProvider,
+    'http': HTTPProvider,
+}
+
+# Backend used for each role unless set_provider overrides it
+_roles = {
+    'bars': os.environ.get('TRAID_MARKET_DATA', 'synthetic'),
+    'quotes': os.environ.get('TRAID_QUOTE_DATA', 'http'),
+}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_provider(role='bars'):
+    """
+    Get the market-data provider configured for a role.
+
+    The 'bars' role feeds get_stock_data (TRAID_MARKET_DATA, default
+    'synthetic') and the 'quotes' role feeds scrape_financial_data
+    (TRAID_QUOTE_DATA, default 'http').
+
+    Args:
+        role (str): 'bars' or 'quotes'
+
+    Returns:
+        MarketDataProvider: Shared provider instance
+    """
+    choice = _roles[role]
+    if isinstance(choice, MarketDataProvider):
+        return choice
+    with _instances_lock:
+        if choice not in _instances:
+            _instances[choice] = PROVIDERS[choice]()
+        return _instances[choice]
+
+
+def set_provider(provider, role='bars'):
+    """
+    Switch the provider used for a role.
+
+    Args:
+        provider (str or MarketDataProvider): Registered name or instance
+        role (str): 'bars' or 'quotes'
+    """
+    if isinstance(provider, str) and provider not in PROVIDERS:
+        raise ValueError(f"Unknown market-data provider: {provider}")
+    _roles[role] = provider
@@ -0,0 +1,187 @@
+import threading
+import logging
+
+import numpy as np
+
+from utils.funds import get_fund_universe, rank_top
+from utils.optimizer import RISK_LEVELS
+from utils.paging import PageCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Metrics a fund is compared on
+FEATURES = ['one_year_return', 'three_year_return', 'five_year_return', 'volatility', 'sharpe_ratio',
+            'expense_ratio', 'risk_score']
+
+# Quantile of each metric a risk level aims at: level 1 takes the lowest
+# returns, volatility and risk score, level RISK_LEVELS the highest; every
+# level prefers a good Sharpe ratio and a low expense ratio
+_FIXED_QUANTILES = {'sharpe_ratio': 0.75, 'expense_ratio': 0.25}
+
+# Funds scored per matrix product; bounds the memory of a many-query batch
+BLOCK_ROWS = 65536
+
+DEFAULT_RECOMMENDATIONS = 3
+
+# Recommendation lists cached per (profile, k)
+MAX_CACHED_PROFILES = 1024
+
+
+class FundRecommender:
+    """
+    k nearest funds in a standardized metric space.
+
+    Every fund becomes a vector of FEATURES, each scaled to zero mean and
+    unit variance over the universe, so no metric dominates by its units.
+    The matrix and the squared norms of its rows are computed once; a query
+    is then a blocked matrix product (|x|^2 - 2 x.q + |q|^2 for a block of
+    funds at a time) and a partial selection of the k smallest distances.
+    With a handful of dimensions this beats a tree search at any universe
+    size that fits in memory, and needs no extra dependency.
+
+    Args:
+        columns (dict): Field to array, with every FEATURES field
+        features (list): Metrics to compare on
+    """
+
+    def __init__(self, columns, features=FEATURES):
+        self.features = list(features)
+        raw = np.column_stack([np.asarray(columns[field], dtype=np.float64) for field in self.features])
+        self.mean = raw.mean(axis=0)
+        self.scale = raw.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        self.vectors = np.ascontiguousarray((raw - self.mean) / self.scale)
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        self.size = len(self.vectors)
+
+        # Sorted metrics, for the targets of risk levels
+        self._sorted = np.sort(raw, axis=0)
+
+    def normalize(self, values):
+        """Map raw metric rows (or one row) into the index space."""
+        return (np.asarray(values, dtype=np.float64) - self.mean) / self.scale
+
+    def risk_target(self, level):
+        """
+        Normalized point a risk level aims at.
+
+        Args:
+            level (int): Risk level, 1 (lowest) to RISK_LEVELS
+
+        Returns:
+            np.ndarray: Target vector
+        """
+        share = (min(max(int(level), 1), RISK_LEVELS) - 1) / (RISK_LEVELS - 1)
+        quantiles = np.array([_FIXED_QUANTILES.get(field, share) for field in self.features])
+        position = np.round(quantiles * (self.size - 1)).astype(np.int64)
+        return self.normalize(self._sorted[position, np.arange(len(self.features))])
+
+    def nearest(self, points, k=DEFAULT_RECOMMENDATIONS, exclude=None):
+        """
+        The k funds closest to each query point.
+
+        Args:
+            points (array): Normalized query vectors, shape (m, d) or (d,)
+            k (int): Neighbours per point
+            exclude (array): Row numbers never returned (e.g. holdings)
+
+        Returns:
+            tuple: (rows, distances), each of shape (m, k') with k' =
+                min(k, available funds), closest first; ties by row number
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        excluded = np.zeros(self.size, dtype=bool)
+        if exclude is not None and len(exclude):
+            excluded[np.asarray(exclude, dtype=np.int64)] = True
+        k = max(0, min(int(k), self.size - int(excluded.sum())))
+        best_rows = np.empty((len(points), 0), dtype=np.int64)
+        best_distances = np.empty((len(points), 0))
+        if k == 0:
+            return best_rows, best_distances
+
+        point_norms = np.einsum('ij,ij->i', points, points)
+        for start in range(0, self.size, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, self.size)
+            distances = self.norms[start:stop] - 2 * points @ self.vectors[start:stop].T + point_norms[:, None]
+            distances[:, excluded[start:stop]] = np.inf
+
+            # Keep the k best of this block next to the k best so far
+            rows = np.concatenate((best_rows, np.broadcast_to(np.arange(start, stop), distances.shape)), axis=1)
+            distances = np.concatenate((best_distances, distances), axis=1)
+            keep = np.array([rank_top(d, r, k) for d, r in zip(distances, rows)]).reshape(len(points), k)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+            best_distances = np.take_along_axis(distances, keep, axis=1)
+
+        return best_rows, np.sqrt(np.maximum(best_distances, 0))
+
+
+_recommender = None
+_indexed_universe = None
+_recommender_lock = threading.Lock()
+
+_recommendation_cache = PageCache(MAX_CACHED_PROFILES)
+
+
+def get_fund_recommender():
+    """
+    Get the recommender of the current fund universe, built once per universe.
+
+    Returns:
+        FundRecommender: Index over FEATURES
+    """
+    global _recommender, _indexed_universe
+    universe = get_fund_universe()
+    with _recommender_lock:
+        if _indexed_universe is not universe:
+            _recommender = FundRecommender(universe.columns)
+            _indexed_universe = universe
+        return _recommender
+
+
+def _recommend(universe, holdings, risk_level, k):
+    """Rows and distances of the recommendations for one profile."""
+    recommender = get_fund_recommender()
+    held = np.flatnonzero(np.isin(universe.columns['ticker'], list(holdings))) if holdings else np.empty(0, np.int64)
+
+    # The profile is the centre of the held funds, or the risk level's target
+    if len(held):
+        target = recommender.vectors[held].mean(axis=0)
+        if risk_level is not None:
+            target = (target + recommender.risk_target(risk_level)) / 2
+    else:
+        target = recommender.risk_target(risk_level or (RISK_LEVELS + 1) // 2)
+
+    rows, distances = recommender.nearest(target, k, exclude=held)
+    return rows[0], distances[0]
+
+
+def recommend_funds(holdings=None, risk_level=None, k=DEFAULT_RECOMMENDATIONS):
+    """
+    Funds most similar to a user's holdings or risk profile.
+
+    Args:
+        holdings (list): Tickers of funds the user holds; their average
+            metrics are the profile and they are never recommended
+        risk_level (int): Risk level 1-7; used alone when there are no
+            holdings, otherwise blended half and half with them (the middle
+            level if neither is given)
+        k (int): Number of funds
+
+    Returns:
+        list: Fund dicts, most similar first, each with a 'distance' in
+            standard deviations
+    """
+    try:
+        universe = get_fund_universe()
+        holdings = tuple(sorted({ticker.upper() for ticker in holdings or []}))
+        key = (holdings, risk_level, int(k))
+        rows, distances = _recommendation_cache.get(key, universe, lambda: _recommend(universe, holdings, risk_level, k))
+        funds = universe.records(rows)
+        for fund, distance in zip(funds, distances):
+            fund['distance'] = round(float(distance), 3)
+        return funds
+    except Exception as e:
+        logger.error(f"Error in recommend_funds: {str(e)}")
+        return []
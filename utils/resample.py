@@ -0,0 +1,186 @@
+import threading
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Maximum number of derived views kept in memory
+MAX_CACHED_VIEWS = 2048
+
+# Every bar grid is anchored here (a Sunday, so weekly bars land on Sundays)
+GRID_ORIGIN = pd.Timestamp("1970-01-04")
+
+
+def resample_ohlcv(columns, bar, origin):
+    """
+    Aggregate OHLCV bars into coarser bars.
+
+    Bars are grouped into buckets of length `bar` counted from `origin`, then
+    each bucket takes the first open, max high, min low, last close and
+    summed volume. All fields are reduced with np.*.reduceat, so the work is
+    a handful of whole-array operations regardless of how many rows (e.g.
+    tickers) the fields hold.
+
+    Args:
+        columns (dict): 'Date' (epoch ns, 1-D) plus OHLCV fields whose last
+            axis runs along Date
+        bar (pd.Timedelta): Length of the output bars
+        origin (pd.Timestamp): Timestamp the output bar grid is anchored to
+
+    Returns:
+        dict: Resampled columns; 'Date' holds the bucket start (epoch ns)
+    """
+    dates = np.asarray(columns['Date'])
+    if len(dates) == 0:
+        return {name: np.asarray(values)[..., :0] for name, values in columns.items()}
+
+    origin_ns = pd.Timestamp(origin).as_unit('ns').value
+    bar_ns = pd.Timedelta(bar).as_unit('ns').value
+
+    bucket = (dates - origin_ns) // bar_ns
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(dates)] - 1
+
+    result = {'Date': origin_ns + bucket[starts] * bar_ns}
+    for name, values in columns.items():
+        if name == 'Date':
+            continue
+        values = np.asarray(values)
+        if name == 'Open':
+            result[name] = values[..., starts]
+        elif name == 'High':
+            result[name] = np.maximum.reduceat(values, starts, axis=-1)
+        elif name == 'Low':
+            result[name] = np.minimum.reduceat(values, starts, axis=-1)
+        elif name == 'Volume':
+            result[name] = np.add.reduceat(values, starts, axis=-1)
+        else:  # Close, Adj Close
+            result[name] = values[..., ends]
+    return result
+
+
+def align_to_grid(columns, grid):
+    """
+    Reindex OHLCV bars onto a bar grid.
+
+    Grid slots with no bar of their own (e.g. weekends in recorded trading
+    data) get a flat bar at the previous close with zero volume; slots
+    before the first bar are NaN. Like resample_ohlcv, this works on fields
+    with any number of leading rows.
+
+    Args:
+        columns (dict): 'Date' (epoch ns, 1-D, sorted) plus OHLCV fields
+        grid (np.ndarray): Target timestamps (epoch ns, sorted)
+
+    Returns:
+        dict: Columns with 'Date' equal to grid
+    """
+    dates = np.asarray(columns['Date'])
+    grid = np.asarray(grid)
+    if len(dates) == len(grid) and np.array_equal(dates, grid):
+        return dict(columns)
+
+    result = {'Date': grid}
+    if not len(dates):
+        for name, values in columns.items():
+            if name != 'Date':
+                shape = np.shape(values)[:-1] + grid.shape
+                result[name] = np.zeros(shape, dtype=np.int64) if name == 'Volume' else np.full(shape, np.nan)
+        return result
+
+    pos = np.searchsorted(dates, grid, side='right') - 1
+    valid = pos >= 0
+    pos = np.maximum(pos, 0)
+    exact = valid & (dates[pos] == grid)
+
+    previous_close = np.asarray(columns['Close'])[..., pos]
+    for name, values in columns.items():
+        if name == 'Date':
+            continue
+        taken = np.asarray(values)[..., pos]
+        if name == 'Volume':
+            result[name] = np.where(exact, taken, 0)
+            continue
+        if name in ('Open', 'High', 'Low'):
+            taken = np.where(exact, taken, previous_close)
+        result[name] = np.where(valid, taken, np.nan)
+    return result
+
+
+class ResampleCache:
+    """
+    Cache of resampled views derived from base series.
+
+    Each entry remembers the version (length, last timestamp and last close)
+    of the base series it was built from, so a view is only rebuilt after
+    the base series has gained new bars or its last bar was revised.
+
+    Args:
+        max_views (int): Maximum number of views kept (least recently used
+            views are dropped first)
+    """
+
+    def __init__(self, max_views=MAX_CACHED_VIEWS):
+        self.max_views = max_views
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, base, bar, origin):
+        """
+        Get the resampled view of a base series, rebuilding it if stale.
+
+        Args:
+            key (tuple): Cache key, e.g. (ticker, base_freq, freq)
+            base (dict): Base series columns ('Date' as epoch ns)
+            bar (pd.Timedelta): Length of the derived bars
+            origin (pd.Timestamp): Timestamp the derived grid is anchored to
+
+        Returns:
+            dict: Resampled columns
+        """
+        dates = base['Date']
+        version = (len(dates), int(dates[-1]), float(base['Close'][-1])) if len(dates) else (0, None, None)
+
+        with self._lock:
+            cached = self._views.get(key)
+            if cached is not None and cached[0] == version:
+                self._views.move_to_end(key)
+                return cached[1]
+
+        view = resample_ohlcv(base, bar, origin)
+        for values in view.values():
+            values.flags.writeable = False
+
+        with self._lock:
+            self._views[key] = (version, view)
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return view
+
+    def invalidate(self, ticker=None):
+        """Drop cached views, for one ticker or all of them."""
+        with self._lock:
+            if ticker is None:
+                self._views.clear()
+                return
+            for key in [k for k in self._views if k[0] == ticker]:
+                del self._views[key]
+
+
+_default_cache = ResampleCache()
+
+
+def get_resample_cache():
+    """
+    Get the process-wide cache of resampled views.
+
+    Returns:
+        ResampleCache: Shared cache instance
+    """
+    return _default_cache
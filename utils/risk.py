@@ -0,0 +1,579 @@
+import logging
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+DEFAULT_WINDOW = 63  # about three months of daily bars
+DEFAULT_CONFIDENCE = 0.95
+
+# (series x date) figures risk_report can add, in report order
+ROLLING_FIGURES = ('rolling_volatility', 'rolling_sharpe', 'rolling_sortino', 'drawdown', 'rolling_beta')
+
+# Values (rows x dates) handled together by risk_report
+REPORT_BLOCK_VALUES = 1 << 15
+
+
+def _as_2d(values):
+    """View a series or panel as a float (series x date) array."""
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def returns_from_prices(prices):
+    """
+    Simple returns along the date axis.
+
+    Args:
+        prices (array): Prices, (date,) or (series x date)
+
+    Returns:
+        np.ndarray: (series x date-1) returns; NaN where a price is missing
+    """
+    prices = _as_2d(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return prices[:, 1:] / prices[:, :-1] - 1
+
+
+def _rolling_from_cumsum(csum, window):
+    """Rolling sums along the date axis from a cumulative sum (NaN until full)."""
+    out = np.empty_like(csum)
+    out[:, :window - 1] = np.nan
+    if csum.shape[1] >= window:
+        out[:, window - 1] = csum[:, window - 1]
+        np.subtract(csum[:, window:], csum[:, :-window], out=out[:, window:])
+    return out
+
+
+def _rolling_sum(values, window):
+    """Rolling sum along the date axis from one cumulative sum (NaN until full)."""
+    return _rolling_from_cumsum(np.cumsum(values, axis=1, dtype=np.float64), window)
+
+
+def _cumulative_sums(values, window=None):
+    """
+    Sums along the date axis over the whole history and, with a window,
+    rolling sums too, both from the same pass.
+
+    Returns:
+        tuple: (sums, rolling_sums); rolling_sums is None without a window
+    """
+    if window is None:
+        return values.sum(axis=1, dtype=np.float64), None
+    csum = np.cumsum(values, axis=1, dtype=np.float64)
+    sums = csum[:, -1].copy() if csum.shape[1] else np.zeros(len(csum))
+    return sums, _rolling_from_cumsum(csum, window)
+
+
+def _window_sums(values, window=None):
+    """
+    Sums of the valid (non-NaN) values and their count per window.
+
+    With a window, rolling sums come from differences of one cumulative
+    sum; without one, the whole history is a single window. When nothing
+    is missing the count is a plain number, which saves a pass.
+
+    Returns:
+        tuple: (sums, counts); sums are (series,) or (series x date) and
+            counts broadcast against them
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        if window is None:
+            return values.sum(axis=1), float(values.shape[1])
+        return _rolling_sum(values, window), float(window)
+
+    filled = np.where(missing, 0.0, values)
+    if window is None:
+        return filled.sum(axis=1), (~missing).sum(axis=1)
+    return _rolling_sum(filled, window), _rolling_sum(~missing, window)
+
+
+def _mean_std(returns, window=None):
+    """Mean and sample standard deviation of returns, NaN-aware."""
+    sums, counts = _window_sums(returns, window)
+    squares, _ = _window_sums(returns * returns, window)
+    return _moments(sums, squares, counts)
+
+
+def _moments(sums, squares, counts):
+    """Mean and sample standard deviation from sums of values and of their squares."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums / counts
+        variance = np.maximum(squares - sums * mean, 0.0) / (counts - 1)
+    return mean, np.sqrt(variance)
+
+
+def _downside_deviation(returns, target, window=None):
+    """Root mean square of the returns below target, NaN-aware."""
+    shortfall = np.minimum(returns - target, 0.0)
+    squares, counts = _window_sums(shortfall * shortfall, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(squares / counts)
+
+
+def _annualized_ratio(mean, deviation, periods_per_year, out=None):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.divide(mean, deviation, out=out)
+        ratio *= np.sqrt(periods_per_year)
+        np.copyto(ratio, np.nan, where=~(deviation > 0))
+    return ratio
+
+
+def volatility(returns, window=None, periods_per_year=TRADING_DAYS):
+    """
+    Annualized volatility.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        window (int): Rolling window in bars (None for the whole history)
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        np.ndarray: (series,) or, with a window, (series x date)
+    """
+    _, std = _mean_std(_as_2d(returns), window)
+    return std * np.sqrt(periods_per_year)
+
+
+def sharpe_ratio(returns, window=None, risk_free=0.0, periods_per_year=TRADING_DAYS):
+    """
+    Annualized Sharpe ratio.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        window (int): Rolling window in bars (None for the whole history)
+        risk_free (float): Annual risk-free rate
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        np.ndarray: (series,) or, with a window, (series x date)
+    """
+    mean, std = _mean_std(_as_2d(returns), window)
+    return _annualized_ratio(mean - risk_free / periods_per_year, std, periods_per_year)
+
+
+def sortino_ratio(returns, window=None, target=0.0, periods_per_year=TRADING_DAYS):
+    """
+    Annualized Sortino ratio (mean excess return over downside deviation).
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        window (int): Rolling window in bars (None for the whole history)
+        target (float): Minimum acceptable return per bar
+        periods_per_year (int): Bars per year, for annualizing
+
+    Returns:
+        np.ndarray: (series,) or, with a window, (series x date)
+    """
+    returns = _as_2d(returns)
+    sums, counts = _window_sums(returns, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums / counts
+    return _annualized_ratio(mean - target, _downside_deviation(returns, target, window), periods_per_year)
+
+
+def _drawdown(values, out=None):
+    """Wealth (growth of 1) and drawdown below its running peak, of returns without NaN."""
+    wealth = values + 1.0
+    np.cumprod(wealth, axis=1, out=wealth)
+    peak = np.maximum.accumulate(wealth, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.divide(wealth, peak, out=peak if out is None else out)
+    drawdown -= 1.0
+    return wealth, drawdown
+
+
+def drawdowns(returns):
+    """
+    Drawdown of every series at every date.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date); NaN counts as 0
+
+    Returns:
+        dict: 'drawdown' (fraction below the running peak, <= 0), 'wealth'
+            (growth of 1) and 'last_peak' (index of the running peak), all
+            (series x date)
+    """
+    wealth, drawdown = _drawdown(np.nan_to_num(_as_2d(returns)))
+    steps = np.arange(wealth.shape[1], dtype=np.int32)
+    last_peak = np.maximum.accumulate(np.where(drawdown >= 0, steps, 0), axis=1)
+    return {'drawdown': drawdown, 'wealth': wealth, 'last_peak': last_peak}
+
+
+def _drawdown_stats(drawdown):
+    """
+    max_drawdown figures of a (series x date) drawdown array.
+
+    Bars at a peak are found in one pass over the flattened array; the
+    underwater runs are the gaps between them, so no running index of the
+    last peak is needed.
+    """
+    n_series, length = drawdown.shape
+    rows = np.arange(n_series)
+    if length == 0:
+        empty = np.zeros(n_series, dtype=np.int64)
+        return {'max_drawdown': np.zeros(n_series), 'peak': empty, 'trough': empty,
+                'duration': empty, 'longest_underwater': empty}
+
+    # One extra "peak" column past the end closes the last underwater run;
+    # every row starts at a peak, so no gap spans two rows
+    width = length + 1
+    at_peak = np.ones((n_series, width), dtype=bool)
+    np.greater_equal(drawdown, 0, out=at_peak[:, :length])
+    peaks = np.flatnonzero(at_peak)
+    gaps = np.diff(peaks)
+    row_starts = np.searchsorted(peaks, rows * width)
+
+    trough = np.argmin(drawdown, axis=1)
+    peak = peaks[np.searchsorted(peaks, rows * width + trough, side='right') - 1] - rows * width
+    if len(gaps):
+        longest = np.maximum.reduceat(gaps, np.minimum(row_starts, len(gaps) - 1)) - 1
+        # Rows with a single peak (the closing column) own no gap of their own
+        longest[np.diff(np.r_[row_starts, len(peaks)]) < 2] = 0
+    else:
+        longest = np.zeros(n_series, dtype=np.int64)
+    return {
+        'max_drawdown': drawdown[rows, trough],
+        'peak': peak,
+        'trough': trough,
+        'duration': trough - peak,
+        'longest_underwater': longest.astype(np.int64),
+    }
+
+
+def max_drawdown(returns, drawdown_data=None):
+    """
+    Maximum drawdown and how long it lasted.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        drawdown_data (dict): drawdowns(returns), if already computed
+
+    Returns:
+        dict: Per series: 'max_drawdown' (fraction, <= 0), 'peak' and
+            'trough' (bar indices of the worst drawdown), 'duration' (bars
+            from that peak to its trough) and 'longest_underwater' (longest
+            run of bars below a previous peak)
+    """
+    if drawdown_data is not None:
+        return _drawdown_stats(drawdown_data['drawdown'])
+    return _drawdown_stats(_drawdown(np.nan_to_num(_as_2d(returns)))[1])
+
+
+def beta(returns, benchmark, window=None):
+    """
+    Beta of every series against one benchmark.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        benchmark (array): Benchmark returns over the same dates, (date,)
+        window (int): Rolling window in bars (None for the whole history)
+
+    Returns:
+        np.ndarray: (series,) or, with a window, (series x date)
+    """
+    r = _as_2d(returns)
+    b = _as_2d(benchmark)
+
+    # Only dates where both the series and the benchmark have a return; with
+    # nothing missing the benchmark sums are taken once and broadcast
+    missing = np.isnan(r) | np.isnan(b)
+    if missing.any():
+        r = np.where(missing, np.nan, r)
+        b = np.where(missing, np.nan, b)
+    sum_r, counts = _window_sums(r, window)
+    sum_b, _ = _window_sums(b, window)
+    sum_rb, _ = _window_sums(r * b, window)
+    sum_bb, _ = _window_sums(b * b, window)
+    return _beta_from_sums(sum_r, sum_b, sum_rb, sum_bb, counts)
+
+
+def _beta_from_sums(sum_r, sum_b, sum_rb, sum_bb, counts, out=None):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_rb - sum_r * sum_b / counts
+        variance = sum_bb - sum_b * sum_b / counts
+        ratio = np.divide(covariance, variance, out=out)
+        np.copyto(ratio, np.nan, where=~(variance > 0))
+    return ratio
+
+
+def value_at_risk(returns, confidence=DEFAULT_CONFIDENCE, method='historical'):
+    """
+    One-bar value at risk and conditional value at risk (expected shortfall).
+
+    Historical figures come from np.partition (no full sort): VaR is the
+    loss at the (1 - confidence) quantile and CVaR the mean loss at or
+    beyond it. Parametric figures assume normal returns.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        confidence (float): Confidence level, e.g. 0.95
+        method (str): 'historical' or 'parametric'
+
+    Returns:
+        dict: 'var' and 'cvar' per series, as positive loss fractions
+    """
+    returns = _as_2d(returns)
+    tail = 1.0 - confidence
+
+    if method == 'parametric':
+        return _parametric_var(*_mean_std(returns), confidence)
+
+    if returns.shape[1] == 0:
+        return {'var': np.full(len(returns), np.nan), 'cvar': np.full(len(returns), np.nan)}
+
+    # Missing returns sort last so they never reach the tail
+    missing = np.isnan(returns)
+    if missing.any():
+        counts = (~missing).sum(axis=1)
+        returns = np.where(missing, np.inf, returns)
+    else:
+        counts = np.full(len(returns), returns.shape[1])
+
+    # Series share one quantile rank when they have the same length
+    k = np.maximum(np.floor(tail * (counts - 1)).astype(np.int64), 0)
+    ordered = np.partition(returns, np.unique(k), axis=1)
+    rows = np.arange(len(returns))
+    var = -ordered[rows, k]
+
+    # Everything left of the k-th value is no larger than it
+    head = ordered[:, :k.max() + 1]
+    tail_sum = np.where(np.arange(head.shape[1]) <= k[:, None], head, 0.0).sum(axis=1)
+    cvar = -tail_sum / (k + 1)
+    var[counts == 0] = np.nan
+    cvar[counts == 0] = np.nan
+    return {'var': var, 'cvar': cvar}
+
+
+def _parametric_var(mean, std, confidence):
+    """Normal VaR and CVaR from the mean and standard deviation of returns."""
+    tail = 1.0 - confidence
+    z = NormalDist().inv_cdf(tail)
+    return {'var': -(mean + z * std), 'cvar': std * NormalDist().pdf(z) / tail - mean}
+
+
+def _rolling_names(rolling, has_benchmark):
+    """Names of the rolling figures risk_report was asked for."""
+    if rolling is True:
+        names = ROLLING_FIGURES
+    else:
+        names = tuple(rolling or ())
+        unknown = set(names) - set(ROLLING_FIGURES)
+        if unknown:
+            raise ValueError(f"Unknown rolling figures: {', '.join(sorted(unknown))}")
+    return [name for name in ROLLING_FIGURES if name in names and (has_benchmark or name != 'rolling_beta')]
+
+
+def risk_report(returns, benchmark=None, window=DEFAULT_WINDOW, confidence=DEFAULT_CONFIDENCE,
+                risk_free=0.0, periods_per_year=TRADING_DAYS, rolling=True, out=None):
+    """
+    Compute the whole risk suite for many series at once.
+
+    Args:
+        returns (array): Returns, (date,) or (series x date)
+        benchmark (array): Optional benchmark returns over the same dates
+        window (int): Rolling window in bars for the rolling figures
+        confidence (float): VaR/CVaR confidence level
+        risk_free (float): Annual risk-free rate for the Sharpe ratio
+        periods_per_year (int): Bars per year, for annualizing
+        rolling (bool or list): (series x date) figures to return too: True
+            for all of ROLLING_FIGURES, False for none, or a list of their
+            names. All but 'drawdown' need rolling sums: one of them
+            costs most of the full-window suite again and all of them
+            about twice it, so ask only for those you use
+        out (dict): Preallocated (series x date) arrays, by name, that the
+            rolling figures are written into, e.g. float32 buffers reused
+            across calls; figures missing from it get new float64 arrays
+
+    Returns:
+        dict: Full-window figures per series ('volatility', 'sharpe',
+            'sortino', 'max_drawdown', 'drawdown_duration',
+            'longest_underwater', 'var', 'cvar', 'parametric_var',
+            'parametric_cvar' and, with a benchmark, 'beta') plus the
+            requested rolling figures ('rolling_beta' only with a benchmark)
+    """
+    returns = _as_2d(returns)
+    if benchmark is not None:
+        benchmark = _as_2d(benchmark)
+    names = _rolling_names(rolling, benchmark is not None)
+
+    # Rolling figures are written straight into the report, block by block
+    out = out or {}
+    report = {name: out[name] if name in out else np.empty(returns.shape) for name in names}
+
+    # Work through blocks of rows so each block's intermediates stay in cache
+    block_rows = max(1, REPORT_BLOCK_VALUES // max(returns.shape[1], 1))
+    for start in range(0, len(returns), block_rows):
+        rows = slice(start, start + block_rows)
+        block = returns[rows]
+        block_benchmark = None
+        if benchmark is not None:
+            block_benchmark = benchmark if len(benchmark) == 1 else benchmark[rows]
+        block_out = {name: report[name][rows] for name in names}
+        figures = _report_block(block, block_benchmark, window, confidence, risk_free, periods_per_year, block_out)
+        for name, values in figures.items():
+            if name not in report:
+                report[name] = np.empty(len(returns), dtype=values.dtype)
+            report[name][rows] = values
+    return report
+
+
+def _report_block(block, benchmark, window, confidence, risk_free, periods_per_year, out):
+    """
+    risk_report figures of one block of rows.
+
+    Every sum the figures need (returns, squares, downside squares and
+    products with the benchmark) is taken once, and its full-window and
+    rolling values both come from the same cumulative sum. Rolling sums
+    are only taken for the rolling figures in `out`, which are written
+    there; the full-window figures are returned.
+    """
+    rolled = out.keys()
+    sum_window = window if rolled - {'drawdown'} else None
+    square_window = window if rolled & {'rolling_volatility', 'rolling_sharpe'} else None
+    downside_window = window if 'rolling_sortino' in rolled else None
+
+    missing = np.isnan(block)
+    if missing.any():
+        values = np.where(missing, 0.0, block)
+        counts, rolling_counts = _cumulative_sums(~missing, sum_window)
+    else:
+        missing = None
+        values = block
+        counts, rolling_counts = float(block.shape[1]), sum_window and float(window)
+
+    sums, rolling_sums = _cumulative_sums(values, sum_window)
+    squares, rolling_squares = _cumulative_sums(values * values, square_window)
+    shortfall = np.minimum(values, 0.0)
+    downside, rolling_downside = _cumulative_sums(shortfall * shortfall, downside_window)
+
+    excess = risk_free / periods_per_year
+    mean, std = _moments(sums, squares, counts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        downside_deviation = np.sqrt(downside / counts)
+    # The drawdown statistics need float64 drawdowns, whatever buffer the figure goes to
+    drawdown_out = out.get('drawdown')
+    _, drawdown = _drawdown(values, drawdown_out if drawdown_out is not None and drawdown_out.dtype == np.float64
+                            else None)
+    if drawdown_out is not None and drawdown_out is not drawdown:
+        np.copyto(drawdown_out, drawdown)
+    stats = _drawdown_stats(drawdown)
+    historical = value_at_risk(block, confidence)
+    parametric = _parametric_var(mean, std, confidence)
+    figures = {
+        'volatility': std * np.sqrt(periods_per_year),
+        'sharpe': _annualized_ratio(mean - excess, std, periods_per_year),
+        'sortino': _annualized_ratio(mean, downside_deviation, periods_per_year),
+        'max_drawdown': stats['max_drawdown'],
+        'drawdown_duration': stats['duration'],
+        'longest_underwater': stats['longest_underwater'],
+        'var': historical['var'],
+        'cvar': historical['cvar'],
+        'parametric_var': parametric['var'],
+        'parametric_cvar': parametric['cvar'],
+    }
+    if square_window or downside_window:
+        _rolling_ratios(rolling_sums, rolling_squares, rolling_downside, rolling_counts, excess,
+                        periods_per_year, out)
+
+    if benchmark is not None:
+        if np.isnan(benchmark).any():
+            # Dates the benchmark misses drop out of the series sums too
+            figures['beta'] = beta(block, benchmark)
+            if 'rolling_beta' in out:
+                out['rolling_beta'][...] = beta(block, benchmark, window)
+            return figures
+
+        # The series sums above already cover exactly the dates both have
+        beta_window = window if 'rolling_beta' in out else None
+        paired = benchmark if missing is None else np.where(missing, 0.0, benchmark)
+        sum_b, rolling_b = _cumulative_sums(paired, beta_window)
+        sum_bb, rolling_bb = _cumulative_sums(paired * paired, beta_window)
+        sum_rb, rolling_rb = _cumulative_sums(values * benchmark, beta_window)
+        figures['beta'] = _beta_from_sums(sums, sum_b, sum_rb, sum_bb, counts)
+        if beta_window:
+            _beta_from_sums(rolling_sums, rolling_b, rolling_rb, rolling_bb, rolling_counts, out['rolling_beta'])
+    return figures
+
+
+def _rolling_ratios(sums, squares, downside, counts, excess, periods_per_year, out):
+    """
+    Write the rolling volatility, Sharpe and Sortino figures asked for in
+    `out` from rolling sums, reusing the squares' and downside buffers as
+    scratch.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # With nothing missing every window counts the same, so one reciprocal replaces a division per value
+        mean = sums * (1.0 / counts) if np.isscalar(counts) else np.divide(sums, counts)
+        if squares is not None:
+            # Annualized standard deviation, in place of the squares
+            squares -= sums * mean
+            np.maximum(squares, 0.0, out=squares)
+            if np.isscalar(counts):
+                squares *= periods_per_year / (counts - 1)
+            else:
+                squares *= periods_per_year
+                squares /= counts - 1
+            annual_std = np.sqrt(squares, out=squares)
+            if 'rolling_volatility' in out:
+                np.copyto(out['rolling_volatility'], annual_std)
+            if 'rolling_sharpe' in out:
+                numerator = mean - excess
+                numerator *= periods_per_year
+                _scaled_ratio(numerator, annual_std, out['rolling_sharpe'])
+        if downside is not None:
+            # Annualized downside deviation, in place of the downside sums
+            if np.isscalar(counts):
+                downside *= periods_per_year / counts
+            else:
+                downside *= periods_per_year
+                downside /= counts
+            annual_downside = np.sqrt(downside, out=downside)
+            np.multiply(mean, periods_per_year, out=mean)
+            _scaled_ratio(mean, annual_downside, out['rolling_sortino'])
+
+
+def _scaled_ratio(numerator, deviation, out):
+    """numerator / deviation into out, NaN where the deviation is zero."""
+    np.divide(numerator, deviation, out=out)
+    np.copyto(out, np.nan, where=deviation == 0)
+
+
+def get_risk_metrics(tickers, period="1y", benchmark="SPY", window=DEFAULT_WINDOW, rolling=True):
+    """
+    Risk suite for tickers, from their close panel.
+
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): Time period for data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y)
+        benchmark (str): Ticker the betas are measured against (None to skip)
+        window (int): Rolling window in bars
+        rolling (bool or list): Rolling figures to include (see risk_report)
+
+    Returns:
+        dict: risk_report output plus 'tickers' and 'dates' (of the return
+            columns), or an empty dict on error
+    """
+    from utils.finance import get_stock_data_batch
+
+    try:
+        tickers = list(dict.fromkeys(tickers))
+        symbols = tickers + ([benchmark] if benchmark and benchmark not in tickers else [])
+        panel = get_stock_data_batch(symbols, period)
+        returns = returns_from_prices(panel['Close'])
+
+        bench_returns = returns[symbols.index(benchmark)] if benchmark else None
+        report = risk_report(returns[:len(tickers)], bench_returns, window, rolling=rolling)
+        report['tickers'] = tickers
+        report['dates'] = pd.DatetimeIndex(panel['Date'])[1:]
+        return report
+    except Exception as e:
+        logger.error(f"Error in get_risk_metrics: {str(e)}")
+        return {}
@@ -0,0 +1,104 @@
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# SplitMix64 constants (see keyed_uniforms)
+_UINT64_MASK = (1 << 64) - 1
+_SPLITMIX_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_SPLITMIX_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_SPLITMIX_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def stable_seed(*key):
+    """
+    Hash a key into a 128-bit seed.
+
+    Unlike hash(), the result is the same in every process and every run,
+    so it can be used to key cached or persisted data.
+
+    Args:
+        *key: Strings and numbers identifying the stream
+
+    Returns:
+        int: Seed derived from the key
+    """
+    digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def stream(*key):
+    """
+    Get an independent random generator for a key.
+
+    The same key always yields the same sequence, and different keys yield
+    statistically independent streams, so callers in different threads or
+    processes never share RNG state.
+
+    Args:
+        *key: Strings and numbers identifying the stream, e.g.
+            ('stock', ticker, bucket)
+
+    Returns:
+        np.random.Generator: Generator seeded from the key
+    """
+    return np.random.Generator(np.random.PCG64(stable_seed(*key)))
+
+
+def keyed_uniforms(seeds, counters):
+    """
+    Draw uniforms on [0, 1) addressed by (seed, counter), for whole arrays at once.
+
+    Draw (s, c) is the SplitMix64 output at position c of the sequence
+    seeded with s, so any entries of a sequence can be drawn without the
+    ones before them, and a draw never depends on which other draws are
+    made alongside it.
+
+    Args:
+        seeds (list): Seeds, e.g. from stable_seed; one row each
+        counters (np.ndarray): Non-negative integer positions, one column each
+
+    Returns:
+        np.ndarray: (seed x counter) uniforms
+    """
+    keys = np.array([seed & _UINT64_MASK for seed in seeds], dtype=np.uint64)
+    z = keys[:, None] + (np.asarray(counters, dtype=np.uint64) + np.uint64(1)) * _SPLITMIX_GAMMA
+    z ^= z >> np.uint64(30)
+    z *= _SPLITMIX_MIX1
+    z ^= z >> np.uint64(27)
+    z *= _SPLITMIX_MIX2
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)) * 2.0 ** -53
+
+
+def date_bucket(when=None, freq='D'):
+    """
+    Label the date bucket a moment falls into.
+
+    Args:
+        when: Datetime-like value (defaults to now)
+        freq (str): Bucket size as a pandas frequency (e.g. 'D', 'h', 'min')
+
+    Returns:
+        str: ISO timestamp of the bucket start
+    """
+    timestamp = pd.Timestamp(datetime.now() if when is None else when)
+    return timestamp.floor(freq).isoformat()
+
+
+def pick(rng, options):
+    """
+    Choose one element of a sequence with a generator.
+
+    Unlike rng.choice, the element is returned as-is rather than converted
+    to a NumPy scalar.
+
+    Args:
+        rng (np.random.Generator): Generator to draw from
+        options (sequence): Values to choose from
+
+    Returns:
+        The chosen element
+    """
+    return options[rng.integers(len(options))]
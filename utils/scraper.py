@@ -5,6 +5,8 @@ import time
 import random
 import logging
 
+from utils.providers import get_provider
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -79,6 +81,10 @@ def scrape_financial_data(ticker_symbol):
     """
     Scrape financial data for a specific ticker symbol.
     
+    The quote comes from the provider configured for quotes (see
+    utils.providers): Yahoo Finance scraping by default, or the synthetic
+    or replay backends for offline use.
+    
     Args:
         ticker_symbol (str): The stock ticker symbol
         
@@ -86,73 +92,7 @@ def scrape_financial_data(ticker_symbol):
         dict: Dictionary containing the scraped financial data
     """
     try:
-        url = f"https://finance.yahoo.com/quote/{ticker_symbol}"
-        logger.info(f"Scraping financial data for {ticker_symbol} from {url}")
-        
-        # Set a user agent to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Referer': 'https://finance.yahoo.com/',
-            'DNT': '1'
-        }
-        
-        # Send a request to the website
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract price data
-        price_element = soup.find('fin-streamer', {'data-field': 'regularMarketPrice'})
-        price = price_element.text if price_element else "N/A"
-        
-        # Try to get price change and percentage
-        change_element = soup.find('fin-streamer', {'data-field': 'regularMarketChange'})
-        change = change_element.text if change_element else "N/A"
-        
-        change_percent_element = soup.find('fin-streamer', {'data-field': 'regularMarketChangePercent'})
-        change_percent = change_percent_element.text if change_percent_element else "N/A"
-        
-        # Extract additional data
-        data = {
-            'ticker': ticker_symbol,
-            'price': price,
-            'change': change,
-            'change_percent': change_percent,
-            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Additional data elements to try to extract
-        data_elements = {
-            'Previous Close': 'PREV_CLOSE-value',
-            'Open': 'OPEN-value',
-            'Day Range': 'DAYS_RANGE-value',
-            'Volume': 'TD_VOLUME-value',
-            'Market Cap': 'MARKET_CAP-value',
-            '52 Week Range': 'FIFTY_TWO_WK_RANGE-value',
-            'Avg Volume': 'AVERAGE_VOLUME_3MONTH-value',
-            'PE Ratio': 'PE_RATIO-value',
-            'EPS': 'EPS_RATIO-value',
-            'Dividend': 'DIVIDEND_AND_YIELD-value'
-        }
-        
-        for key, value_id in data_elements.items():
-            element = soup.find('td', {'data-test': value_id})
-            data[key] = element.text if element else "N/A"
-        
-        # Try to extract company name
-        try:
-            company_name_element = soup.find('h1', {'class': 'D(ib)'})
-            if company_name_element:
-                full_text = company_name_element.text
-                data['company_name'] = full_text.split('(')[0].strip()
-        except:
-            data['company_name'] = ticker_symbol
-            
-        return data
+        return get_provider('quotes').get_quote(ticker_symbol)
     except Exception as e:
         logger.error(f"Error in scrape_financial_data: {str(e)}")
         return {'error': str(e), 'ticker': ticker_symbol}
@@ -0,0 +1,272 @@
+import re
+import math
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils.funds import get_fund_universe, rank_top
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Relevance of a token by the field it appears in
+FIELD_WEIGHTS = {'ticker': 4.0, 'name': 2.0, 'subcategory': 1.5, 'category': 1.0}
+
+# The last query token is completed as a prefix from this many characters on
+MIN_PREFIX = 2
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a text."""
+    return _TOKEN.findall(str(text).lower())
+
+
+def query_tokens(query):
+    """
+    Tokens a query filters on.
+
+    A last token shorter than MIN_PREFIX is left out until more of it is
+    typed, since it would otherwise only match itself exactly.
+    """
+    tokens = tokenize(query)
+    if tokens and len(tokens[-1]) < MIN_PREFIX:
+        tokens.pop()
+    return tokens
+
+
+def rank_page(docs, scores, limit, offset=0):
+    """
+    One page of documents by descending score, ties by document number.
+
+    Returns:
+        tuple: (docs, scores, total) of the page
+    """
+    total = len(docs)
+    if limit <= 0 or offset >= total:
+        return docs[:0], scores[:0], total
+    best = rank_top(-scores, docs, min(total, offset + limit))[offset:]
+    return docs[best], scores[best], total
+
+
+class SearchIndex:
+    """
+    Inverted index over text columns, with prefix completion.
+
+    The vocabulary is kept sorted and the postings (document, score) of all
+    tokens are stored back to back in that order, so every token - and every
+    range of tokens sharing a prefix - is one contiguous slice of the
+    postings. Binary search on the sorted vocabulary plays the role of a
+    prefix trie: a prefix resolves to its range of completions in
+    O(len(prefix) * log(vocabulary)) without one node object per character.
+    A posting's score is the summed weight of the fields the token appears
+    in times the token's inverse document frequency.
+
+    Args:
+        columns (dict): Field name to sequence of texts, one per document
+        weights (dict): Field name to weight (fields not listed are skipped)
+    """
+
+    def __init__(self, columns, weights=FIELD_WEIGHTS):
+        parts = []
+        for field, weight in weights.items():
+            tokens = pd.Series(columns[field], dtype=object).str.lower().str.findall(_TOKEN.pattern).explode()
+            tokens = tokens.dropna()
+            parts.append(pd.DataFrame({'token': tokens.to_numpy(dtype=object),
+                                       'doc': tokens.index.to_numpy(np.int64),
+                                       'weight': weight}))
+        self.size = len(next(iter(columns.values())))
+        postings = (pd.concat(parts, ignore_index=True)
+                    .groupby(['token', 'doc'], sort=True)['weight'].sum()
+                    .reset_index())
+
+        # Sorted vocabulary with offsets into the postings
+        codes, vocabulary = pd.factorize(postings['token'], sort=True)
+        counts = np.bincount(codes, minlength=len(vocabulary))
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.doc_freq = counts
+        self.token_length = np.array([len(token) for token in self.vocabulary], dtype=np.float64)
+
+        idf = np.log1p(self.size / np.maximum(counts, 1))
+        self.docs = postings['doc'].to_numpy(np.int64)
+        self.scores = postings['weight'].to_numpy(np.float64) * idf[codes]
+
+    def _token_range(self, token, prefix):
+        """Vocabulary range of a token, or of every token starting with it."""
+        start = int(np.searchsorted(self.vocabulary, token, side='left'))
+        if prefix:
+            # '\uffff' sorts after any character a token can continue with
+            stop = int(np.searchsorted(self.vocabulary, token + '\uffff', side='left'))
+        else:
+            stop = start + 1 if start < len(self.vocabulary) and self.vocabulary[start] == token else start
+        return start, stop
+
+    def _term(self, token, prefix):
+        """
+        Matches of one query term; completions score by how much of them was typed.
+
+        Returns (sorted docs, scores), or (None, score per document) when
+        the term matches a large share of the documents.
+        """
+        start, stop = self._token_range(token, prefix)
+        lo, hi = self.offsets[start], self.offsets[stop]
+        docs, scores = self.docs[lo:hi], self.scores[lo:hi]
+        if stop - start <= 1:
+            if stop > start and self.token_length[start] > len(token):
+                scores = scores * (len(token) / self.token_length[start])
+            return docs, scores
+
+        completeness = len(token) / self.token_length[start:stop]
+        scores = scores * np.repeat(completeness, np.diff(self.offsets[start:stop + 1]))
+        if len(docs) > self.size // 16:
+            return None, np.bincount(docs, scores, minlength=self.size)
+        order = np.argsort(docs, kind='stable')
+        docs, scores = docs[order], scores[order]
+        first = np.flatnonzero(np.diff(docs, prepend=-1))
+        return docs[first], np.add.reduceat(scores, first)
+
+    def match(self, query):
+        """
+        Documents matching every query token, unranked.
+
+        All tokens but the last must match exactly; the last one also
+        matches as a prefix, and is left out while it is shorter than
+        MIN_PREFIX (see query_tokens), so results update as the user types.
+
+        Args:
+            query (str): Free text
+
+        Returns:
+            tuple: (docs, scores) - matching document numbers and their
+                relevance
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        terms = [self._term(token, False) for token in dict.fromkeys(tokens[:-1])]
+        terms.append(self._term(tokens[-1], True))
+
+        # Intersect from the rarest term up: probe sorted postings, gather dense scores
+        sparse = sorted((term for term in terms if term[0] is not None), key=lambda term: len(term[0]))
+        dense = [term[1] for term in terms if term[0] is None]
+        if sparse:
+            docs, scores = sparse[0]
+        else:
+            docs = np.flatnonzero(np.logical_and.reduce([totals > 0 for totals in dense]))
+            scores = np.zeros(len(docs))
+        for other_docs, other_scores in sparse[1:]:
+            if not len(docs):
+                break
+            position = np.minimum(np.searchsorted(other_docs, docs), len(other_docs) - 1)
+            found = other_docs[position] == docs if len(other_docs) else np.zeros(len(docs), dtype=bool)
+            docs = docs[found]
+            scores = scores[found] + other_scores[position[found]]
+        for totals in dense:
+            found = totals[docs]
+            keep = found > 0
+            docs = docs[keep]
+            scores = scores[keep] + found[keep]
+        return docs, scores
+
+    def search(self, query, limit=10, offset=0):
+        """
+        Documents matching every query token, best first.
+
+        Args:
+            query (str): Free text (see match)
+            limit (int): Maximum number of results
+            offset (int): Results to skip (for paging)
+
+        Returns:
+            tuple: (docs, scores, total) - ranked document numbers and
+                their scores for the requested page, and the number of
+                matches
+        """
+        docs, scores = self.match(query)
+        return rank_page(docs, scores, limit, offset)
+
+    def suggest(self, prefix, limit=5):
+        """
+        Completions of a prefix, most frequent first.
+
+        Returns:
+            list: Up to `limit` vocabulary tokens starting with the prefix
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        start, stop = self._token_range(tokens[-1], True)
+        if stop <= start:
+            return []
+        tokens = np.arange(start, stop)
+        best = rank_top(-self.doc_freq[start:stop].astype(np.float64), tokens, min(limit, len(tokens)))
+        return [self.vocabulary[token] for token in tokens[best]]
+
+
+_index = None
+_indexed_universe = None
+_index_lock = threading.Lock()
+
+
+def get_fund_search_index():
+    """
+    Get the search index of the current fund universe, built once per universe.
+
+    Returns:
+        SearchIndex: Index over name, ticker, category and subcategory
+    """
+    global _index, _indexed_universe
+    universe = get_fund_universe()
+    with _index_lock:
+        if _indexed_universe is not universe:
+            _index = SearchIndex(universe.columns)
+            _indexed_universe = universe
+        return _index
+
+
+def search_funds(query, page=1, page_size=10):
+    """
+    Full-text search over the whole fund universe.
+
+    Args:
+        query (str): Free text matched against name, ticker, category and
+            subcategory; the last word may be incomplete
+        page (int): 1-based page number
+        page_size (int): Results per page
+
+    Returns:
+        dict: 'funds' (fund dicts of the page, each with a 'score'),
+            'total' (matches), 'page', 'pages' and 'suggestions'
+            (completions of the last word). A query too short to filter
+            on (e.g. one letter) lists every fund, best one-year return
+            first, with a score of 0
+    """
+    try:
+        universe = get_fund_universe()
+        index = get_fund_search_index()
+        page = max(1, int(page))
+        offset = (page - 1) * page_size
+        if query_tokens(query):
+            docs, scores, total = index.search(query, page_size, offset)
+        else:
+            docs = universe.rows()[offset:offset + page_size]
+            scores, total = np.zeros(len(docs)), len(universe)
+        funds = universe.records(docs)
+        for fund, score in zip(funds, scores):
+            fund['score'] = round(float(score), 3)
+        return {
+            'funds': funds,
+            'total': total,
+            'page': page,
+            'pages': max(1, math.ceil(total / page_size)),
+            'suggestions': index.suggest(query),
+        }
+    except Exception as e:
+        logger.error(f"Error in search_funds: {str(e)}")
+        return {'funds': [], 'total': 0, 'page': 1, 'pages': 1, 'suggestions': []}
@@ -3,10 +3,11 @@ import re
 import json
 import time
 import logging
-import random
 from textblob import TextBlob
 import os
 
+from utils.rng import date_bucket, stream
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -90,8 +91,8 @@ def simulate_ticker_sentiment(ticker, baseline_sentiment):
     Returns:
         float: Simulated sentiment score for the ticker
     """
-    # Add some randomness to the baseline sentiment
-    random_factor = random.uniform(-0.3, 0.3)
+    # Add some randomness to the baseline sentiment (stable for a ticker within a day)
+    random_factor = stream('sentiment', ticker, date_bucket()).uniform(-0.3, 0.3)
     
     # Use the ticker itself to add a deterministic factor
     # This ensures the same ticker gets similar results in a session
@@ -125,12 +126,13 @@ def analyze_social_media_sentiment(query, platform="twitter"):
     query_hash = sum(ord(c) for c in query) % 100 / 100  # 0 to 1 range
     base_sentiment = (query_hash - 0.5) * 1.4  # Range of -0.7 to 0.7
     
-    # Add some randomness
-    sentiment_score = base_sentiment + random.uniform(-0.3, 0.3)
+    # Add some randomness (stable for a query within a day)
+    rng = stream('social', platform, query, date_bucket())
+    sentiment_score = base_sentiment + rng.uniform(-0.3, 0.3)
     sentiment_score = max(-1, min(1, sentiment_score))  # Ensure range is -1 to 1
     
     # Create a simulated distribution of posts
-    total_posts = random.randint(50, 500)
+    total_posts = int(rng.integers(50, 501))
     positive_pct = (sentiment_score + 1) * 50  # Convert to percentage (0-100)
     negative_pct = 100 - positive_pct
     
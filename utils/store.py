@@ -0,0 +1,390 @@
+import os
+import re
+import shutil
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Column layout shared by every OHLCV file (same order as get_stock_data)
+COLUMNS = ('Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close')
+DTYPES = {
+    'Date': np.dtype('<i8'),       # epoch nanoseconds
+    'Open': np.dtype('<f8'),
+    'High': np.dtype('<f8'),
+    'Low': np.dtype('<f8'),
+    'Close': np.dtype('<f8'),
+    'Volume': np.dtype('<i8'),
+    'Adj Close': np.dtype('<f8'),
+}
+
+# File header: magic, version, column count, capacity, length
+_MAGIC = b'TRAIDOHL'
+_VERSION = 1
+_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('ncols', '<u4'),
+    ('capacity', '<u8'),
+    ('length', '<u8'),
+])
+_HEADER_SIZE = 64
+_ITEM_SIZE = 8
+_MIN_CAPACITY = 256
+
+# File in a store root naming the version of the data stored there
+_DATA_VERSION_FILE = 'DATA_VERSION'
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'TRAID_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ohlcv')
+)
+
+
+def _to_ns(value):
+    """Convert a datetime-like value to epoch nanoseconds."""
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+class OHLCVStore:
+    """
+    On-disk columnar store for OHLCV history.
+
+    Each (ticker, freq) pair lives in one file made of a fixed header followed
+    by one contiguous block per column. Every block is sized to the file
+    capacity, so appends write into the spare slots in place and only a
+    full file triggers a rewrite. Reads memory-map the file and hand out
+    NumPy views, so loading a series never copies the data.
+
+    With a data version, the root records the version its series were made
+    with; series found under another version (or none) are deleted when the
+    store is opened, so a changed data source never extends them.
+
+    Args:
+        root (str): Directory holding the store files
+        version (int): Version of the data kept in root (None to skip the check)
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, version=None):
+        self.root = root
+        self.version = version
+        self._lock = threading.RLock()
+        self._maps = {}
+        if version is not None:
+            self._check_version()
+
+    def _check_version(self):
+        """Delete every stored series if root holds data of another version."""
+        marker = os.path.join(self.root, _DATA_VERSION_FILE)
+        try:
+            with open(marker) as f:
+                found = f.read().strip()
+        except FileNotFoundError:
+            found = None
+        if found == str(self.version):
+            return
+
+        os.makedirs(self.root, exist_ok=True)
+        stale = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+        if stale:
+            logger.info(f"Dropping {len(stale)} series directories of data version {found} in {self.root}")
+        for entry in stale:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        with open(marker, 'w') as f:
+            f.write(f"{self.version}\n")
+
+    def _path(self, ticker, freq):
+        # Separators become '_'; a name of dots alone would point outside the store
+        safe_ticker = re.sub(r'[^A-Z0-9._-]', '_', ticker.upper())
+        if not safe_ticker.strip('.'):
+            raise ValueError(f"Invalid ticker: {ticker!r}")
+        return os.path.join(self.root, safe_ticker, f"{freq}.ohlcv")
+
+    def _map(self, path):
+        """Return (buffer, capacity, length) for a file, reusing open maps."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._maps.pop(path, None)
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != signature:
+            buffer = np.memmap(path, dtype=np.uint8, mode='r')
+            cached = (signature, buffer)
+            self._maps[path] = cached
+
+        buffer = cached[1]
+        header = np.frombuffer(buffer, dtype=_HEADER_DTYPE, count=1)[0]
+        if header['magic'] != _MAGIC or header['version'] != _VERSION:
+            raise ValueError(f"Not an OHLCV store file: {path}")
+        return buffer, int(header['capacity']), int(header['length'])
+
+    @staticmethod
+    def _columns(buffer, capacity, start, stop):
+        """Slice column views out of a mapped file without copying."""
+        columns = {}
+        for i, name in enumerate(COLUMNS):
+            offset = _HEADER_SIZE + i * capacity * _ITEM_SIZE
+            column = np.frombuffer(buffer, dtype=DTYPES[name], count=capacity, offset=offset)
+            columns[name] = column[start:stop]
+        return columns
+
+    def _write_file(self, path, columns, capacity):
+        """Atomically write a complete file with the given capacity."""
+        length = len(columns['Date'])
+        header = np.zeros(1, dtype=_HEADER_DTYPE)
+        header['magic'] = _MAGIC
+        header['version'] = _VERSION
+        header['ncols'] = len(COLUMNS)
+        header['capacity'] = capacity
+        header['length'] = length
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            f.truncate(_HEADER_SIZE + len(COLUMNS) * capacity * _ITEM_SIZE)
+            f.write(header.tobytes())
+            for i, name in enumerate(COLUMNS):
+                f.seek(_HEADER_SIZE + i * capacity * _ITEM_SIZE)
+                f.write(np.ascontiguousarray(columns[name], dtype=DTYPES[name]).tobytes())
+        os.replace(tmp_path, path)
+        self._maps.pop(path, None)
+
+    @staticmethod
+    def _normalize(columns):
+        """Coerce incoming columns (DataFrame or dict) to store dtypes."""
+        if isinstance(columns, pd.DataFrame):
+            columns = {name: columns[name].to_numpy() for name in COLUMNS}
+        normalized = {}
+        for name in COLUMNS:
+            values = np.asarray(columns[name])
+            if name == 'Date' and values.dtype.kind == 'M':
+                values = values.astype('datetime64[ns]').view('<i8')
+            normalized[name] = values.astype(DTYPES[name], copy=False)
+        return normalized
+
+    def load(self, ticker, freq='1D'):
+        """
+        Load the full stored series for a ticker.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            freq (str): Bar frequency of the series
+
+        Returns:
+            dict: Column name to read-only array view, or None if not stored
+        """
+        with self._lock:
+            mapped = self._map(self._path(ticker, freq))
+        if mapped is None:
+            return None
+        buffer, capacity, length = mapped
+        return self._columns(buffer, capacity, 0, length)
+
+    def load_range(self, ticker, start, end, freq='1D'):
+        """
+        Load the bars of a ticker whose timestamp falls in [start, end].
+
+        The result is a slice of the memory-mapped file, so no data is copied.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            start: First timestamp to include (anything pd.Timestamp accepts)
+            end: Last timestamp to include
+            freq (str): Bar frequency of the series
+
+        Returns:
+            dict: Column name to read-only array view, or None if not stored
+        """
+        with self._lock:
+            mapped = self._map(self._path(ticker, freq))
+        if mapped is None:
+            return None
+        buffer, capacity, length = mapped
+
+        dates = np.frombuffer(buffer, dtype=DTYPES['Date'], count=length, offset=_HEADER_SIZE)
+        lo = int(np.searchsorted(dates, _to_ns(start), side='left'))
+        hi = int(np.searchsorted(dates, _to_ns(end), side='right'))
+        return self._columns(buffer, capacity, lo, hi)
+
+    def bounds(self, ticker, freq='1D'):
+        """
+        Get the first and last stored timestamps of a series.
+
+        Returns:
+            tuple: (first, last) as pd.Timestamp, or None if nothing is stored
+        """
+        columns = self.load(ticker, freq)
+        if columns is None or len(columns['Date']) == 0:
+            return None
+        dates = columns['Date']
+        return pd.Timestamp(int(dates[0]), unit='ns'), pd.Timestamp(int(dates[-1]), unit='ns')
+
+    def write(self, ticker, columns, freq='1D'):
+        """
+        Replace the stored series of a ticker.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            columns (pd.DataFrame or dict): OHLCV columns sorted by date
+            freq (str): Bar frequency of the series
+        """
+        columns = self._normalize(columns)
+        capacity = max(_MIN_CAPACITY, 2 * len(columns['Date']))
+        with self._lock:
+            self._write_file(self._path(ticker, freq), columns, capacity)
+
+    def append(self, ticker, columns, freq='1D', revise=False):
+        """
+        Append bars to the stored series of a ticker.
+
+        Bars at or before the last stored timestamp are ignored so the
+        series stays sorted, except that with revise a bar at the last
+        stored timestamp overwrites it (that bar may have been partial). New
+        bars go into the spare capacity of the file in place; the file is
+        only rewritten (with doubled capacity) when it is full.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            columns (pd.DataFrame or dict): OHLCV columns sorted by date
+            freq (str): Bar frequency of the series
+            revise (bool): Replace the last stored bar with an incoming bar
+                at the same timestamp
+
+        Returns:
+            int: Number of bars appended (a revised bar is not counted)
+        """
+        columns = self._normalize(columns)
+        path = self._path(ticker, freq)
+
+        with self._lock:
+            mapped = self._map(path)
+            if mapped is None:
+                if len(columns['Date']) == 0:
+                    return 0
+                self._write_file(path, columns, max(_MIN_CAPACITY, 2 * len(columns['Date'])))
+                return len(columns['Date'])
+
+            buffer, capacity, length = mapped
+            revised = 0
+            if length:
+                last = np.frombuffer(buffer, dtype=DTYPES['Date'], count=1,
+                                     offset=_HEADER_SIZE + (length - 1) * _ITEM_SIZE)[0]
+                if revise and np.any(columns['Date'] == last):
+                    # The incoming copy of the last bar takes its slot
+                    length -= 1
+                    revised = 1
+                    keep = columns['Date'] >= last
+                else:
+                    keep = columns['Date'] > last
+                if not keep.all():
+                    columns = {name: values[keep] for name, values in columns.items()}
+
+            added = len(columns['Date'])
+            if added == 0:
+                return 0
+
+            if length + added > capacity:
+                existing = self._columns(buffer, capacity, 0, length)
+                merged = {name: np.concatenate([existing[name], columns[name]]) for name in COLUMNS}
+                self._write_file(path, merged, max(_MIN_CAPACITY, 2 * (length + added)))
+                return added - revised
+
+            writable = np.memmap(path, dtype=np.uint8, mode='r+')
+            for i, name in enumerate(COLUMNS):
+                offset = _HEADER_SIZE + (i * capacity + length) * _ITEM_SIZE
+                target = np.frombuffer(writable, dtype=DTYPES[name], count=added, offset=offset)
+                target[:] = columns[name]
+            header = writable[:_HEADER_DTYPE.itemsize].view(_HEADER_DTYPE)
+            header['length'] = length + added
+            writable.flush()
+            del writable
+            self._maps.pop(path, None)
+            return added - revised
+
+    def compact(self, ticker, freq='1D', keep_after=None):
+        """
+        Rewrite a series so the file holds no spare capacity.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            freq (str): Bar frequency of the series
+            keep_after: Optional timestamp; older bars are dropped
+
+        Returns:
+            int: Number of bars left in the series
+        """
+        path = self._path(ticker, freq)
+        with self._lock:
+            mapped = self._map(path)
+            if mapped is None:
+                return 0
+            buffer, capacity, length = mapped
+            columns = self._columns(buffer, capacity, 0, length)
+
+            if keep_after is not None:
+                lo = int(np.searchsorted(columns['Date'], _to_ns(keep_after), side='left'))
+                columns = {name: values[lo:] for name, values in columns.items()}
+
+            # Copy out of the old map before it is replaced
+            columns = {name: np.array(values) for name, values in columns.items()}
+            remaining = len(columns['Date'])
+            self._write_file(path, columns, max(remaining, 1))
+            return remaining
+
+    def delete(self, ticker, freq='1D'):
+        """Remove the stored series of a ticker, if any."""
+        path = self._path(ticker, freq)
+        with self._lock:
+            self._maps.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def to_dataframe(columns):
+    """
+    Wrap store columns in a DataFrame without copying them.
+
+    Args:
+        columns (dict): Column views as returned by OHLCVStore.load_range
+
+    Returns:
+        pd.DataFrame: DataFrame with the get_stock_data column layout
+    """
+    data = {name: columns[name] for name in COLUMNS}
+    data['Date'] = columns['Date'].view('datetime64[ns]')
+    return pd.DataFrame(data, columns=list(COLUMNS), copy=False)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(namespace=None, version=None):
+    """
+    Get a process-wide OHLCV store.
+
+    Args:
+        namespace (str): Optional sub-directory, e.g. the name of the market
+            data provider, so series from different sources never mix
+        version (int): Version of the data kept in the namespace; series of
+            another version are dropped (see OHLCVStore)
+
+    Returns:
+        OHLCVStore: Store rooted at TRAID_STORE_DIR (or data/ohlcv)
+    """
+    with _stores_lock:
+        key = (namespace, version)
+        if key not in _stores:
+            root = DEFAULT_STORE_DIR if namespace is None else os.path.join(DEFAULT_STORE_DIR, namespace)
+            _stores[key] = OHLCVStore(root, version)
+        return _stores[key]